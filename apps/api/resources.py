@@ -0,0 +1,157 @@
+"""
+Resources exposed by the read-only JSON API
+
+Each resource maps public field names to ORM paths and is serialized from
+``.values()`` rows, so no model instances are built.
+"""
+
+from django.apps import apps
+from django.urls import reverse
+
+
+RESOURCES = {
+    'prompts': {
+        'model': 'prompts.Prompt',
+        'filter': {'is_published': True},
+        'fields': {
+            'id': 'id',
+            'slug': 'slug',
+            'title': 'title',
+            'description': 'description',
+            'prompt_text': 'prompt_text',
+            'category': 'category__slug',
+            'difficulty': 'difficulty',
+            'ai_model': 'ai_model',
+            'tags': 'tags',
+            'author': 'author__username',
+            'views': 'views',
+            'upvotes': 'upvotes',
+            'is_featured': 'is_featured',
+            'created_at': 'created_at',
+            'updated_at': 'updated_at',
+        },
+        'filters': {
+            'category': 'category__slug',
+            'tag': 'tag_set__slug',
+            'difficulty': 'difficulty',
+            'ai_model': 'ai_model',
+            'author': 'author__username',
+        },
+        'ordering': ('-created_at', '-id'),
+        'url_name': 'prompts:detail',
+    },
+    'categories': {
+        'model': 'prompts.Category',
+        'filter': {},
+        'fields': {
+            'id': 'id',
+            'slug': 'slug',
+            'name': 'name',
+            'description': 'description',
+            'icon': 'icon',
+            'created_at': 'created_at',
+        },
+        'filters': {},
+        'ordering': ('name', 'id'),
+        'url_name': None,
+    },
+    'blog': {
+        'model': 'blog.BlogPost',
+        'filter': {'status': 'published'},
+        'fields': {
+            'id': 'id',
+            'slug': 'slug',
+            'title': 'title',
+            'excerpt': 'excerpt',
+            'content': 'content',
+            'category': 'category__slug',
+            'tags': 'tags',
+            'author': 'author__username',
+            'views': 'views',
+            'likes': 'likes',
+            'comment_count': 'comment_count',
+            'is_featured': 'is_featured',
+            'published_at': 'published_at',
+            'updated_at': 'updated_at',
+        },
+        'filters': {
+            'category': 'category__slug',
+            'tag': 'tag_set__slug',
+            'author': 'author__username',
+        },
+        'ordering': ('-published_at', '-id'),
+        'url_name': 'blog:detail',
+    },
+    'news': {
+        'model': 'news.NewsArticle',
+        'filter': {'is_published': True},
+        'fields': {
+            'id': 'id',
+            'slug': 'slug',
+            'title': 'title',
+            'subtitle': 'subtitle',
+            'summary': 'summary',
+            'content': 'content',
+            'source': 'source',
+            'category': 'category__slug',
+            'priority': 'priority',
+            'tags': 'tags',
+            'views': 'views',
+            'is_featured': 'is_featured',
+            'published_at': 'published_at',
+            'updated_at': 'updated_at',
+        },
+        'filters': {
+            'category': 'category__slug',
+            'tag': 'tag_set__slug',
+            'priority': 'priority',
+        },
+        'ordering': ('-published_at', '-id'),
+        'url_name': 'news:detail',
+    },
+}
+
+
+class FieldError(ValueError):
+    pass
+
+
+def get_queryset(conf):
+    return apps.get_model(conf['model'])._default_manager.filter(**conf['filter'])
+
+
+def select_fields(conf, requested):
+    """
+    Return the public field names for a ``?fields=`` value (all fields when
+    empty). ``url`` is available for resources with a detail page.
+    """
+    available = list(conf['fields'])
+    if conf['url_name']:
+        available.append('url')
+    if not requested:
+        return available
+    names = [name.strip() for name in requested.split(',') if name.strip()]
+    unknown = [name for name in names if name not in available]
+    if unknown:
+        raise FieldError(f"Unknown field(s): {', '.join(unknown)}. Available: {', '.join(available)}")
+    return names
+
+
+def value_paths(conf, names):
+    """ORM paths to fetch for ``names``, plus the ordering fields for cursors"""
+    paths = {conf['fields'][name] for name in names if name != 'url'}
+    if 'url' in names:
+        paths.add('slug')
+    paths.update(field.lstrip('-') for field in conf['ordering'])
+    return sorted(paths)
+
+
+def serialize(conf, row, names):
+    """Turn one ``.values()`` row into the public representation"""
+    data = {}
+    for name in names:
+        if name == 'url':
+            data['url'] = reverse(conf['url_name'], kwargs={'slug': row['slug']})
+        else:
+            data[name] = row[conf['fields'][name]]
+    return data
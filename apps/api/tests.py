@@ -0,0 +1,233 @@
+"""
+Query budgets and behaviour of the JSON API
+"""
+
+import csv
+import gzip
+import io
+import json
+from datetime import timedelta
+from unittest import mock
+from urllib.parse import parse_qs, urlsplit
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import F
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.core import export
+from apps.core.testing import QueryBudgetMixin, seed_content
+from apps.prompts.models import Prompt
+
+
+class APIQueryBudgetTests(QueryBudgetMixin, TestCase):
+    budgets = {
+        'api:index': {'anonymous': 0, 'user': 0},
+        'api:list': {'args': ['prompts'], 'anonymous': 2, 'user': 2},
+        'api:detail': {'args': lambda data: ['prompts', data['prompt'].slug], 'anonymous': 2, 'user': 2},
+        'api:export': {'args': ['prompt'], 'anonymous': 0, 'user': 2},
+    }
+
+
+class StaffExportQueryBudgetTests(QueryBudgetMixin, TestCase):
+    user_key = 'staff'
+    budgets = {
+        # One keyset chunk for the seeded rows, plus the session and user
+        'api:export': {'args': ['prompt'], 'user': 3},
+    }
+
+
+@override_settings(VIEW_COUNT_FLUSH_THREAD=False)
+class ResourceViewTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.data = seed_content()
+
+    def setUp(self):
+        cache.clear()
+
+    def test_detail_not_modified(self):
+        url = reverse('api:detail', args=['prompts', self.data['prompt'].slug])
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['ETag'].startswith('W/"'))
+        self.assertNotIn('Last-Modified', response)
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+
+    def test_detail_etag_follows_counters_and_relations(self):
+        prompt = self.data['prompt']
+        url = reverse('api:detail', args=['prompts', prompt.slug])
+        etags = [self.client.get(url)['ETag']]
+
+        # Neither change touches updated_at
+        Prompt.objects.filter(pk=prompt.pk).update(views=F('views') + 1)
+        etags.append(self.client.get(url)['ETag'])
+        User.objects.filter(pk=prompt.author_id).update(username='renamed')
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etags[-1])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['author'], 'renamed')
+        etags.append(response['ETag'])
+        self.assertEqual(len(set(etags)), 3)
+
+    def test_list_not_modified(self):
+        url = reverse('api:list', args=['prompts'])
+        response = self.client.get(url, {'limit': 5})
+        etag = response['ETag']
+        self.assertEqual(self.client.get(url, {'limit': 5}, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        # Another page is another representation
+        self.assertEqual(self.client.get(url, {'limit': 6}, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+        Prompt.objects.filter(pk=response.json()['results'][0]['id']).update(views=F('views') + 1)
+        self.assertEqual(self.client.get(url, {'limit': 5}, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_list_count_is_cached(self):
+        url = reverse('api:list', args=['prompts'])
+        self.assertEqual(self.client.get(url).json()['count'], 30)
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get(url)
+        self.assertEqual(response.json()['count'], 30)
+        self.assertFalse(response.json()['count_is_lower_bound'])
+        self.assertFalse([query for query in captured if 'COUNT(' in query['sql']])
+
+        # Deleting a prompt invalidates the cached count
+        self.data['prompt'].delete()
+        self.assertEqual(self.client.get(url).json()['count'], 29)
+
+    def test_fields(self):
+        url = reverse('api:detail', args=['prompts', self.data['prompt'].slug])
+        response = self.client.get(url, {'fields': 'title, url'})
+        self.assertEqual(response.json(), {
+            'title': self.data['prompt'].title,
+            'url': reverse('prompts:detail', kwargs={'slug': self.data['prompt'].slug}),
+        })
+
+        response = self.client.get(url, {'fields': 'title,password'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('Unknown field(s): password.', response.json()['error'])
+        self.assertNotIn('ETag', response)
+
+        # Categories have no detail page, so no url field
+        response = self.client.get(reverse('api:list', args=['categories']), {'fields': 'url'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_cursor_walks_every_row(self):
+        url = reverse('api:list', args=['prompts'])
+        seen = []
+        params = {'limit': 7, 'fields': 'id'}
+        while True:
+            body = self.client.get(url, params).json()
+            seen.extend(item['id'] for item in body['results'])
+            if body['next'] is None:
+                break
+            params['cursor'] = parse_qs(urlsplit(body['next']).query)['cursor'][0]
+        self.assertEqual(len(seen), 30)
+        self.assertEqual(len(set(seen)), 30)
+
+    def test_bad_cursor(self):
+        url = reverse('api:list', args=['prompts'])
+        valid = parse_qs(urlsplit(self.client.get(url, {'limit': 2}).json()['next']).query)['cursor'][0]
+        for cursor in ('not-a-cursor', '!!!', valid[:-3], 'WyJ1cCIsW11d'):
+            with self.subTest(cursor=cursor):
+                response = self.client.get(url, {'cursor': cursor})
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(response.json(), {'error': 'Invalid cursor.'})
+
+    def test_limit_is_clamped(self):
+        url = reverse('api:list', args=['prompts'])
+        for limit, expected in (('0', 1), ('-5', 1), ('3', 3), ('1000', 30)):
+            with self.subTest(limit=limit):
+                self.assertEqual(len(self.client.get(url, {'limit': limit}).json()['results']), expected)
+
+        with mock.patch('apps.api.views.MAX_LIMIT', 4):
+            self.assertEqual(len(self.client.get(url, {'limit': '1000'}).json()['results']), 4)
+
+        response = self.client.get(url, {'limit': 'ten'})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {'error': 'limit must be an integer.'})
+
+    def test_unknown_resource(self):
+        response = self.client.get(reverse('api:list', args=['users']))
+        self.assertEqual(response.status_code, 404)
+        response = self.client.get(reverse('api:detail', args=['prompts', 'missing']))
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.json(), {'error': 'Not found.'})
+
+
+class ExportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = User.objects.create_user('staff', 'staff@example.com', 'pass-123-xyz', is_staff=True)
+        cls.reader = User.objects.create_user('reader', 'reader@example.com', 'pass-123-xyz')
+        for i in range(5):
+            Prompt.objects.create(title=f'Prompt {i}', description='d', prompt_text='t', author=cls.staff,
+                                  is_published=i != 4)
+
+    def setUp(self):
+        self.client.force_login(self.staff)
+
+    def export(self, kind='prompt', **params):
+        response = self.client.get(reverse('api:export', args=[kind]), params)
+        if not response.streaming:
+            return response, None
+        return response, b''.join(response.streaming_content)
+
+    def test_ndjson_includes_unpublished_rows_for_staff(self):
+        response, body = self.export()
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        self.assertRegex(response['Content-Disposition'], r'attachment; filename="prompt-\d{8}-\d{6}\.jsonl"')
+        self.assertEqual(response['Cache-Control'], 'no-store')
+        rows = [json.loads(line) for line in body.decode().splitlines()]
+        self.assertEqual([row['title'] for row in rows], [f'Prompt {i}' for i in range(5)])
+        self.assertEqual([row['is_published'] for row in rows], [True] * 4 + [False])
+        self.assertEqual(rows[0]['author'], 'staff')
+
+    def test_only_staff_can_export(self):
+        self.client.logout()
+        self.assertEqual(self.export()[0].status_code, 401)
+        self.client.force_login(self.reader)
+        response, body = self.export()
+        self.assertEqual(response.status_code, 403)
+        self.assertNotIn(b'Prompt', response.content)
+
+    def test_csv(self):
+        response, body = self.export(format='csv')
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        rows = list(csv.DictReader(io.StringIO(body.decode())))
+        self.assertEqual(len(rows), 5)
+        self.assertEqual(rows[4]['is_published'], 'False')
+        self.assertEqual(rows[0]['created_at'], Prompt.objects.get(title='Prompt 0').created_at.isoformat())
+
+    def test_gzip(self):
+        response, body = self.export(format='csv', gzip='1')
+        self.assertEqual(response['Content-Type'], 'application/gzip')
+        self.assertTrue(response['Content-Disposition'].endswith('.csv.gz"'))
+        self.assertEqual(gzip.decompress(body).decode(), b''.join(export.stream('prompt', 'csv')).decode())
+
+    def test_updated_since(self):
+        Prompt.objects.filter(title='Prompt 1').update(updated_at=timezone.now() + timedelta(days=2))
+        since = (timezone.now() + timedelta(days=1)).isoformat()
+        response, body = self.export(updated_since=since)
+        self.assertEqual([json.loads(line)['title'] for line in body.decode().splitlines()], ['Prompt 1'])
+        # A date means midnight of that day
+        response, body = self.export(updated_since=timezone.localdate(timezone.now() + timedelta(days=2)).isoformat())
+        self.assertEqual(len(body.decode().splitlines()), 1)
+
+    def test_invalid_parameters(self):
+        self.assertEqual(self.export(updated_since='yesterday')[0].status_code, 400)
+        self.assertEqual(self.export(format='xml')[0].status_code, 400)
+        self.assertEqual(self.export(kind='users')[0].status_code, 404)
+
+    def test_rows_are_read_in_keyset_chunks(self):
+        with CaptureQueriesContext(connection) as captured:
+            rows = list(export.iter_rows('prompt', chunk_size=2))
+        self.assertEqual(len(rows), 5)
+        # Chunks of 2, 2 and 1 rows
+        self.assertEqual(len(captured), 3)
+        self.assertNotIn('OFFSET', ' '.join(query['sql'] for query in captured))
@@ -0,0 +1,15 @@
+"""
+URL Configuration for the read-only JSON API (mounted at /api/v1/)
+"""
+
+from django.urls import path
+from . import views
+
+app_name = 'api'
+
+urlpatterns = [
+    path('', views.APIIndexView.as_view(), name='index'),
+    path('export/<str:kind>/', views.ExportView.as_view(), name='export'),
+    path('<str:resource>/', views.ResourceListView.as_view(), name='list'),
+    path('<str:resource>/<str:slug>/', views.ResourceDetailView.as_view(), name='detail'),
+]
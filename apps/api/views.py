@@ -0,0 +1,188 @@
+"""
+Views for the read-only JSON API
+
+Lists use keyset pagination over ``.values()`` rows and take their total
+from the shared count cache (apps.core.counting). Responses carry a weak
+ETag over the serialized body: counters bumped with F() updates (views,
+comment_count) and renamed categories or authors do not touch
+``updated_at``, so no timestamp can validate a representation. Conditional
+requests still skip the transfer of unchanged bodies.
+"""
+
+import hashlib
+
+from django.http import Http404, JsonResponse, StreamingHttpResponse
+from django.urls import reverse
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
+from django.views import View
+
+from apps.core import export
+from apps.core.counting import cached_count
+from apps.core.pagination import CursorPaginator, InvalidCursor
+from apps.core.routing import ReplicaReadMixin
+from apps.core.search import SEARCHABLE
+from .resources import RESOURCES, FieldError, get_queryset, select_fields, serialize, value_paths
+
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+
+
+def error(message, status=400):
+    return JsonResponse({'error': message}, status=status)
+
+
+class APIView(ReplicaReadMixin, View):
+    """
+    Base view: GET/HEAD only, resource lookup and conditional responses
+    """
+    http_method_names = ['get', 'head', 'options']
+
+    def get_resource(self):
+        conf = RESOURCES.get(self.kwargs['resource'])
+        if conf is None:
+            raise Http404('Unknown resource.')
+        return conf
+
+    def make_etag(self, content):
+        # Weak: the same JSON may be encoded differently across releases
+        return 'W/' + quote_etag(hashlib.sha1(content).hexdigest())
+
+    def conditional(self, build):
+        """
+        Return the response from ``build()`` with an ETag over its body, or
+        304 when the client's If-None-Match matches it
+        """
+        response = build()
+        if response.status_code != 200:
+            return response
+        etag = self.make_etag(response.content)
+        response['ETag'] = etag
+        return get_conditional_response(self.request, etag=etag, response=response)
+
+    def dispatch(self, request, *args, **kwargs):
+        try:
+            response = super().dispatch(request, *args, **kwargs)
+        except Http404 as exc:
+            response = error(str(exc) or 'Not found.', status=404)
+        response.setdefault('Cache-Control', 'no-cache')
+        return response
+
+
+class APIIndexView(APIView):
+    """
+    List available resources
+    """
+
+    def get(self, request, *args, **kwargs):
+        return JsonResponse({
+            name: request.build_absolute_uri(reverse('api:list', kwargs={'resource': name}))
+            for name in RESOURCES
+        })
+
+
+class ResourceListView(APIView):
+    """
+    Keyset-paginated list: ``?fields=a,b&limit=n&cursor=...`` plus the
+    resource's filters (e.g. ``?category=writing``)
+    """
+
+    def get(self, request, *args, **kwargs):
+        conf = self.get_resource()
+        try:
+            names = select_fields(conf, request.GET.get('fields'))
+            limit = min(max(int(request.GET.get('limit', DEFAULT_LIMIT)), 1), MAX_LIMIT)
+        except FieldError as exc:
+            return error(str(exc))
+        except ValueError:
+            return error('limit must be an integer.')
+
+        queryset = get_queryset(conf)
+        for param, lookup in conf['filters'].items():
+            value = request.GET.get(param)
+            if value:
+                queryset = queryset.filter(**{lookup: value})
+
+        # Bounded and cached per query, invalidated when the model changes
+        count, count_is_lower_bound = cached_count(queryset)
+
+        def build():
+            paginator = CursorPaginator(queryset.values(*value_paths(conf, names)), limit, conf['ordering'])
+            page = paginator.page(request.GET.get('cursor') or None)
+            return JsonResponse({
+                'count': count,
+                'count_is_lower_bound': count_is_lower_bound,
+                'next': self.page_url(page.next_cursor),
+                'previous': self.page_url(page.previous_cursor),
+                'results': [serialize(conf, row, names) for row in page],
+            })
+
+        try:
+            return self.conditional(build)
+        except InvalidCursor:
+            return error('Invalid cursor.')
+
+    def page_url(self, cursor):
+        if cursor is None:
+            return None
+        params = self.request.GET.copy()
+        params['cursor'] = cursor
+        return self.request.build_absolute_uri(f'{self.request.path}?{params.urlencode()}')
+
+
+class ResourceDetailView(APIView):
+    """
+    Single object by slug
+    """
+
+    def get(self, request, *args, **kwargs):
+        conf = self.get_resource()
+        try:
+            names = select_fields(conf, request.GET.get('fields'))
+        except FieldError as exc:
+            return error(str(exc))
+
+        queryset = get_queryset(conf).filter(slug=self.kwargs['slug'])
+
+        def build():
+            row = queryset.values(*value_paths(conf, names)).first()
+            if row is None:
+                return error('Not found.', status=404)
+            return JsonResponse(serialize(conf, row, names))
+
+        return self.conditional(build)
+
+
+class ExportView(View):
+    """
+    Staff-only streaming export: ``?format=ndjson|csv&gzip=1&updated_since=``
+    """
+    http_method_names = ['get']
+
+    def get(self, request, *args, **kwargs):
+        if not request.user.is_authenticated:
+            return error('Authentication required.', status=401)
+        if not request.user.is_staff:
+            return error('Staff access required.', status=403)
+
+        kind = self.kwargs['kind']
+        if kind not in SEARCHABLE:
+            return error('Unknown export.', status=404)
+        fmt = request.GET.get('format', 'ndjson')
+        if fmt not in export.FORMATS:
+            return error(f"format must be one of: {', '.join(export.FORMATS)}.")
+        updated_since = None
+        if request.GET.get('updated_since'):
+            updated_since = export.parse_since(request.GET['updated_since'])
+            if updated_since is None:
+                return error('updated_since must be an ISO 8601 date or datetime.')
+        compress = request.GET.get('gzip') in ('1', 'true')
+
+        response = StreamingHttpResponse(
+            export.stream(kind, fmt, updated_since, compress),
+            content_type='application/gzip' if compress else export.FORMATS[fmt][0],
+        )
+        response['Content-Disposition'] = f'attachment; filename="{export.filename(kind, fmt, compress)}"'
+        response['Cache-Control'] = 'no-store'
+        return response
@@ -4,6 +4,7 @@ Django Admin configuration for Blog app
 
 from django.contrib import admin
 from .models import BlogCategory, BlogPost, BlogComment
+from apps.core.counting import CachedCountPaginator
 
 
 @admin.register(BlogCategory)
@@ -21,6 +22,8 @@ class BlogPostAdmin(admin.ModelAdmin):
     prepopulated_fields = {'slug': ('title',)}
     list_editable = ['status', 'is_featured']
     readonly_fields = ['views', 'created_at', 'updated_at']
+    paginator = CachedCountPaginator
+    show_full_result_count = False
     date_hierarchy = 'published_at'
     
     fieldsets = (
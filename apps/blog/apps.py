@@ -4,3 +4,24 @@ from django.apps import AppConfig
 class BlogConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.blog'
+
+    def ready(self):
+        from django.db.models.signals import post_save, post_delete, pre_delete, pre_save
+        from apps.core.page_cache import purge_object
+        from . import comments
+        from .models import BlogComment, BlogPost
+
+        # Register cached context fragments and their invalidation signals
+        from . import fragments  # noqa: F401
+
+        # New or moderated comments change the cached post page
+        def purge_post_page(sender, instance, **kwargs):
+            purge_object(BlogPost, instance.post.slug)
+
+        post_save.connect(purge_post_page, sender=BlogComment, weak=False, dispatch_uid='blog.pagecache.comment.save')
+        post_delete.connect(purge_post_page, sender=BlogComment, weak=False, dispatch_uid='blog.pagecache.comment.delete')
+
+        # Denormalized approved comment count
+        pre_save.connect(comments.remember_state, sender=BlogComment, dispatch_uid='blog.comments.pre_save')
+        post_save.connect(comments.comment_saved, sender=BlogComment, dispatch_uid='blog.comments.save')
+        pre_delete.connect(comments.comment_deleted, sender=BlogComment, dispatch_uid='blog.comments.delete')
@@ -0,0 +1,68 @@
+"""
+Blog comment threads
+
+Approved comments are served newest first in keyset pages (see
+apps.core.pagination) using the (post, is_approved, -created_at) index.
+``BlogPost.comment_count`` counts approved comments and is kept current
+with F() deltas when comments are added, approved/unapproved or deleted.
+"""
+
+from django.conf import settings
+from django.db.models import F
+from django.db.models.functions import Greatest
+
+from apps.core.pagination import CursorPaginator
+from .models import BlogComment, BlogPost
+
+
+COMMENT_ORDERING = ('-created_at', '-id')
+
+
+def per_page():
+    return getattr(settings, 'BLOG_COMMENTS_PER_PAGE', 20)
+
+
+def approved_comments(post_filter):
+    return BlogComment.objects.filter(is_approved=True, **post_filter).select_related('author')
+
+
+def first_page(post):
+    """Return the first CursorPage of a post's approved comments"""
+    return CursorPaginator(approved_comments({'post': post}), per_page(), COMMENT_ORDERING).page()
+
+
+def adjust_count(post_id, delta):
+    if post_id is not None and delta:
+        BlogPost.objects.filter(pk=post_id).update(comment_count=Greatest(F('comment_count') + delta, 0))
+
+
+def stored_state(instance):
+    return BlogComment.objects.filter(pk=instance.pk).values('post_id', 'is_approved').first()
+
+
+def remember_state(sender, instance, raw=False, **kwargs):
+    """``pre_save``: load the stored row so ``post_save`` can compute the delta"""
+    instance._comment_state = None
+    if not raw and not instance._state.adding and instance.pk is not None:
+        instance._comment_state = stored_state(instance)
+
+
+def comment_saved(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    old = getattr(instance, '_comment_state', None) or {'post_id': None, 'is_approved': False}
+    instance._comment_state = None
+    if old['post_id'] == instance.post_id:
+        adjust_count(instance.post_id, int(instance.is_approved) - int(old['is_approved']))
+        return
+    if old['is_approved']:
+        adjust_count(old['post_id'], -1)
+    if instance.is_approved:
+        adjust_count(instance.post_id, 1)
+
+
+def comment_deleted(sender, instance, **kwargs):
+    """``pre_delete``: the instance may be stale, so use the stored row"""
+    old = stored_state(instance)
+    if old is not None and old['is_approved']:
+        adjust_count(old['post_id'], -1)
@@ -4,6 +4,7 @@ Forms for Blog app
 
 from django import forms
 from .models import BlogPost, BlogComment
+from apps.core.tags import parse_tags
 
 
 class BlogPostForm(forms.ModelForm):
@@ -48,11 +49,7 @@ class BlogPostForm(forms.ModelForm):
         }
     
     def clean_tags(self):
-        tags = self.cleaned_data.get('tags', '')
-        if tags:
-            tag_list = [tag.strip() for tag in tags.split(',') if tag.strip()]
-            return ', '.join(tag_list)
-        return tags
+        return ', '.join(parse_tags(self.cleaned_data.get('tags', '')))
 
 
 class BlogCommentForm(forms.ModelForm):
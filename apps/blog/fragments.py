@@ -0,0 +1,22 @@
+"""
+Cached context fragments for Blog app
+"""
+
+from apps.core import fragments, trending
+from .models import BlogCategory, BlogPost
+
+
+@fragments.register('blog:categories', depends_on=['blog.BlogCategory'])
+def categories():
+    return list(BlogCategory.objects.all())
+
+
+@fragments.register('blog:featured', depends_on=['blog.BlogPost'])
+def featured_posts():
+    return list(BlogPost.objects.filter(status='published', is_featured=True).select_related('author', 'category')[:3])
+
+
+@fragments.register('blog:trending', depends_on=['blog.BlogPost'], timeout=trending.widget_timeout)
+def trending_posts():
+    # Invalidated by update_trending; expires in case that misses this process
+    return trending.top('blog')
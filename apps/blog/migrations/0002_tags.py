@@ -0,0 +1,60 @@
+# Generated by Django 5.0 on 2026-10-18 20:30
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, F
+from django.utils.text import slugify
+
+
+def backfill_tags(apps, schema_editor):
+    """Create Tag rows and links from the existing comma-separated strings"""
+    BlogPost = apps.get_model('blog', 'BlogPost')
+    BlogPostTag = apps.get_model('blog', 'BlogPostTag')
+    Tag = apps.get_model('core', 'Tag')
+
+    tags = {tag.slug: tag for tag in Tag.objects.all()}
+    links = []
+    for pk, value in BlogPost.objects.exclude(tags='').values_list('pk', 'tags').iterator():
+        slugs = set()
+        for name in value.split(','):
+            name = ' '.join(name.split())[:50]
+            slug = slugify(name, allow_unicode=True)
+            if not slug or slug in slugs:
+                continue
+            slugs.add(slug)
+            if slug not in tags:
+                tags[slug] = Tag.objects.create(name=name, slug=slug)
+            links.append(BlogPostTag(post_id=pk, tag_id=tags[slug].pk))
+    BlogPostTag.objects.bulk_create(links, batch_size=500, ignore_conflicts=True)
+
+    counts = BlogPostTag.objects.values('tag').annotate(total=Count('id'))
+    for row in counts:
+        Tag.objects.filter(pk=row['tag']).update(usage_count=F('usage_count') + row['total'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0001_initial'),
+        ('core', '0002_tag'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BlogPostTag',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tag_links', to='blog.blogpost')),
+                ('tag', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='post_links', to='core.tag')),
+            ],
+            options={
+                'unique_together': {('tag', 'post')},
+            },
+        ),
+        migrations.AddField(
+            model_name='blogpost',
+            name='tag_set',
+            field=models.ManyToManyField(blank=True, related_name='blog_posts', through='blog.BlogPostTag', to='core.tag'),
+        ),
+        migrations.RunPython(backfill_tags, migrations.RunPython.noop),
+    ]
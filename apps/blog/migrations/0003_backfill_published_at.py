@@ -0,0 +1,19 @@
+from django.db import migrations
+from django.db.models import F
+
+
+def backfill_published_at(apps, schema_editor):
+    """Published posts without a publish date get their creation date"""
+    BlogPost = apps.get_model('blog', 'BlogPost')
+    BlogPost.objects.filter(status='published', published_at__isnull=True).update(published_at=F('created_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0002_tags'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_published_at, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.0 on 2026-10-18 20:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0003_backfill_published_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RelatedBlogPost',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField()),
+                ('source', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='related_links', to='blog.blogpost')),
+                ('target', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='blog.blogpost')),
+            ],
+            options={
+                'ordering': ['-score'],
+                'abstract': False,
+                'indexes': [models.Index(fields=['source', '-score'], name='blog_relate_source__b82dc8_idx')],
+                'unique_together': {('source', 'target')},
+            },
+        ),
+    ]
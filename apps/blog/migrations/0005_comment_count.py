@@ -0,0 +1,34 @@
+# Generated by Django 5.0 on 2026-10-18 20:55
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def backfill_comment_count(apps, schema_editor):
+    BlogPost = apps.get_model('blog', 'BlogPost')
+    BlogComment = apps.get_model('blog', 'BlogComment')
+    counts = BlogComment.objects.filter(is_approved=True).values('post_id').annotate(total=Count('id')).order_by()
+    for row in counts:
+        BlogPost.objects.filter(pk=row['post_id']).update(comment_count=row['total'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0004_related'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='blogpost',
+            name='comment_count',
+            field=models.PositiveIntegerField(default=0, help_text='Approved comments (maintained automatically)'),
+        ),
+        migrations.AddIndex(
+            model_name='blogcomment',
+            index=models.Index(fields=['post', 'is_approved', '-created_at'], name='blog_blogco_post_id_024d5f_idx'),
+        ),
+        migrations.RunPython(backfill_comment_count, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.0 on 2026-10-18 21:25
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0005_comment_count'),
+        ('core', '0002_tag'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='blogpost',
+            name='trending_base',
+            field=models.FloatField(default=0, editable=False, help_text='Weighted engagement counters at the last trending update'),
+        ),
+        migrations.AddField(
+            model_name='blogpost',
+            name='trending_score',
+            field=models.FloatField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='blogpost',
+            name='trending_updated_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='blogpost',
+            index=models.Index(fields=['status', '-trending_score', '-published_at'], name='blog_blogpo_status_8f3723_idx'),
+        ),
+    ]
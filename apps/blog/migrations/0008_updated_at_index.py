@@ -0,0 +1,20 @@
+# Generated by Django 5.0 on 2026-10-18 22:09
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0007_trending_dirty'),
+        ('core', '0004_resync_tags'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='blogpost',
+            index=models.Index(fields=['updated_at'], name='blog_blogpo_updated_aa1fa3_idx'),
+        ),
+    ]
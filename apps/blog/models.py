@@ -5,8 +5,14 @@ Models for Blog app
 from django.db import models
 from django.contrib.auth.models import User
 from django.urls import reverse
+from django.utils import timezone
 from django.utils.text import slugify
 
+from apps.core.models import RelatedContent
+from apps.core.slugs import unique_slug
+from apps.core.tags import parse_tags
+from apps.core.view_counter import view_counts
+
 
 class BlogCategory(models.Model):
     """
@@ -51,10 +57,18 @@ class BlogPost(models.Model):
     # Classification
     category = models.ForeignKey(BlogCategory, on_delete=models.SET_NULL, null=True, related_name='posts')
     tags = models.CharField(max_length=200, blank=True, help_text="Comma-separated tags")
+    tag_set = models.ManyToManyField('core.Tag', through='BlogPostTag', related_name='blog_posts', blank=True)
     
     # Engagement
     views = models.PositiveIntegerField(default=0)
     likes = models.PositiveIntegerField(default=0)
+    comment_count = models.PositiveIntegerField(default=0, help_text="Approved comments (maintained automatically)")
+    
+    # Trending (maintained by apps.core.trending)
+    trending_score = models.FloatField(default=0, editable=False)
+    trending_base = models.FloatField(default=0, editable=False, help_text="Weighted engagement counters at the last trending update")
+    trending_updated_at = models.DateTimeField(null=True, blank=True, editable=False)
+    trending_dirty = models.BooleanField(default=True, editable=False, help_text="Score may change at the next trending update")
     
     # Status
     status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='draft')
@@ -70,30 +84,43 @@ class BlogPost(models.Model):
         indexes = [
             models.Index(fields=['-published_at']),
             models.Index(fields=['status', '-published_at']),
+            models.Index(fields=['status', '-trending_score', '-published_at']),
+            # The rows the next update_trending run reads
+            models.Index(fields=['id'], condition=models.Q(trending_dirty=True), name='blog_trending_dirty_idx'),
+            # Incremental exports (updated_since) over all rows
+            models.Index(fields=['updated_at']),
         ]
     
+    # Maintained by F() deltas, view count flushes and update_trending only
+    COUNTER_FIELDS = ['views', 'comment_count', 'trending_score', 'trending_base', 'trending_updated_at', 'trending_dirty']
+    
     def save(self, *args, **kwargs):
         if not self.slug:
-            base_slug = slugify(self.title)
-            slug = base_slug
-            counter = 1
-            while BlogPost.objects.filter(slug=slug).exists():
-                slug = f"{base_slug}-{counter}"
-                counter += 1
-            self.slug = slug
+            self.slug = unique_slug(BlogPost, self.title)
+        # Counters only change through their own updates; never write back a stale copy
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.COUNTER_FIELDS
+            ]
+        # Published posts always have a publish date (keyset pagination orders by it)
+        if self.status == 'published' and not self.published_at:
+            self.published_at = timezone.now()
         super().save(*args, **kwargs)
     
     def get_absolute_url(self):
         return reverse('blog:detail', kwargs={'slug': self.slug})
     
     def increment_views(self):
-        self.views += 1
-        self.save(update_fields=['views'])
+        """
+        Buffer a view hit; it is written to the database by the next
+        view count flush. ``self.views`` is updated to include pending hits.
+        """
+        view_counts.record(self)
+        self.views += view_counts.pending(self)
     
     def get_tags_list(self):
-        if self.tags:
-            return [tag.strip() for tag in self.tags.split(',')]
-        return []
+        return parse_tags(self.tags)
     
     def __str__(self):
         return self.title
@@ -111,6 +138,42 @@ class BlogComment(models.Model):
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Keyset pages of a post's approved comments
+            models.Index(fields=['post', 'is_approved', '-created_at']),
+        ]
+    
+    def __str__(self):
+        return f"Comment by {self.author.username} on {self.post.title}"
+
+
+class BlogPostTag(models.Model):
+    """
+    Links a blog post to a shared Tag
+    """
+    post = models.ForeignKey(BlogPost, on_delete=models.CASCADE, related_name='tag_links')
+    tag = models.ForeignKey('core.Tag', on_delete=models.CASCADE, related_name='post_links')
+    
+    class Meta:
+        # Leading tag column makes "items with tag X" an index range scan
+        unique_together = ('tag', 'post')
+    
+    def __str__(self):
+        return f"{self.post} - {self.tag}"
+
+
+class RelatedBlogPost(RelatedContent):
+    """
+    Precomputed related blog post; maintained by apps.core.related
+    """
+    source = models.ForeignKey(BlogPost, on_delete=models.CASCADE, related_name='related_links')
+    target = models.ForeignKey(BlogPost, on_delete=models.CASCADE, related_name='+')
+    
+    class Meta(RelatedContent.Meta):
+        unique_together = ('source', 'target')
+        indexes = [
+            models.Index(fields=['source', '-score']),
+        ]
     
     def __str__(self):
-        return f"Comment by {self.author.username} on {self.post.title}"
\ No newline at end of file
+        return f"{self.source} -> {self.target}"
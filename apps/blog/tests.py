@@ -1,3 +1,111 @@
-from django.test import TestCase
+"""
+Query budgets for the blog views, comment counts and comment pages
+"""
 
-# Create your tests here.
+import re
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from apps.core.testing import QueryBudgetMixin
+from .models import BlogComment, BlogPost
+
+
+class BlogQueryBudgetTests(QueryBudgetMixin, TestCase):
+    budgets = {
+        'blog:list': {'anonymous': 5, 'user': 7},
+        'blog:list_fragment': {'anonymous': 4, 'user': 5},
+        'blog:detail': {'args': lambda data: [data['post'].slug], 'anonymous': 3, 'user': 5},
+        'blog:comments': {'args': lambda data: [data['post'].slug], 'anonymous': 1, 'user': 2},
+        'blog:create': {'anonymous': 0, 'user': 3},
+        'blog:my_posts': {'anonymous': 0, 'user': 3},
+        'blog:add_comment': {
+            'method': 'post',
+            'args': lambda data: [data['post'].slug],
+            'data': {'content': 'Thanks for writing this up.'},
+            'anonymous': 0,
+            'user': 5,
+        },
+    }
+
+
+class CommentCountTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user('author', 'author@example.com', 'pass-123-xyz')
+        cls.post, cls.other = [
+            BlogPost.objects.create(title=title, excerpt='e', content='c', author=cls.author, status='published')
+            for title in ('First', 'Second')
+        ]
+
+    def counts(self):
+        return dict(BlogPost.objects.values_list('title', 'comment_count'))
+
+    def test_deltas(self):
+        comment = BlogComment.objects.create(post=self.post, author=self.author, content='a')
+        BlogComment.objects.create(post=self.post, author=self.author, content='b', is_approved=False)
+        self.assertEqual(self.counts(), {'First': 1, 'Second': 0})
+
+        comment.is_approved = False
+        comment.save()
+        self.assertEqual(self.counts(), {'First': 0, 'Second': 0})
+
+        comment.is_approved = True
+        comment.post = self.other
+        comment.save()
+        self.assertEqual(self.counts(), {'First': 0, 'Second': 1})
+
+        # A stale instance: deletion uses the stored row
+        BlogComment.objects.get(pk=comment.pk).delete()
+        comment.delete()
+        self.assertEqual(self.counts(), {'First': 0, 'Second': 0})
+
+    def test_save_keeps_counters(self):
+        stale = BlogPost.objects.get(pk=self.post.pk)
+        BlogComment.objects.create(post=self.post, author=self.author, content='a')
+        BlogPost.objects.filter(pk=self.post.pk).update(views=7, trending_score=2.5, trending_base=9.0)
+
+        stale.title = 'Renamed'
+        stale.save()
+        stored = BlogPost.objects.get(pk=self.post.pk)
+        self.assertEqual(stored.title, 'Renamed')
+        self.assertEqual(
+            (stored.comment_count, stored.views, stored.trending_score, stored.trending_base),
+            (1, 7, 2.5, 9.0),
+        )
+
+
+@override_settings(BLOG_COMMENTS_PER_PAGE=10)
+class CommentPageTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        author = User.objects.create_user('author', 'author@example.com', 'pass-123-xyz')
+        cls.post = BlogPost.objects.create(title='Post', excerpt='e', content='c', author=author, status='published')
+        for i in range(25):
+            BlogComment.objects.create(post=cls.post, author=author, content=f'Comment {i}')
+        BlogComment.objects.create(post=cls.post, author=author, content='Comment hidden', is_approved=False)
+
+    def pages(self, slug):
+        url = reverse('blog:comments', args=[slug])
+        params, pages = {}, []
+        while True:
+            data = self.client.get(url, params).json()
+            pages.append(re.findall(r'Comment (\w+)', data['html']))
+            if not data['has_next']:
+                return pages
+            params['cursor'] = data['next_cursor']
+
+    def test_walks_approved_comments_newest_first(self):
+        pages = self.pages(self.post.slug)
+        self.assertEqual([len(page) for page in pages], [10, 10, 5])
+        self.assertEqual(sum(pages, []), [str(i) for i in reversed(range(25))])
+
+    def test_unpublished_post_has_no_comments(self):
+        BlogPost.objects.filter(pk=self.post.pk).update(status='draft')
+        self.assertEqual(self.pages(self.post.slug), [[]])
+        self.assertEqual(self.pages('missing'), [[]])
+
+    def test_bad_cursor(self):
+        response = self.client.get(reverse('blog:comments', args=[self.post.slug]), {'cursor': 'nope'})
+        self.assertEqual(response.status_code, 404)
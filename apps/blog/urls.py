@@ -10,6 +10,7 @@ app_name = 'blog'
 urlpatterns = [
     # Blog list and detail
     path('', views.BlogListView.as_view(), name='list'),
+    path('more/', views.BlogListView.as_view(response_format='fragment'), name='list_fragment'),
     path('post/<slug:slug>/', views.BlogDetailView.as_view(), name='detail'),
     
     # Create post
@@ -20,4 +21,5 @@ urlpatterns = [
     
     # Comments
     path('post/<slug:slug>/comment/', views.AddCommentView.as_view(), name='add_comment'),
+    path('post/<slug:slug>/comments/', views.BlogCommentListView.as_view(), name='comments'),
 ]
\ No newline at end of file
@@ -5,56 +5,75 @@ Class-Based Views for Blog app
 from django.views.generic import ListView, DetailView, CreateView
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib import messages
+from django.shortcuts import get_object_or_404, redirect
 from django.urls import reverse_lazy
-from django.db.models import Q
 from django.utils import timezone
 
-from .models import BlogPost, BlogCategory, BlogComment
+from .models import BlogPost, BlogComment
 from .forms import BlogPostForm, BlogCommentForm
+from . import comments
+from apps.core import fragments, related, search
+from apps.core.counting import CachedCountPaginator
+from apps.core.page_cache import AnonymousPageCacheMixin
+from apps.core.pagination import CursorPaginationMixin
+from apps.core.routing import ReplicaReadMixin
+from apps.core.view_counter import view_counts
 
 
-class BlogListView(ListView):
+class BlogListView(ReplicaReadMixin, AnonymousPageCacheMixin, CursorPaginationMixin, ListView):
     """
     Display list of published blog posts
     """
     model = BlogPost
     template_name = 'blog/blog_list.html'
+    fragment_template_name = 'blog/includes/post_cards.html'
     context_object_name = 'posts'
     paginate_by = 9
+    paginator_class = CachedCountPaginator
+    cursor_ordering = ('-published_at', '-id')
+    
+    def can_use_cursor(self):
+        return not self.request.GET.get('search')
     
     def get_queryset(self):
         queryset = BlogPost.objects.filter(status='published').select_related('author', 'category')
         
-        # Search
+        # Search (full-text index, ranked by relevance)
         search_query = self.request.GET.get('search', '')
+        self.search_snippets = {}
         if search_query:
-            queryset = queryset.filter(
-                Q(title__icontains=search_query) |
-                Q(excerpt__icontains=search_query) |
-                Q(content__icontains=search_query) |
-                Q(tags__icontains=search_query)
-            )
+            queryset, self.search_snippets = search.ranked_queryset(queryset, 'blog', search_query)
         
         # Filter by category
         category_slug = self.request.GET.get('category', '')
         if category_slug:
             queryset = queryset.filter(category__slug=category_slug)
         
+        # Filter by tag (indexed join through the tag link table)
+        tag_slug = self.request.GET.get('tag', '')
+        if tag_slug:
+            queryset = queryset.filter(tag_set__slug=tag_slug)
+        
+        if search_query:
+            return queryset
         return queryset.order_by('-published_at')
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['categories'] = BlogCategory.objects.all()
-        context['featured_posts'] = BlogPost.objects.filter(
-            status='published', 
-            is_featured=True
-        )[:3]
+        context['categories'] = fragments.get('blog:categories')
+        context['featured_posts'] = fragments.get('blog:featured')
+        context['trending_posts'] = fragments.get('blog:trending')
         context['search_query'] = self.request.GET.get('search', '')
         context['selected_category'] = self.request.GET.get('category', '')
+        context['selected_tag'] = self.request.GET.get('tag', '')
+        
+        # Include buffered views that have not been flushed yet
+        view_counts.apply_pending(context['posts'])
+        search.attach_snippets(context['posts'], self.search_snippets)
         return context
 
 
-class BlogDetailView(DetailView):
+class BlogDetailView(ReplicaReadMixin, AnonymousPageCacheMixin, DetailView):
     """
     Display single blog post with comments
     """
@@ -75,18 +94,17 @@ class BlogDetailView(DetailView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         
-        # Get approved comments
-        context['comments'] = self.object.comments.filter(is_approved=True).select_related('author')
-        context['comments_count'] = context['comments'].count()
+        # First page of approved comments; later pages load from blog:comments
+        comments_page = comments.first_page(self.object)
+        context['comments'] = comments_page.object_list
+        context['comments_page'] = comments_page
+        context['comments_count'] = self.object.comment_count
         
         # Comment form
         context['comment_form'] = BlogCommentForm()
         
-        # Related posts
-        context['related_posts'] = BlogPost.objects.filter(
-            category=self.object.category,
-            status='published'
-        ).exclude(id=self.object.id)[:3]
+        # Precomputed related posts (shared tags, category, recency)
+        context['related_posts'] = related.get_related(self.object, limit=3)
         
         return context
 
@@ -122,7 +140,7 @@ class MyBlogPostsView(LoginRequiredMixin, ListView):
     paginate_by = 10
     
     def get_queryset(self):
-        return BlogPost.objects.filter(author=self.request.user).order_by('-created_at')
+        return BlogPost.objects.filter(author=self.request.user).select_related('category').order_by('-created_at')
 
 
 class AddCommentView(LoginRequiredMixin, CreateView):
@@ -131,13 +149,37 @@ class AddCommentView(LoginRequiredMixin, CreateView):
     """
     model = BlogComment
     form_class = BlogCommentForm
+    http_method_names = ['post']
     
     def form_valid(self, form):
-        post = BlogPost.objects.get(slug=self.kwargs['slug'])
+        post = get_object_or_404(BlogPost, slug=self.kwargs['slug'], status='published')
         form.instance.post = post
         form.instance.author = self.request.user
         messages.success(self.request, 'Comment added successfully!')
         return super().form_valid(form)
     
+    def form_invalid(self, form):
+        # Comments are posted from the post page; there is no separate form page
+        messages.error(self.request, 'Your comment could not be posted.')
+        return redirect(self.get_success_url())
+    
     def get_success_url(self):
-        return reverse_lazy('blog:detail', kwargs={'slug': self.kwargs['slug']})
\ No newline at end of file
+        return reverse_lazy('blog:detail', kwargs={'slug': self.kwargs['slug']})
+
+
+class BlogCommentListView(ReplicaReadMixin, CursorPaginationMixin, ListView):
+    """
+    JSON fragment endpoint serving keyset pages of a post's approved comments
+    """
+    model = BlogComment
+    fragment_template_name = 'blog/includes/comments.html'
+    context_object_name = 'comments'
+    response_format = 'fragment'
+    cursor_ordering = comments.COMMENT_ORDERING
+    
+    def get_paginate_by(self, queryset):
+        return comments.per_page()
+    
+    def get_queryset(self):
+        # Joins on the unique slug; unknown or unpublished posts give an empty page
+        return comments.approved_comments({'post__slug': self.kwargs['slug'], 'post__status': 'published'})
@@ -1,3 +1,14 @@
+"""
+Django Admin configuration for Core app
+"""
+
 from django.contrib import admin
+from .models import Tag
+
 
-# Register your models here.
+@admin.register(Tag)
+class TagAdmin(admin.ModelAdmin):
+    list_display = ['name', 'slug', 'usage_count', 'created_at']
+    search_fields = ['name']
+    prepopulated_fields = {'slug': ('name',)}
+    readonly_fields = ['usage_count', 'created_at']
@@ -1,6 +1,61 @@
-from django.apps import AppConfig
+from django.apps import AppConfig, apps
 
 
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.core'
+
+    def ready(self):
+        from django.core.signals import request_finished
+        from django.db.backends.signals import connection_created
+        from django.db.models.signals import post_save, post_delete, pre_delete, pre_save
+        from . import counting, db, images, page_cache, related, search, tags, trending
+        from .view_counter import flush_if_due, views_flushed
+
+        # Per-connection SQLite pragmas (SQLITE_PRAGMAS)
+        connection_created.connect(db.configure_sqlite, dispatch_uid='core.sqlite_pragmas')
+
+        # Flush buffered view counts after the response has been sent
+        request_finished.connect(flush_if_due, dispatch_uid='core.flush_view_counts')
+
+        # Keep the search index in sync with content changes
+        for kind in search.SEARCHABLE:
+            model = search.get_model(kind)
+            post_save.connect(search.update_search_index, sender=model, dispatch_uid=f'core.search.{kind}.save')
+            post_delete.connect(search.remove_from_search_index, sender=model, dispatch_uid=f'core.search.{kind}.delete')
+
+        # Mirror comma-separated tag strings into the shared Tag table
+        for kind in search.SEARCHABLE:
+            model = search.get_model(kind)
+            pre_save.connect(tags.remember_published, sender=model, dispatch_uid=f'core.tags.{kind}.pre_save')
+            post_save.connect(tags.sync_tags_on_save, sender=model, dispatch_uid=f'core.tags.{kind}.save')
+            pre_delete.connect(tags.release_tags_on_delete, sender=model, dispatch_uid=f'core.tags.{kind}.delete')
+
+        # Recompute precomputed related items once tags are in sync
+        for kind in search.SEARCHABLE:
+            model = search.get_model(kind)
+            post_save.connect(related.schedule_refresh, sender=model, dispatch_uid=f'core.related.{kind}.save')
+
+        # Content changes invalidate cached list counts
+        for kind in search.SEARCHABLE:
+            model = search.get_model(kind)
+            post_save.connect(counting.bump_count_version, sender=model, dispatch_uid=f'core.counts.{kind}.save')
+            post_delete.connect(counting.bump_count_version, sender=model, dispatch_uid=f'core.counts.{kind}.delete')
+
+        # Content changes purge cached anonymous pages
+        for kind in search.SEARCHABLE:
+            model = search.get_model(kind)
+            pre_save.connect(page_cache.remember_slug, sender=model, dispatch_uid=f'core.pagecache.{kind}.pre_save')
+            post_save.connect(page_cache.purge_on_change, sender=model, dispatch_uid=f'core.pagecache.{kind}.save')
+            post_delete.connect(page_cache.purge_on_change, sender=model, dispatch_uid=f'core.pagecache.{kind}.delete')
+
+        # Flag objects whose trending score may change for the next update_trending run
+        for kind in trending.TRENDING:
+            model = search.get_model(kind)
+            pre_save.connect(trending.flag_full_save, sender=model, dispatch_uid=f'core.trending.{kind}.pre_save')
+            post_save.connect(trending.counters_saved, sender=model, dispatch_uid=f'core.trending.{kind}.save')
+        views_flushed.connect(trending.views_flushed, dispatch_uid='core.trending.views_flushed')
+
+        # Render responsive image sizes for new uploads
+        for label in images.IMAGE_FIELDS:
+            post_save.connect(images.image_saved, sender=apps.get_model(label), dispatch_uid=f'core.images.{label}.save')
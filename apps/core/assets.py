@@ -0,0 +1,142 @@
+"""
+Static asset bundles and vendored third-party files
+
+``STATIC_BUNDLES`` (settings) maps a bundle name to the static files it
+concatenates, e.g. ``'css/site.css': ['css/style.css', 'css/themes.css']``.
+Bundles are built, minified, fingerprinted and gzipped during
+``collectstatic`` by ``apps.core.storage.BundledManifestStorage``; templates
+include them with ``{% asset_bundle %}``, which falls back to the separate
+source files while ``STATIC_BUNDLES_ENABLED`` is off (development).
+
+Third-party CSS/JS is copied into ``static/vendor/`` by the
+``vendor_assets`` command and referenced with ``{% vendor_asset %}``.
+Until a file has been vendored the tag points at its CDN URL.
+"""
+
+import re
+from functools import lru_cache
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+
+
+BOOTSTRAP_CDN = 'https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist'
+FONTAWESOME_CDN = 'https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.4.0'
+
+# name -> (local static path, CDN URL); files without a name are
+# dependencies (fonts) that are vendored but never included directly
+VENDOR = {
+    'bootstrap.css': ('vendor/bootstrap/css/bootstrap.min.css', f'{BOOTSTRAP_CDN}/css/bootstrap.min.css'),
+    'bootstrap.js': ('vendor/bootstrap/js/bootstrap.bundle.min.js', f'{BOOTSTRAP_CDN}/js/bootstrap.bundle.min.js'),
+    'fontawesome.css': ('vendor/fontawesome/css/all.min.css', f'{FONTAWESOME_CDN}/css/all.min.css'),
+}
+VENDOR_FILES = [
+    *VENDOR.values(),
+    *(
+        (f'vendor/fontawesome/webfonts/{font}.{ext}', f'{FONTAWESOME_CDN}/webfonts/{font}.{ext}')
+        for font in ('fa-brands-400', 'fa-regular-400', 'fa-solid-900', 'fa-v4compatibility')
+        for ext in ('woff2', 'ttf')
+    ),
+]
+
+# Text formats worth storing a precompressed .gz copy of
+COMPRESSIBLE = ('.css', '.js', '.svg', '.json', '.txt', '.map', '.ttf', '.eot', '.ico', '.xml')
+
+
+def get_bundles():
+    return getattr(settings, 'STATIC_BUNDLES', {})
+
+
+def bundles_enabled():
+    return getattr(settings, 'STATIC_BUNDLES_ENABLED', not settings.DEBUG)
+
+
+@lru_cache(maxsize=None)
+def is_vendored(path):
+    return finders.find(path) is not None
+
+
+def vendor_url(name):
+    """Return (static path or None, CDN URL) for a vendored asset"""
+    path, cdn_url = VENDOR[name]
+    return (path if is_vendored(path) else None), cdn_url
+
+
+# Minification: conservative, whitespace and comments only
+
+# Strings and url() are copied verbatim; comments are dropped
+CSS_PROTECTED = re.compile(
+    r"""("(?:[^"\\\n]|\\.)*"|'(?:[^'\\\n]|\\.)*'|url\(\s*(?:"[^"]*"|'[^']*'|[^)'"]*)\s*\)|/\*.*?\*/)""",
+    re.S | re.I,
+)
+CSS_SPACE = re.compile(r'\s+')
+CSS_PUNCTUATION = re.compile(r'\s*([{};,>])\s*')
+CSS_COLON = re.compile(r':\s+')
+
+
+def minify_css(text):
+    code, protected = [''], []
+    for index, part in enumerate(CSS_PROTECTED.split(text)):
+        if index % 2 == 0:
+            code[-1] += part
+        elif not part.startswith('/*'):
+            protected.append(part)
+            code.append('')
+    output = []
+    for index, part in enumerate(code):
+        part = CSS_SPACE.sub(' ', part)
+        part = CSS_PUNCTUATION.sub(r'\1', part)
+        part = CSS_COLON.sub(':', part)
+        output.append(part.replace(';}', '}'))
+        if index < len(protected):
+            output.append(protected[index])
+    return ''.join(output).strip()
+
+
+def minify_js(text):
+    """
+    Drop comments that start a line, blank lines and indentation. Code
+    after a closing ``*/`` is kept, and lines inside multi-line template
+    literals are kept verbatim; code is never rewritten.
+    """
+    lines = []
+    in_template = in_comment = False
+    for line in text.splitlines():
+        if in_template:
+            lines.append(line)
+        else:
+            line = line.strip()
+            if in_comment:
+                end = line.find('*/')
+                if end == -1:
+                    continue
+                in_comment = False
+                line = line[end + 2:].lstrip()
+            while line.startswith('/*'):
+                end = line.find('*/', 2)
+                if end == -1:
+                    in_comment = True
+                    line = ''
+                else:
+                    line = line[end + 2:].lstrip()
+            if not line or line.startswith('//'):
+                continue
+            lines.append(line)
+        if line.count('`') % 2:
+            in_template = not in_template
+    return '\n'.join(lines)
+
+
+def build_bundle(name, sources):
+    """Concatenate and minify the source files of a bundle; returns text"""
+    parts = []
+    for source in sources:
+        path = finders.find(source)
+        if path is None:
+            raise FileNotFoundError(f'Bundle {name}: static file {source!r} not found')
+        with open(path, encoding='utf-8') as handle:
+            parts.append(handle.read())
+    if name.endswith('.css'):
+        return '\n'.join(minify_css(part) for part in parts) + '\n'
+    # Each script is an IIFE; keep them separate statements
+    return '\n;'.join(minify_js(part) for part in parts) + '\n'
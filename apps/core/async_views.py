@@ -0,0 +1,177 @@
+"""
+Async variants of the public read views, for ASGI
+
+An async variant subclasses the sync view and replaces its GET. The object,
+page and count come from the async ORM (``aget``, ``acount``, ``async
+for``). Query building, the page cache and the templates are shared with
+the sync view. Search, fragment builders and template rendering are sync
+code and run through ``sync_to_async``.
+
+``select_view()`` picks the variant for each URL in the URLconf from the
+``ASYNC_READ_VIEWS`` setting (a list of URL names). Keep it empty under
+WSGI, where an async view gets a private event loop per request and only
+adds overhead.
+
+Django's async ORM still runs each query through thread-sensitive
+``sync_to_async``, on the one thread the request's database work is
+pinned to. Pieces awaited with ``gather_dict`` therefore still run one
+after another, not in parallel. The gain is that a request waiting on the
+database no longer holds a worker thread, so one worker serves more
+concurrent requests.
+"""
+
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.paginator import InvalidPage
+from django.http import Http404
+
+from .counting import acached_count
+from .pagination import CursorPaginator, InvalidCursor
+
+
+# URL names that have an async variant
+ASYNC_VIEW_NAMES = [
+    'news:list', 'news:list_fragment', 'news:detail',
+    'prompts:list', 'prompts:list_fragment', 'prompts:detail',
+]
+
+
+def async_read_views():
+    return getattr(settings, 'ASYNC_READ_VIEWS', [])
+
+
+def select_view(name, sync_view, async_view, **initkwargs):
+    """URLconf helper: ``async_view`` when URL ``name`` is in ASYNC_READ_VIEWS"""
+    view = async_view if name in async_read_views() else sync_view
+    return view.as_view(**initkwargs)
+
+
+async def gather_dict(**awaitables):
+    """
+    ``asyncio.gather()`` by keyword; returns {name: result}. Database
+    work inside still runs sequentially on the request's thread.
+    """
+    values = await asyncio.gather(*awaitables.values())
+    return dict(zip(awaitables, values))
+
+
+class AsyncReadMixin:
+    """
+    Async GET for a sync list or detail view; mix in first. Subclasses
+    implement ``aget_context_data()``.
+    """
+    http_method_names = ['get', 'head', 'options']
+
+    async def dispatch(self, request, *args, **kwargs):
+        method = request.method.lower()
+        if method not in self.http_method_names:
+            return await self.http_method_not_allowed(request, *args, **kwargs)
+        return await getattr(self, method)(request, *args, **kwargs)
+
+    async def get(self, request, *args, **kwargs):
+        key, cached = await sync_to_async(self.prepare)()
+        if cached is not None:
+            return cached
+        context = await self.aget_context_data()
+        # Fragment responses render immediately; templates are rendered by the handler
+        response = await sync_to_async(self.render_to_response)(context)
+        if key is not None:
+            await sync_to_async(self.cache_page)(key, response)
+        return response
+
+    def prepare(self):
+        """
+        Resolve the lazy user and session, which may query, and look up the
+        page cache. Runs in a thread.
+        """
+        self.request.session.keys()
+        self.request.user.is_authenticated
+        if hasattr(self, 'get_cached_page'):
+            return self.get_cached_page()
+        return None, None
+
+    async def aget_context_data(self):
+        raise NotImplementedError
+
+    def base_context(self):
+        context = {'view': self}
+        if self.extra_context is not None:
+            context.update(self.extra_context)
+        return context
+
+
+class AsyncListMixin(AsyncReadMixin):
+    """Async pagination for ListView subclasses"""
+
+    async def aget_queryset(self):
+        # get_queryset() may run a full-text search
+        queryset = await sync_to_async(self.get_queryset)()
+        self.object_list = queryset
+        return queryset
+
+    async def apaginate(self, queryset):
+        """
+        Async paginate_queryset(); returns the pagination part of the
+        ListView context
+        """
+        page_size = self.get_paginate_by(queryset)
+        if hasattr(self, 'use_cursor_pagination') and self.use_cursor_pagination():
+            paginator = CursorPaginator(queryset, page_size, self.cursor_ordering)
+            try:
+                page = await paginator.apage(self.request.GET.get('cursor') or None)
+            except InvalidCursor:
+                raise Http404('Invalid cursor.')
+        else:
+            paginator = self.get_paginator(
+                queryset, page_size, orphans=self.get_paginate_orphans(),
+                allow_empty_first_page=self.get_allow_empty(),
+            )
+            paginator.count, paginator.count_is_lower_bound = await acached_count(queryset)
+            page = paginator.page(self.get_page_number(paginator))
+            page.object_list = [obj async for obj in page.object_list]
+
+        object_list = page.object_list
+        context = self.base_context()
+        context.update({
+            'paginator': paginator,
+            'page_obj': page,
+            'is_paginated': page.has_other_pages(),
+            'object_list': object_list,
+            self.get_context_object_name(queryset): object_list,
+        })
+        return context
+
+    def get_page_number(self, paginator):
+        page = self.kwargs.get(self.page_kwarg) or self.request.GET.get(self.page_kwarg) or 1
+        try:
+            number = int(page)
+        except ValueError:
+            if page != 'last':
+                raise Http404('Page is not “last”, nor can it be converted to an int.')
+            number = paginator.num_pages
+        try:
+            return paginator.validate_number(number)
+        except InvalidPage as exc:
+            raise Http404(f'Invalid page ({number}): {exc}')
+
+
+class AsyncDetailMixin(AsyncReadMixin):
+    """Async object lookup for DetailView subclasses (slug URLs)"""
+
+    async def aget_object(self):
+        queryset = self.get_queryset()
+        slug = self.kwargs.get(self.slug_url_kwarg)
+        try:
+            return await queryset.aget(**{self.get_slug_field(): slug})
+        except queryset.model.DoesNotExist:
+            raise Http404(f'No {queryset.model._meta.verbose_name} found matching the query')
+
+    def object_context(self):
+        context = self.base_context()
+        context['object'] = self.object
+        name = self.get_context_object_name(self.object)
+        if name:
+            context[name] = self.object
+        return context
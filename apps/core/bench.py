@@ -0,0 +1,636 @@
+"""
+Latency benchmarks
+
+``build_dataset()`` fills an empty database with a deterministic synthetic
+dataset: the same ``scale`` and ``seed`` always give the same users,
+categories, titles, tags, bookmarks and comments. Rows are written with
+``bulk_create`` in chunks; tag links, the search index, related items,
+comment counts and profile counters are filled in the same way
+``import_content`` does it, and trending scores are computed once.
+
+``run()`` requests each scenario in ``SCENARIOS`` through the test client
+and returns latency percentiles, queries per request and throughput as a
+JSON-serializable dict; ``compare()`` diffs two such results.
+``run_asgi()`` sends the same requests through the ASGI application with
+several clients in flight, to compare the sync and async read views
+(``ASYNC_READ_VIEWS``) under concurrency.
+
+Scenarios are keyed by name::
+
+    SCENARIOS = {
+        'prompt_detail': {'url': 'prompts:detail', 'args': lambda targets: [targets.pick('prompt')]},
+    }
+
+``query`` (a dict or a callable taking the targets) adds a query string;
+``login`` requests the page as a logged-in user.
+Detail scenarios rotate through a seeded sample of objects so one hot row
+does not stand in for the whole table.
+"""
+
+import asyncio
+import copy
+import logging
+import platform
+import random
+import re
+import statistics
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+from urllib.parse import urlencode
+
+import django
+from django.contrib.auth.hashers import make_password
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connections, transaction
+from django.test import Client
+from django.test.utils import (
+    override_settings, setup_databases, setup_test_environment, teardown_databases, teardown_test_environment,
+)
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.text import slugify
+
+from . import related, tags, trending
+from .async_views import async_read_views
+from .search import get_search_backend, is_published
+from .slugs import SlugAllocator
+
+
+SCALES = {'k': 1000, 'm': 1000000}
+
+# Rows per bulk insert transaction
+CHUNK_SIZE = 5000
+
+# Objects sampled per target pool
+TARGET_SAMPLE = 200
+
+WORDS = (
+    'write code email story summary marketing python research essay blog '
+    'product image poem review plan outline debug explain translate analyze '
+    'creative business data legal science teacher student health travel '
+    'finance design social video script resume interview recipe game music'
+).split()
+
+PROMPT_CATEGORIES = ['Writing', 'Coding', 'Marketing', 'Business', 'Education', 'Research',
+                     'Images', 'Productivity', 'Data', 'Design', 'Health', 'Travel']
+BLOG_CATEGORIES = ['Guides', 'Tutorials', 'Announcements', 'Opinion', 'Case Studies', 'Tips']
+NEWS_CATEGORIES = ['AI', 'Industry', 'Research', 'Policy', 'Products', 'Community']
+
+PASSWORD = 'bench-pass-123'
+
+
+def parse_scale(value):
+    """'10k' -> 10000, '1m' -> 1000000, '2500' -> 2500"""
+    value = str(value).strip().lower()
+    multiplier = SCALES.get(value[-1:], 1)
+    if value[-1:] in SCALES:
+        value = value[:-1]
+    scale = int(float(value) * multiplier)
+    if scale < 1:
+        raise ValueError('scale must be positive')
+    return scale
+
+
+def dataset_counts(scale):
+    """Row counts for ``scale`` prompts"""
+    blog_posts = max(scale // 10, 20)
+    return {
+        'users': max(scale // 50, 20),
+        'prompts': scale,
+        'blog_posts': blog_posts,
+        'comments': blog_posts * 5,
+        'news': max(scale // 10, 20),
+        'bookmarks': scale // 2,
+    }
+
+
+def dataset_exists(counts):
+    from apps.prompts.models import Prompt
+    return Prompt.objects.count() == counts['prompts']
+
+
+@contextmanager
+def bench_database(keepdb=False, verbosity=1):
+    """
+    Run the block against a throwaway test database. SQLite uses a file
+    (``bench.sqlite3`` unless ``TEST['NAME']`` is set), like production
+    and so that ``keepdb`` can keep the dataset between runs.
+    """
+    settings_dict = connections['default'].settings_dict
+    if settings_dict['ENGINE'] == 'django.db.backends.sqlite3' and not settings_dict['TEST'].get('NAME'):
+        settings_dict['TEST']['NAME'] = str(settings.BASE_DIR / 'bench.sqlite3')
+    setup_test_environment(debug=False)
+    old_config = setup_databases(verbosity, interactive=False, keepdb=keepdb)
+    try:
+        yield
+    finally:
+        teardown_databases(old_config, verbosity, keepdb=keepdb)
+        teardown_test_environment()
+
+
+def ensure_dataset(scale, seed=1, keepdb=False, stdout=None):
+    """Build the dataset unless ``keepdb`` kept one of the right size"""
+    counts = dataset_counts(scale)
+    if keepdb and dataset_exists(counts):
+        if stdout is not None:
+            stdout.write('Reusing existing dataset')
+        return counts
+    return build_dataset(scale, seed, stdout)
+
+
+def text(rng, words):
+    return ' '.join(rng.choice(WORDS) for _ in range(words))
+
+
+def tag_string(rng):
+    return ', '.join(rng.sample(WORDS, 3))
+
+
+class DatasetBuilder:
+    """Writes the synthetic dataset; one seeded RNG drives every choice"""
+
+    def __init__(self, scale, seed=1, stdout=None):
+        self.counts = dataset_counts(scale)
+        self.rng = random.Random(seed)
+        self.stdout = stdout
+        self.now = timezone.now()
+
+    def log(self, message):
+        if self.stdout is not None:
+            self.stdout.write(message)
+
+    def build(self):
+        from apps.users import stats as profile_stats
+
+        started = time.monotonic()
+        self.user_ids = self.create_users()
+        self.create_prompts()
+        self.create_blog()
+        self.create_news()
+        self.create_bookmarks()
+
+        self.log('Rebuilding related items, trending scores and profile counters')
+        for kind in related.RELATED:
+            related.rebuild(kind)
+        for kind in trending.TRENDING:
+            trending.update(kind)
+        profile_stats.recount()
+        cache.clear()
+        self.log(f'Dataset built in {time.monotonic() - started:.1f}s')
+        return self.counts
+
+    def insert(self, model, rows, kind=None):
+        """
+        Insert an iterable of unsaved instances in chunks, with tag links
+        and search index entries; yields each saved chunk
+        """
+        total = 0
+        chunk = []
+        for instance in rows:
+            chunk.append(instance)
+            if len(chunk) >= CHUNK_SIZE:
+                yield self.insert_chunk(model, chunk, kind)
+                total += len(chunk)
+                chunk = []
+        if chunk:
+            yield self.insert_chunk(model, chunk, kind)
+            total += len(chunk)
+        self.log(f'{total} {model._meta.verbose_name_plural}')
+
+    def insert_chunk(self, model, chunk, kind):
+        with transaction.atomic():
+            model.objects.bulk_create(chunk, batch_size=1000)
+            if kind is not None:
+                tags.link_new_instances(model, chunk)
+                get_search_backend().index_many(kind, [obj for obj in chunk if is_published(kind, obj)])
+        return chunk
+
+    def insert_all(self, model, rows, kind=None):
+        for _ in self.insert(model, rows, kind):
+            pass
+
+    def create_categories(self, model, names, **extra):
+        model.objects.bulk_create([model(name=name, slug=slugify(name), **extra) for name in names])
+        return list(model.objects.order_by('pk').values_list('pk', flat=True))
+
+    def create_users(self):
+        from apps.users.models import UserProfile
+
+        # One hash for everyone; hashing per user would dominate the build
+        password = make_password(PASSWORD)
+        users = (
+            User(username=f'bench{i}', email=f'bench{i}@example.com', password=password, date_joined=self.now)
+            for i in range(self.counts['users'])
+        )
+        self.insert_all(User, users)
+        user_ids = list(User.objects.filter(username__startswith='bench').order_by('pk').values_list('pk', flat=True))
+        UserProfile.objects.bulk_create([UserProfile(user_id=pk) for pk in user_ids], batch_size=1000)
+        return user_ids
+
+    def create_prompts(self):
+        from apps.prompts.models import Category, Prompt
+
+        category_ids = self.create_categories(Category, PROMPT_CATEGORIES, icon='fa-star')
+        difficulties = [value for value, _ in Prompt.DIFFICULTY_CHOICES]
+        ai_models = [value for value, _ in Prompt.MODEL_CHOICES]
+        slugs = SlugAllocator(Prompt)
+        rng = self.rng
+
+        def rows():
+            for i in range(self.counts['prompts']):
+                title = text(rng, 4).capitalize()
+                yield Prompt(
+                    title=title,
+                    slug=slugs.allocate(title),
+                    description=text(rng, 20),
+                    prompt_text=text(rng, 60),
+                    category_id=rng.choice(category_ids),
+                    difficulty=rng.choice(difficulties),
+                    ai_model=rng.choice(ai_models),
+                    tags=tag_string(rng),
+                    author_id=rng.choice(self.user_ids),
+                    views=int(rng.paretovariate(1.2) * 10),
+                    upvotes=int(rng.paretovariate(1.5)),
+                    is_featured=rng.random() < 0.01,
+                    is_published=rng.random() < 0.95,
+                )
+        self.insert_all(Prompt, rows(), 'prompt')
+
+    def create_blog(self):
+        from apps.blog.models import BlogCategory, BlogComment, BlogPost
+
+        category_ids = self.create_categories(BlogCategory, BLOG_CATEGORIES)
+        slugs = SlugAllocator(BlogPost)
+        rng = self.rng
+        per_post = self.counts['comments'] // self.counts['blog_posts']
+
+        def rows():
+            for i in range(self.counts['blog_posts']):
+                title = text(rng, 5).capitalize()
+                yield BlogPost(
+                    title=title,
+                    slug=slugs.allocate(title),
+                    author_id=rng.choice(self.user_ids),
+                    excerpt=text(rng, 25),
+                    content=text(rng, 400),
+                    category_id=rng.choice(category_ids),
+                    tags=tag_string(rng),
+                    views=int(rng.paretovariate(1.2) * 10),
+                    comment_count=per_post,
+                    status='published' if rng.random() < 0.9 else 'draft',
+                    published_at=self.now - timedelta(minutes=i),
+                    is_featured=rng.random() < 0.02,
+                )
+
+        # Comments for each chunk of posts, once the posts have primary keys
+        def comments(chunks):
+            for posts in chunks:
+                for post in posts:
+                    for _ in range(per_post):
+                        yield BlogComment(post_id=post.pk, author_id=rng.choice(self.user_ids), content=text(rng, 30))
+        self.insert_all(BlogComment, comments(self.insert(BlogPost, rows(), 'blog')))
+
+    def create_news(self):
+        from apps.news.models import NewsArticle, NewsCategory
+
+        category_ids = self.create_categories(NewsCategory, NEWS_CATEGORIES)
+        slugs = SlugAllocator(NewsArticle)
+        rng = self.rng
+
+        def rows():
+            for i in range(self.counts['news']):
+                title = text(rng, 6).capitalize()
+                yield NewsArticle(
+                    title=title,
+                    slug=slugs.allocate(title),
+                    summary=text(rng, 25),
+                    content=text(rng, 300),
+                    category_id=rng.choice(category_ids),
+                    priority='breaking' if rng.random() < 0.01 else 'normal',
+                    tags=tag_string(rng),
+                    views=int(rng.paretovariate(1.2) * 10),
+                    is_featured=rng.random() < 0.02,
+                )
+        self.insert_all(NewsArticle, rows(), 'news')
+
+    def create_bookmarks(self):
+        from apps.prompts.models import Bookmark, Prompt
+
+        prompt_ids = list(Prompt.objects.order_by('pk').values_list('pk', flat=True))
+        pairs = set()
+        while len(pairs) < self.counts['bookmarks']:
+            pairs.add((self.rng.choice(self.user_ids), self.rng.choice(prompt_ids)))
+        self.insert_all(Bookmark, (Bookmark(user_id=user_id, prompt_id=prompt_id) for user_id, prompt_id in sorted(pairs)))
+
+
+def build_dataset(scale, seed=1, stdout=None):
+    return DatasetBuilder(scale, seed, stdout).build()
+
+
+class Targets:
+    """Seeded samples of slugs, usernames and search terms to request"""
+
+    def __init__(self, seed=1):
+        from apps.blog.models import BlogPost
+        from apps.news.models import NewsArticle
+        from apps.prompts.models import Category, Prompt
+
+        self.rng = random.Random(seed)
+        self.pools = {
+            'prompt': self.sample(Prompt.objects.filter(is_published=True), 'slug'),
+            'prompt_category': self.sample(Category.objects.all(), 'slug'),
+            'blog_post': self.sample(BlogPost.objects.filter(status='published'), 'slug'),
+            'news_article': self.sample(NewsArticle.objects.filter(is_published=True), 'slug'),
+            'user': self.sample(User.objects.filter(is_active=True), 'username'),
+            'term': list(WORDS),
+            'difficulty': ['beginner', 'intermediate', 'advanced'],
+        }
+        self.positions = dict.fromkeys(self.pools, 0)
+
+    def sample(self, queryset, field):
+        pks = list(queryset.order_by('pk').values_list('pk', flat=True))
+        chosen = self.rng.sample(pks, min(TARGET_SAMPLE, len(pks)))
+        values = dict(queryset.filter(pk__in=chosen).values_list('pk', field))
+        return [values[pk] for pk in chosen]
+
+    def clone(self, seed):
+        """Same pools, own random state; for concurrent clients"""
+        targets = copy.copy(self)
+        targets.rng = random.Random(seed)
+        targets.positions = {pool: targets.rng.randrange(len(values) or 1) for pool, values in self.pools.items()}
+        return targets
+
+    def pick(self, pool):
+        values = self.pools[pool]
+        position = self.positions[pool]
+        self.positions[pool] = position + 1
+        return values[position % len(values)]
+
+
+SCENARIOS = {
+    'prompt_list': {'url': 'prompts:list'},
+    'prompt_filter': {
+        'url': 'prompts:list',
+        'query': lambda targets: {'category': targets.pick('prompt_category'), 'difficulty': targets.pick('difficulty')},
+    },
+    'prompt_sort_views': {'url': 'prompts:list', 'query': {'sort': '-views'}},
+    'prompt_trending': {'url': 'prompts:list', 'query': {'sort': 'trending'}},
+    'prompt_search': {'url': 'prompts:list', 'query': lambda targets: {'search': targets.pick('term')}},
+    'prompt_detail': {'url': 'prompts:detail', 'args': lambda targets: [targets.pick('prompt')]},
+    'site_search': {'url': 'core:search', 'query': lambda targets: {'q': targets.pick('term')}},
+    'blog_detail': {'url': 'blog:detail', 'args': lambda targets: [targets.pick('blog_post')]},
+    'news_list': {'url': 'news:list'},
+    'user_profile': {'url': 'users:profile', 'args': lambda targets: [targets.pick('user')], 'login': True},
+}
+
+
+def scenario_url(scenario, targets):
+    args = scenario.get('args')
+    if callable(args):
+        args = args(targets)
+    url = reverse(scenario['url'], args=args)
+    query = scenario.get('query')
+    if callable(query):
+        query = query(targets)
+    if query:
+        url = f'{url}?{urlencode(query)}'
+    return url
+
+
+class QueryCounter:
+    """``execute_wrapper`` counting queries on every connection"""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a sorted list"""
+    if not values:
+        return None
+    rank = max(int(round(pct / 100 * len(values) + 0.5)) - 1, 0)
+    return values[min(rank, len(values) - 1)]
+
+
+def ms(seconds):
+    return round(seconds * 1000, 3) if seconds is not None else None
+
+
+def summarize(durations, queries, errors, elapsed):
+    durations = sorted(durations)
+    return {
+        'requests': len(durations),
+        'errors': errors,
+        'p50_ms': ms(percentile(durations, 50)),
+        'p95_ms': ms(percentile(durations, 95)),
+        'p99_ms': ms(percentile(durations, 99)),
+        'mean_ms': ms(statistics.fmean(durations)) if durations else None,
+        'max_ms': ms(durations[-1]) if durations else None,
+        'queries_mean': round(statistics.fmean(queries), 2) if queries else None,
+        'queries_max': max(queries) if queries else None,
+        'throughput_rps': round(len(durations) / elapsed, 1) if elapsed else None,
+    }
+
+
+def run_scenario(scenario, targets, requests, warmup=5, cold=False):
+    client = Client()
+    if scenario.get('login'):
+        client.force_login(User.objects.order_by('pk').first())
+    counter = QueryCounter()
+    for _ in range(warmup):
+        client.get(scenario_url(scenario, targets))
+
+    durations, queries, errors = [], [], 0
+    started = time.perf_counter()
+    for _ in range(requests):
+        url = scenario_url(scenario, targets)
+        if cold:
+            cache.clear()
+        counter.count = 0
+        with connections['default'].execute_wrapper(counter):
+            request_started = time.perf_counter()
+            response = client.get(url)
+            if response.streaming:
+                b''.join(response.streaming_content)
+            durations.append(time.perf_counter() - request_started)
+        queries.append(counter.count)
+        if response.status_code != 200:
+            errors += 1
+    return summarize(durations, queries, errors, time.perf_counter() - started)
+
+
+def run(scenarios=None, requests=200, warmup=5, seed=1, cold=False, progress=None):
+    """Run the named scenarios (default: all); returns the result dict"""
+    names = scenarios or list(SCENARIOS)
+    targets = Targets(seed)
+    results = {}
+    for name in names:
+        results[name] = run_scenario(SCENARIOS[name], targets, requests, warmup, cold)
+        if progress is not None:
+            progress(name, results[name])
+    return {
+        'meta': run_meta(requests=requests, warmup=warmup, seed=seed, cold_cache=cold),
+        'scenarios': results,
+    }
+
+
+def run_meta(**extra):
+    return {
+        'created': timezone.now().isoformat(),
+        **extra,
+        'database': connections['default'].vendor,
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'machine': platform.machine(),
+    }
+
+
+# ASGI
+
+SERVER_TIMING_QUERIES = re.compile(r'desc="(\d+) queries"')
+
+
+async def asgi_request(application, url, cookie=''):
+    """
+    Run one GET through the ASGI app; returns (status, seconds, queries).
+    Queries come from the Server-Timing header, the execute wrapper
+    counters in ``run_scenario()`` cannot follow the handler's threads.
+    """
+    path, _, query = url.partition('?')
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': 'GET',
+        'scheme': 'http',
+        'path': path,
+        'raw_path': path.encode(),
+        'query_string': query.encode(),
+        'root_path': '',
+        'headers': [(b'host', b'testserver'), (b'cookie', cookie.encode())],
+        'client': ('127.0.0.1', 0),
+        'server': ('testserver', 80),
+    }
+    received = False
+    response = {}
+
+    async def receive():
+        nonlocal received
+        if not received:
+            received = True
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+        # The client stays connected; the handler cancels this wait
+        await asyncio.Event().wait()
+
+    async def send(message):
+        if message['type'] == 'http.response.start':
+            response['status'] = message['status']
+            response['headers'] = {name.lower(): value for name, value in message['headers']}
+
+    started = time.perf_counter()
+    await application(scope, receive, send)
+    duration = time.perf_counter() - started
+    timing = SERVER_TIMING_QUERIES.search(response['headers'].get(b'server-timing', b'').decode())
+    return response['status'], duration, int(timing.group(1)) if timing else 0
+
+
+async def run_asgi_scenario(application, scenario, targets, requests, concurrency, warmup=5, cookie=''):
+    """``concurrency`` clients share ``requests`` requests"""
+    for _ in range(warmup):
+        await asgi_request(application, scenario_url(scenario, targets), cookie)
+    urls = iter([scenario_url(scenario, targets) for _ in range(requests)])
+    results = []
+
+    async def client():
+        for url in urls:
+            results.append(await asgi_request(application, url, cookie))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    errors = sum(1 for status, _, _ in results if status != 200)
+    return summarize([row[1] for row in results], [row[2] for row in results], errors, elapsed)
+
+
+def run_asgi(scenarios=None, requests=200, warmup=5, seed=1, concurrency=(1,), progress=None):
+    """
+    ``run()`` through config/asgi.py with ``concurrency`` clients in
+    flight. Each scenario runs once per concurrency level; with more than
+    one level, results are keyed ``name@level``.
+    """
+    from config.asgi import application
+
+    quiet_request_logs()
+    names = scenarios or list(SCENARIOS)
+    targets = Targets(seed)
+    client = Client()
+    client.force_login(User.objects.order_by('pk').first())
+    session = f'{settings.SESSION_COOKIE_NAME}={client.cookies[settings.SESSION_COOKIE_NAME].value}'
+    # Database connections are opened per thread by the handler
+    connections.close_all()
+
+    async def run_all():
+        results = {}
+        for name in names:
+            scenario = SCENARIOS[name]
+            cookie = session if scenario.get('login') else ''
+            for level in concurrency:
+                key = name if len(concurrency) == 1 else f'{name}@{level}'
+                results[key] = await run_asgi_scenario(
+                    application, scenario, targets, requests, level, warmup, cookie,
+                )
+                if progress is not None:
+                    progress(key, results[key])
+        return results
+
+    with override_settings(REQUEST_TIMING_HEADER=True):
+        results = asyncio.run(run_all())
+    return {
+        'meta': run_meta(
+            requests=requests, warmup=warmup, seed=seed, server='asgi',
+            concurrency=list(concurrency), async_views=async_read_views(),
+        ),
+        'scenarios': results,
+    }
+
+
+def quiet_request_logs():
+    """
+    Benchmarks measure slow requests; logging each one would drown the
+    report. Call again after importing an application, which re-applies
+    LOGGING.
+    """
+    logging.getLogger('apps.core.timing').setLevel(logging.ERROR)
+    logging.getLogger('django.request').setLevel(logging.CRITICAL)
+
+
+def compare(baseline, current, threshold=10.0):
+    """
+    Per-scenario changes against a baseline result. A scenario regresses
+    when its p95 grows by more than ``threshold`` percent or it runs more
+    queries per request.
+    """
+    rows = []
+    for name, result in current['scenarios'].items():
+        before = baseline.get('scenarios', {}).get(name)
+        if before is None or not before.get('p95_ms'):
+            rows.append({'scenario': name, 'p95_change_pct': None, 'queries_change': None, 'regressed': False})
+            continue
+        change = (result['p95_ms'] - before['p95_ms']) / before['p95_ms'] * 100
+        queries_change = round(result['queries_mean'] - before['queries_mean'], 2)
+        rows.append({
+            'scenario': name,
+            'p95_before_ms': before['p95_ms'],
+            'p95_ms': result['p95_ms'],
+            'p95_change_pct': round(change, 1),
+            'queries_change': queries_change,
+            'regressed': change > threshold or queries_change > 0,
+        })
+    return rows
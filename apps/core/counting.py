@@ -0,0 +1,145 @@
+"""
+Cached and approximate result counts for paginated lists
+
+Counts are cached per normalized query (the SQL and parameters of the
+filtered queryset) and per-model version; saving or deleting a row of the
+model bumps its version, which invalidates every cached count for it.
+
+Counting never reads more than COUNT_ESTIMATE_THRESHOLD + 1 rows. Larger
+results are reported as a lower bound (the threshold), which templates
+show as "N+"; the paginator then lets later pages through and decides
+whether there is a next page from the rows it fetched.
+"""
+
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import EmptyPage, Page, Paginator
+from django.db import DEFAULT_DB_ALIAS
+from django.utils.functional import cached_property
+
+
+def version_key(model):
+    return f'count:version:{model._meta.label_lower}'
+
+
+def get_version(model):
+    key = version_key(model)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time_ns(), None)
+        version = cache.get(key)
+    return version
+
+
+async def aget_version(model):
+    key = version_key(model)
+    version = await cache.aget(key)
+    if version is None:
+        await cache.aadd(key, time.time_ns(), None)
+        version = await cache.aget(key)
+    return version
+
+
+def bump_version(model):
+    """Invalidate all cached counts for ``model``"""
+    cache.set(version_key(model), time.time_ns(), None)
+
+
+def query_key(queryset):
+    """Stable key for the rows a queryset selects (ordering ignored)"""
+    sql, params = queryset.order_by().query.sql_with_params()
+    digest = hashlib.sha1(f'{sql}|{params!r}'.encode()).hexdigest()
+    return f'{queryset.model._meta.label_lower}:{digest}'
+
+
+def cached_count(queryset):
+    """Return (count, is_lower_bound) for a queryset"""
+    key = f'count:{query_key(queryset)}:{get_version(queryset.model)}'
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
+
+    # Count on the primary: a lagging replica would cache a stale count under
+    # the current version, and pages would be cut short until it expires
+    queryset = queryset.using(DEFAULT_DB_ALIAS)
+
+    # Never scan more than threshold + 1 rows
+    result = bounded(queryset.order_by()[:estimate_threshold() + 1].count())
+    cache.set(key, result, exact_timeout())
+    return result
+
+
+async def acached_count(queryset):
+    """cached_count() for async views"""
+    key = f'count:{query_key(queryset)}:{await aget_version(queryset.model)}'
+    cached = await cache.aget(key)
+    if cached is not None:
+        return cached
+
+    queryset = queryset.using(DEFAULT_DB_ALIAS)
+    result = bounded(await queryset.order_by()[:estimate_threshold() + 1].acount())
+    await cache.aset(key, result, exact_timeout())
+    return result
+
+
+def bounded(count):
+    threshold = estimate_threshold()
+    if count > threshold:
+        return threshold, True
+    return count, False
+
+
+def estimate_threshold():
+    return getattr(settings, 'COUNT_ESTIMATE_THRESHOLD', 10000)
+
+
+def exact_timeout():
+    return getattr(settings, 'COUNT_CACHE_TIMEOUT', 300)
+
+
+class LowerBoundPage(Page):
+    """Page of a paginator whose count is a lower bound"""
+
+    def has_next(self):
+        # Past the bound only a full page can be followed by another
+        return self.number < self.paginator.num_pages or len(self) == self.paginator.per_page
+
+
+class CachedCountPaginator(Paginator):
+    """
+    Paginator whose count comes from cached_count(). Usable as
+    ``paginator_class`` on ListViews and ``paginator`` on ModelAdmins.
+    """
+
+    count_is_lower_bound = False
+
+    @cached_property
+    def count(self):
+        if not hasattr(self.object_list, 'query'):
+            return super().count
+        count, self.count_is_lower_bound = cached_count(self.object_list)
+        return count
+
+    def validate_number(self, number):
+        try:
+            return super().validate_number(number)
+        except EmptyPage:
+            # Pages past a lower bound may still hold rows
+            if self.count_is_lower_bound and int(number) > 1:
+                return int(number)
+            raise
+
+    def page(self, number):
+        number = self.validate_number(number)
+        if not self.count_is_lower_bound:
+            return super().page(number)
+        bottom = (number - 1) * self.per_page
+        return LowerBoundPage(self.object_list[bottom:bottom + self.per_page], number, self)
+
+
+def bump_count_version(sender, **kwargs):
+    """``post_save``/``post_delete`` receiver invalidating cached counts"""
+    bump_version(sender)
@@ -0,0 +1,143 @@
+"""
+Streaming exports of the content tables
+
+Rows are read in keyset chunks over the primary key with ``.values_list()``,
+encoded as NDJSON or CSV and optionally gzipped on the fly, so memory use
+stays constant however large the table is. Columns use the same keys as
+``import_content`` (``category`` is the category name, ``author`` the
+username), so an export can be imported elsewhere.
+"""
+
+import csv
+import zlib
+from datetime import datetime
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from .search import SEARCHABLE, get_model
+
+
+# format: (content type, file extension); NDJSON files use the .jsonl
+# extension import_content recognises
+FORMATS = {
+    'ndjson': ('application/x-ndjson', 'jsonl'),
+    'csv': ('text/csv', 'csv'),
+}
+
+# Display values for foreign keys
+RELATION_PATHS = {
+    'category': 'category__name',
+    'author': 'author__username',
+}
+
+DEFAULT_CHUNK_SIZE = 2000
+
+
+def get_columns(kind):
+    """Return ``[(column, orm_path), ...]`` for an export of ``kind``"""
+    columns = []
+    for field in get_model(kind)._meta.concrete_fields:
+        if field.is_relation:
+            if field.name in RELATION_PATHS:
+                columns.append((field.name, RELATION_PATHS[field.name]))
+        else:
+            columns.append((field.name, field.name))
+    return columns
+
+
+def parse_since(value):
+    """Parse an ``updated_since`` value (ISO date or datetime); None if invalid"""
+    moment = parse_datetime(value)
+    if moment is None:
+        day = parse_date(value)
+        if day is None:
+            return None
+        moment = datetime(day.year, day.month, day.day)
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    return moment
+
+
+def iter_rows(kind, updated_since=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yield value tuples in primary-key order, one chunk query at a time"""
+    paths = [path for _, path in get_columns(kind)]
+    queryset = get_model(kind)._default_manager.order_by('pk')
+    if updated_since is not None:
+        queryset = queryset.filter(updated_at__gte=updated_since)
+    pk_index = paths.index('id')
+    last_pk = None
+    while True:
+        chunk = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+        rows = list(chunk.values_list(*paths)[:chunk_size])
+        yield from rows
+        if len(rows) < chunk_size:
+            return
+        last_pk = rows[-1][pk_index]
+
+
+def encode_ndjson(columns, rows):
+    names = [name for name, _ in columns]
+    encoder = DjangoJSONEncoder(ensure_ascii=False)
+    for row in rows:
+        yield (encoder.encode(dict(zip(names, row))) + '\n').encode()
+
+
+class Echo:
+    """File-like object whose ``write`` returns the line csv.writer produced"""
+
+    def write(self, value):
+        return value
+
+
+def encode_csv(columns, rows):
+    writer = csv.writer(Echo())
+    yield writer.writerow([name for name, _ in columns]).encode()
+    for row in rows:
+        yield writer.writerow([
+            value.isoformat() if hasattr(value, 'isoformat') else value
+            for value in row
+        ]).encode()
+
+
+def gzip_stream(chunks, level=6):
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def buffered(chunks, size=64 * 1024):
+    """Join small encoded rows into writes of about ``size`` bytes"""
+    buffer = []
+    length = 0
+    for chunk in chunks:
+        buffer.append(chunk)
+        length += len(chunk)
+        if length >= size:
+            yield b''.join(buffer)
+            buffer = []
+            length = 0
+    if buffer:
+        yield b''.join(buffer)
+
+
+def stream(kind, fmt='ndjson', updated_since=None, compress=False, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Return an iterator of bytes for an export of ``kind``"""
+    if kind not in SEARCHABLE:
+        raise ValueError(f'Unknown kind: {kind}')
+    if fmt not in FORMATS:
+        raise ValueError(f'Unknown format: {fmt}')
+    columns = get_columns(kind)
+    rows = iter_rows(kind, updated_since, chunk_size)
+    encode = encode_ndjson if fmt == 'ndjson' else encode_csv
+    chunks = buffered(encode(columns, rows))
+    return gzip_stream(chunks) if compress else chunks
+
+
+def filename(kind, fmt, compress=False):
+    stamp = timezone.now().strftime('%Y%m%d-%H%M%S')
+    return f'{kind}-{stamp}.{FORMATS[fmt][1]}' + ('.gz' if compress else '')
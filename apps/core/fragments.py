@@ -0,0 +1,190 @@
+"""
+Cache for shared page context (sidebars, featured blocks)
+
+Each fragment is registered under an explicit key with a builder function
+and the models it depends on. Built values are stored in the cache until a
+``post_save``/``post_delete`` of one of those models deletes them, so on a
+warm cache these blocks cost no queries.
+
+Invalidation only reaches every worker when the default cache is shared
+between processes (Redis, Memcached, file or database cache; see
+config/settings/prod.py). With the per-process LocMemCache a change is
+seen at once by the process that saved it and by the others once their
+copy expires, so every fragment also has a timeout
+(FRAGMENT_CACHE_TIMEOUT unless registered with its own).
+
+Hits and misses are counted in memory and added to counters in the cache
+at most once per FRAGMENT_STATS_INTERVAL, so a page view costs no cache
+writes. ``fragment_cache_stats`` reads those counters, which lag by up to
+one interval per process, and only from another process with a shared
+cache.
+"""
+
+import threading
+import time
+from collections import Counter
+
+from asgiref.sync import sync_to_async
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.db.models.signals import post_delete, post_save
+
+
+_registry = {}
+_missing = object()
+
+# Cache backends whose entries live in the memory of one process
+PROCESS_LOCAL_BACKENDS = ('LocMemCache', 'DummyCache')
+
+
+def cache_is_shared():
+    """Whether the default cache is seen by every process"""
+    return type(caches['default']).__name__ not in PROCESS_LOCAL_BACKENDS
+
+
+class Fragment:
+    def __init__(self, key, builder, depends_on, timeout):
+        self.key = key
+        self.builder = builder
+        self.depends_on = depends_on
+        self._timeout = timeout
+
+    @property
+    def timeout(self):
+        if callable(self._timeout):
+            return self._timeout()
+        if self._timeout is not None:
+            return self._timeout
+        return getattr(settings, 'FRAGMENT_CACHE_TIMEOUT', 600)
+
+    @property
+    def cache_key(self):
+        return f'fragment:{self.key}'
+
+    def invalidate(self, **kwargs):
+        cache.delete(self.cache_key)
+
+
+def register(key, depends_on, timeout=None):
+    """
+    Decorator registering a fragment builder:
+
+        @fragments.register('blog:categories', depends_on=['blog.BlogCategory'])
+        def blog_categories():
+            return list(BlogCategory.objects.all())
+
+    Builders must return picklable, fully evaluated values (lists, not
+    querysets). ``timeout`` (seconds, or a function returning them)
+    defaults to FRAGMENT_CACHE_TIMEOUT.
+    """
+    def decorator(builder):
+        fragment = Fragment(key, builder, tuple(depends_on), timeout)
+        _registry[key] = fragment
+        for label in fragment.depends_on:
+            model = apps.get_model(label)
+            for signal in (post_save, post_delete):
+                signal.connect(
+                    fragment.invalidate,
+                    sender=model,
+                    weak=False,
+                    dispatch_uid=f'core.fragment.{key}.{label}.{signal is post_save}',
+                )
+        return builder
+    return decorator
+
+
+def get(key):
+    """Return the cached value of fragment ``key``, building it on a miss"""
+    fragment = _registry[key]
+    value = cache.get(fragment.cache_key, _missing)
+    if value is not _missing:
+        if fragment_stats.record(key, 'hits'):
+            fragment_stats.report()
+        return value
+
+    if fragment_stats.record(key, 'misses'):
+        fragment_stats.report()
+    value = fragment.builder()
+    cache.set(fragment.cache_key, value, fragment.timeout)
+    return value
+
+
+async def aget(key):
+    """get() for async views; builders are sync and run in a thread"""
+    fragment = _registry[key]
+    value = await cache.aget(fragment.cache_key, _missing)
+    if value is not _missing:
+        if fragment_stats.record(key, 'hits'):
+            await sync_to_async(fragment_stats.report)()
+        return value
+
+    if fragment_stats.record(key, 'misses'):
+        await sync_to_async(fragment_stats.report)()
+    value = await sync_to_async(fragment.builder)()
+    await cache.aset(fragment.cache_key, value, fragment.timeout)
+    return value
+
+
+def invalidate(key):
+    _registry[key].invalidate()
+
+
+def invalidate_model(label):
+    """Invalidate every fragment depending on model ``label``"""
+    for fragment in _registry.values():
+        if label in fragment.depends_on:
+            fragment.invalidate()
+
+
+class FragmentStats:
+    """
+    Per-process hit/miss counts, added to the cache counters when reported
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = Counter()
+        self._last_report = time.monotonic()
+
+    @property
+    def interval(self):
+        return getattr(settings, 'FRAGMENT_STATS_INTERVAL', 60)
+
+    def record(self, key, outcome):
+        """Count one hit or miss; returns True when a report is due"""
+        with self._lock:
+            self._pending[(key, outcome)] += 1
+            return time.monotonic() - self._last_report >= self.interval
+
+    def report(self):
+        """Add the counts since the last report to the cache counters"""
+        with self._lock:
+            pending, self._pending = self._pending, Counter()
+            self._last_report = time.monotonic()
+        for (key, outcome), count in pending.items():
+            counter_key = f'fragment:stats:{key}:{outcome}'
+            try:
+                cache.incr(counter_key, count)
+            except ValueError:
+                # Counter expired or never set; add() avoids clobbering a racing incr
+                if not cache.add(counter_key, count, None):
+                    cache.incr(counter_key, count)
+
+
+fragment_stats = FragmentStats()
+
+
+def stats():
+    """Return {key: {'hits': n, 'misses': n}} for all registered fragments"""
+    counter_keys = {
+        f'fragment:stats:{key}:{outcome}': (key, outcome)
+        for key in _registry
+        for outcome in ('hits', 'misses')
+    }
+    values = cache.get_many(list(counter_keys))
+    result = {key: {'hits': 0, 'misses': 0} for key in _registry}
+    for counter_key, value in values.items():
+        key, outcome = counter_keys[counter_key]
+        result[key][outcome] = value
+    return result
@@ -0,0 +1,205 @@
+"""
+Resized renditions of uploaded images
+
+Each preset lists target widths; every width is rendered once as WebP and
+once in a fallback format (JPEG, or PNG for images with transparency).
+Files are content-addressed under ``renditions/`` in the default storage,
+named from a hash of the source bytes and the rendition parameters, so an
+unchanged image is never rendered twice and identical uploads share files.
+
+Renditions are generated after an upload is saved (see ``IMAGE_FIELDS``)
+or by ``manage.py generate_renditions``, never while a page renders. The
+resulting ``srcset`` data is written to a small JSON manifest per source
+file and preset and cached, so rendering a page costs one cache lookup
+per image (one manifest read after a cache miss). Templates fall back to
+the original file until its renditions exist.
+"""
+
+import hashlib
+import io
+import json
+import logging
+import posixpath
+
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+
+PRESETS = {
+    # List page cards: ~350px wide columns, doubled for high-DPI screens
+    'card': {
+        'widths': (360, 720),
+        'aspect': (16, 9),
+        'sizes': '(min-width: 992px) 33vw, (min-width: 576px) 50vw, 100vw',
+    },
+    'detail': {
+        'widths': (640, 960, 1280),
+        'aspect': None,
+        'sizes': '(min-width: 992px) 800px, 100vw',
+    },
+    'avatar': {
+        'widths': (100, 200),
+        'aspect': (1, 1),
+        'sizes': '100px',
+    },
+}
+
+# Image fields whose uploads are rendered when saved: model label -> {field: presets}
+IMAGE_FIELDS = {
+    'blog.BlogPost': {'featured_image': ('card', 'detail')},
+    'news.NewsArticle': {'featured_image': ('card', 'detail')},
+    'users.UserProfile': {'avatar': ('avatar',)},
+}
+
+RENDITION_DIR = 'renditions'
+WEBP_QUALITY = 80
+JPEG_QUALITY = 82
+
+# Bumping this re-renders everything (e.g. after changing presets)
+VERSION = 1
+
+
+def cache_key(name, preset):
+    digest = hashlib.sha1(name.encode()).hexdigest()
+    return f'images:v{VERSION}:{preset}:{digest}'
+
+
+def manifest_name(name, preset):
+    digest = hashlib.sha1(name.encode()).hexdigest()
+    return posixpath.join(RENDITION_DIR, 'manifests', digest[:2], f'{digest}-{preset}-v{VERSION}.json')
+
+
+def source_digest(data):
+    return hashlib.sha1(data).hexdigest()
+
+
+def rendition_name(digest, preset, width, ext):
+    return posixpath.join(RENDITION_DIR, digest[:2], f'{digest}-{preset}-{width}-v{VERSION}.{ext}')
+
+
+def crop_to_aspect(image, aspect):
+    if aspect is None:
+        return image
+    width, height = image.size
+    target = aspect[0] / aspect[1]
+    if width / height > target:
+        new_width = round(height * target)
+        left = (width - new_width) // 2
+        return image.crop((left, 0, left + new_width, height))
+    new_height = round(width / target)
+    top = (height - new_height) // 2
+    return image.crop((0, top, width, top + new_height))
+
+
+def encode(image, fmt):
+    buffer = io.BytesIO()
+    if fmt == 'webp':
+        image.save(buffer, 'WEBP', quality=WEBP_QUALITY, method=4)
+    elif fmt == 'png':
+        image.save(buffer, 'PNG', optimize=True)
+    else:
+        image.convert('RGB').save(buffer, 'JPEG', quality=JPEG_QUALITY, optimize=True, progressive=True)
+    return buffer.getvalue()
+
+
+def render(data, preset):
+    """
+    Render every width of ``preset`` for the image bytes in ``data`` and
+    return the srcset entries ``{'width', 'height', 'src', 'webp'}``
+    """
+    conf = PRESETS[preset]
+    digest = source_digest(data)
+    with Image.open(io.BytesIO(data)) as opened:
+        image = crop_to_aspect(ImageOps.exif_transpose(opened), conf['aspect'])
+        has_alpha = image.mode in ('RGBA', 'LA', 'PA') or 'transparency' in image.info
+        image = image.convert('RGBA' if has_alpha else 'RGB')
+    fallback = 'png' if has_alpha else 'jpg'
+
+    # Never upscale: widths beyond the source collapse to the source width
+    widths = sorted({min(width, image.width) for width in conf['widths']})
+    entries = []
+    for width in widths:
+        height = max(round(image.height * width / image.width), 1)
+        resized = None
+        entry = {'width': width, 'height': height}
+        for key, ext in (('src', fallback), ('webp', 'webp')):
+            name = rendition_name(digest, preset, width, ext)
+            if not default_storage.exists(name):
+                if resized is None:
+                    resized = image if width == image.width else image.resize((width, height), Image.LANCZOS)
+                name = default_storage.save(name, ContentFile(encode(resized, ext)))
+            entry[key] = default_storage.url(name)
+        entries.append(entry)
+    return entries
+
+
+def get_renditions(field_file, preset):
+    """
+    Return the srcset entries of an image field value, or None when they
+    have not been generated. Never renders.
+    """
+    if not field_file or preset not in PRESETS:
+        return None
+    key = cache_key(field_file.name, preset)
+    entries = cache.get(key)
+    if entries is None:
+        try:
+            with default_storage.open(manifest_name(field_file.name, preset), 'rb') as manifest:
+                entries = json.load(manifest)
+        except (OSError, ValueError):
+            return None
+        cache.set(key, entries, None)
+    return entries
+
+
+def generate_renditions(field_file, preset):
+    """
+    Render the renditions of an image field value and record them in its
+    manifest. Returns the entries, or None when the file is missing or
+    unreadable.
+    """
+    if not field_file or preset not in PRESETS:
+        return None
+    try:
+        with field_file.storage.open(field_file.name, 'rb') as source:
+            data = source.read()
+        entries = render(data, preset)
+    except (OSError, ValueError, Image.DecompressionBombError) as exc:
+        logger.warning('Could not render %s for %s: %s', preset, field_file.name, exc)
+        return None
+    name = manifest_name(field_file.name, preset)
+    if default_storage.exists(name):
+        default_storage.delete(name)
+    default_storage.save(name, ContentFile(json.dumps(entries).encode()))
+    cache.set(cache_key(field_file.name, preset), entries, None)
+    return entries
+
+
+def srcset(entries, key):
+    return ', '.join(f"{entry[key]} {entry['width']}w" for entry in entries)
+
+
+def render_field(instance, field_name, presets, missing_only=False):
+    """Generate the presets of one image field; returns how many were rendered"""
+    field_file = getattr(instance, field_name)
+    rendered = 0
+    for preset in presets:
+        if missing_only and get_renditions(field_file, preset) is not None:
+            continue
+        if generate_renditions(field_file, preset) is not None:
+            rendered += 1
+    return rendered
+
+
+def image_saved(sender, instance, raw=False, **kwargs):
+    """``post_save``: render new uploads once the transaction commits"""
+    if raw:
+        return
+    for field_name, presets in IMAGE_FIELDS.get(sender._meta.label, {}).items():
+        if getattr(instance, field_name):
+            transaction.on_commit(lambda name=field_name, presets=presets: render_field(instance, name, presets))
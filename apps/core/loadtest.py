@@ -0,0 +1,342 @@
+"""
+Concurrent load generator
+
+Calls the WSGI application from config/wsgi.py directly (no HTTP server,
+so the figures are the application's own) from ``processes`` forked
+workers with ``threads`` threads each. Every thread is a logged-in
+visitor with its own session and CSRF cookie. It sends a random mix of
+reads (scenarios from apps.core.bench) and writes from ``WRITE_SCENARIOS``
+until the deadline; ``write_ratio`` sets the share of writes. Detail reads
+also feed the buffered view counters, whose flushes are writes too.
+
+For each request the generator records latency, query count and the time
+spent inside write statements (INSERT/UPDATE/DELETE and ``BEGIN``). On
+SQLite a writer blocks there until it gets the write lock, so the growth
+of that time with more workers is the lock wait. Requests that failed on
+``database is locked`` are counted separately from other errors.
+"""
+
+import itertools
+import multiprocessing
+import queue
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from io import BytesIO
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.signals import got_request_exception
+from django.db import OperationalError, connections
+from django.test import Client
+from django.utils.crypto import get_random_string
+
+from . import bench
+
+
+DEFAULT_READS = ['prompt_list', 'prompt_filter', 'prompt_detail', 'prompt_search', 'blog_detail', 'news_list']
+
+WRITE_SCENARIOS = {
+    'bookmark_toggle': {
+        'url': 'prompts:bookmark_toggle',
+        'args': lambda targets: [targets.pick('prompt')],
+        'headers': {'X-Requested-With': 'XMLHttpRequest'},
+        'weight': 5,
+    },
+    'add_comment': {
+        'url': 'blog:add_comment',
+        'args': lambda targets: [targets.pick('blog_post')],
+        'data': lambda targets: {'content': bench.text(targets.rng, 20)},
+        'weight': 3,
+    },
+    'register': {
+        'url': 'users:register',
+        'data': lambda targets: registration(targets),
+        'anonymous': True,
+        'weight': 1,
+    },
+}
+
+WRITE_SQL = re.compile(r'^\s*(INSERT|UPDATE|DELETE|REPLACE|BEGIN)\b', re.I)
+
+# Seconds to wait past the deadline for workers to finish their last
+# requests and send their records
+RESULT_TIMEOUT = 60
+
+_registrations = itertools.count()
+
+# The current thread's RequestRecorder
+_local = threading.local()
+
+
+class LoadTestError(Exception):
+    pass
+
+
+def registration(targets):
+    # Unique across runs (run_id) and across the forked workers (worker)
+    username = f'load-{targets.run_id}-{targets.worker}x{next(_registrations)}'
+    password = 'Load-test-pass-123'
+    return {'username': username, 'email': f'{username}@example.com', 'password1': password, 'password2': password}
+
+
+class RequestRecorder:
+    """``execute_wrapper`` for one thread's connection"""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.queries = 0
+        self.write_time = 0.0
+        self.locked = False
+
+    def __call__(self, execute, sql, params, many, context):
+        self.queries += 1
+        write = WRITE_SQL.match(sql)
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        except OperationalError as exc:
+            self.note(exc)
+            raise
+        finally:
+            if write:
+                self.write_time += time.perf_counter() - started
+
+    def note(self, exc):
+        if isinstance(exc, OperationalError) and 'locked' in str(exc):
+            self.locked = True
+
+
+def note_exception(sender, request=None, **kwargs):
+    """
+    ``got_request_exception`` receiver; also catches lock errors raised
+    on COMMIT, which does not pass through the execute wrapper
+    """
+    recorder = getattr(_local, 'recorder', None)
+    if recorder is not None:
+        recorder.note(sys.exc_info()[1])
+
+
+def build_environ(method, url, cookies, headers=None, data=None):
+    path, _, query = url.partition('?')
+    body = urlencode(data or {}).encode()
+    environ = {
+        'REQUEST_METHOD': method,
+        'PATH_INFO': path,
+        'QUERY_STRING': query,
+        'SCRIPT_NAME': '',
+        'SERVER_NAME': 'testserver',
+        'SERVER_PORT': '80',
+        'SERVER_PROTOCOL': 'HTTP/1.1',
+        'HTTP_HOST': 'testserver',
+        'HTTP_COOKIE': '; '.join(f'{name}={value}' for name, value in cookies.items()),
+        'CONTENT_TYPE': 'application/x-www-form-urlencoded',
+        'CONTENT_LENGTH': str(len(body)),
+        'wsgi.input': BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.url_scheme': 'http',
+        'wsgi.version': (1, 0),
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+    }
+    for name, value in (headers or {}).items():
+        environ['HTTP_' + name.upper().replace('-', '_')] = value
+    return environ
+
+
+def call(application, environ):
+    """Run one request through the WSGI app; returns the status code"""
+    status = []
+
+    def start_response(value, response_headers, exc_info=None):
+        status.append(int(value.split(' ', 1)[0]))
+
+    result = application(environ, start_response)
+    try:
+        for _ in result:
+            pass
+    finally:
+        if hasattr(result, 'close'):
+            result.close()
+    return status[0]
+
+
+class Visitor:
+    """One simulated client: session and CSRF cookies plus its own targets"""
+
+    def __init__(self, session_key, targets, worker, run_id):
+        self.csrf_token = get_random_string(32)
+        self.cookies = {settings.CSRF_COOKIE_NAME: self.csrf_token}
+        self.anonymous_cookies = dict(self.cookies)
+        if session_key:
+            self.cookies[settings.SESSION_COOKIE_NAME] = session_key
+        self.targets = targets
+        self.targets.worker = worker
+        self.targets.run_id = run_id
+
+    def request(self, name, scenario, write):
+        url = bench.scenario_url(scenario, self.targets)
+        cookies = self.anonymous_cookies if scenario.get('anonymous') else self.cookies
+        if not write:
+            return build_environ('GET', url, cookies)
+        data = scenario.get('data')
+        if callable(data):
+            data = data(self.targets)
+        headers = {'X-CSRFToken': self.csrf_token, **scenario.get('headers', {})}
+        return build_environ('POST', url, cookies, headers, data)
+
+
+def choose(rng, reads, writes, write_ratio):
+    if writes and rng.random() < write_ratio:
+        names = list(writes)
+        name = rng.choices(names, weights=[WRITE_SCENARIOS[n].get('weight', 1) for n in names])[0]
+        return name, WRITE_SCENARIOS[name], True
+    name = rng.choice(reads)
+    return name, bench.SCENARIOS[name], False
+
+
+def run_thread(application, visitor, plan, records, record_from, deadline):
+    recorder = _local.recorder = RequestRecorder()
+    rng = visitor.targets.rng
+    with connections['default'].execute_wrapper(recorder):
+        while time.monotonic() < deadline:
+            name, scenario, write = choose(rng, plan['reads'], plan['writes'], plan['write_ratio'])
+            environ = visitor.request(name, scenario, write)
+            recorder.reset()
+            started = time.perf_counter()
+            status = call(application, environ)
+            latency = time.perf_counter() - started
+            if time.monotonic() >= record_from:
+                records.append((name, write, status, latency, recorder.queries, recorder.write_time, recorder.locked))
+    connections.close_all()
+
+
+def run_worker(worker, visitors, plan, record_from, deadline, results):
+    from config.wsgi import application
+
+    bench.quiet_request_logs()
+    got_request_exception.connect(note_exception, dispatch_uid='loadtest_note_exception')
+
+    records = []
+    threads = [
+        threading.Thread(target=run_thread, args=(application, visitor, plan, records, record_from, deadline))
+        for visitor in visitors
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    results.put((worker, records))
+
+
+def prepare_visitors(count, seed):
+    """Log in ``count`` distinct dataset users; returns Visitor objects"""
+    run_id = get_random_string(8)
+    targets = bench.Targets(seed)
+    users = list(User.objects.filter(username__in=targets.pools['user']).order_by('pk')[:count])
+    visitors = []
+    for index in range(count):
+        client = Client()
+        if users:
+            client.force_login(users[index % len(users)])
+        session = client.cookies.get(settings.SESSION_COOKIE_NAME)
+        visitors.append(Visitor(
+            session.value if session else None, targets.clone(seed + index), worker=index, run_id=run_id,
+        ))
+    return visitors
+
+
+def summarize(records, elapsed):
+    latencies = [record[3] for record in records]
+    queries = [record[4] for record in records]
+    errors = sum(1 for record in records if record[2] >= 400)
+    summary = bench.summarize(latencies, queries, errors, elapsed)
+    locked = sum(1 for record in records if record[6])
+    waits = sorted(record[5] for record in records)
+    summary.update({
+        'error_rate': round(errors / len(records), 4) if records else 0.0,
+        'statuses': dict(sorted(Counter(str(record[2]) for record in records).items())),
+        'locked_errors': locked,
+        'write_wait_total_s': round(sum(waits), 3),
+        'write_wait_p95_ms': bench.ms(bench.percentile(waits, 95)),
+        'write_wait_max_ms': bench.ms(waits[-1]) if waits else None,
+    })
+    return summary
+
+
+def run(processes=1, threads=4, duration=30.0, warmup=2.0, write_ratio=0.1,
+        reads=None, writes=None, seed=1):
+    """Run one load configuration; returns a JSON-serializable dict"""
+    reads = reads or DEFAULT_READS
+    writes = list(WRITE_SCENARIOS) if writes is None else writes
+    plan = {'reads': reads, 'writes': writes, 'write_ratio': write_ratio}
+    visitors = prepare_visitors(processes * threads, seed)
+
+    # Children must not share the parent's SQLite handles
+    connections.close_all()
+    context = multiprocessing.get_context('fork')
+    results = context.Queue()
+    started = time.monotonic()
+    record_from = started + warmup
+    deadline = record_from + duration
+    workers = [
+        context.Process(
+            target=run_worker,
+            args=(worker, visitors[worker * threads:(worker + 1) * threads], plan, record_from, deadline, results),
+        )
+        for worker in range(processes)
+    ]
+    for process in workers:
+        process.start()
+    records = []
+    pending = set(range(processes))
+    while pending:
+        try:
+            worker, worker_records = results.get(timeout=1)
+        except queue.Empty:
+            failed = {worker: workers[worker].exitcode for worker in pending if workers[worker].exitcode}
+            if failed or time.monotonic() > deadline + RESULT_TIMEOUT:
+                for process in workers:
+                    if process.is_alive():
+                        process.terminate()
+                raise LoadTestError(
+                    f'Workers {sorted(pending)} sent no results (exit codes: {failed or "still running"})'
+                )
+            continue
+        pending.discard(worker)
+        records.extend(worker_records)
+    for process in workers:
+        process.join()
+
+    by_scenario = {}
+    for record in records:
+        by_scenario.setdefault(record[0], []).append(record)
+    return {
+        'processes': processes,
+        'threads': threads,
+        'clients': processes * threads,
+        'duration_s': duration,
+        'write_ratio': write_ratio,
+        'total': summarize(records, duration),
+        'reads': summarize([record for record in records if not record[1]], duration),
+        'writes': summarize([record for record in records if record[1]], duration),
+        'scenarios': {name: summarize(rows, duration) for name, rows in sorted(by_scenario.items())},
+    }
+
+
+def database_info():
+    from .db import pragma
+
+    connection = connections['default']
+    info = {'vendor': connection.vendor}
+    if connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            for name in ('journal_mode', 'synchronous', 'busy_timeout'):
+                info[name] = pragma(cursor, name)
+    return info
@@ -0,0 +1,134 @@
+"""
+Reproducible latency benchmark
+
+Builds the synthetic dataset from apps.core.bench in a throwaway test
+database, requests each scenario through the test client and prints
+p50/p95/p99 latency, queries per request and throughput as JSON.
+
+    manage.py bench --scale 100k --output bench.json
+    manage.py bench --scale 100k --keepdb --baseline bench.json
+
+With ``--keepdb`` the database (``bench.sqlite3`` for SQLite unless
+``TEST['NAME']`` is set) and its dataset are reused between runs, so large
+scales are only built once. ``--baseline`` compares against an earlier
+``--output`` file and fails when a scenario's p95 grows by more than
+``--threshold`` percent or it runs more queries.
+
+``--asgi`` sends the requests through config/asgi.py instead, with each
+``--concurrency`` level of clients in flight. ``--async-views`` picks the
+read views to serve with their async variant (``all``, ``none`` or URL
+names, see ASYNC_READ_VIEWS), so the sync and async views can be
+compared on the same worker:
+
+    manage.py bench --keepdb --asgi --concurrency 1,16,64 --async-views none -o sync.json
+    manage.py bench --keepdb --asgi --concurrency 1,16,64 --async-views all --baseline sync.json
+"""
+
+import json
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+
+from apps.core import bench
+from apps.core.async_views import ASYNC_VIEW_NAMES
+
+
+class Command(BaseCommand):
+    help = 'Benchmark list, detail and search pages against a synthetic dataset'
+    # Checks load the URLconf, which must wait for --async-views
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', default='10k', help='Number of prompts, e.g. 10k, 100k, 1m')
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument('--scenario', action='append', choices=list(bench.SCENARIOS),
+                            help='Only run this scenario (repeatable)')
+        parser.add_argument('--requests', type=int, default=200, help='Measured requests per scenario')
+        parser.add_argument('--warmup', type=int, default=5, help='Unmeasured requests per scenario')
+        parser.add_argument('--cold', action='store_true', help='Clear the cache before every request')
+        parser.add_argument('--page-cache', action='store_true', help='Leave the anonymous page cache on')
+        parser.add_argument('--keepdb', action='store_true', help='Reuse the benchmark database and dataset')
+        parser.add_argument('--output', '-o', help='Write the JSON result to this file')
+        parser.add_argument('--baseline', help='Compare with an earlier --output file')
+        parser.add_argument('--threshold', type=float, default=10.0, help='Allowed p95 growth in percent')
+        parser.add_argument('--asgi', action='store_true', help='Request through the ASGI application')
+        parser.add_argument('--concurrency', default='1', help='Clients in flight with --asgi; a comma-separated list runs each')
+        parser.add_argument('--async-views', help='With --asgi: "all", "none" or comma-separated URL names')
+
+    def handle(self, *args, **options):
+        try:
+            scale = bench.parse_scale(options['scale'])
+            concurrency = [int(value) for value in options['concurrency'].split(',')]
+        except ValueError:
+            raise CommandError('--scale and --concurrency must be numbers')
+        views = self.async_views(options['async_views'])
+        baseline = None
+        if options['baseline']:
+            with open(options['baseline'], encoding='utf-8') as handle:
+                baseline = json.load(handle)
+
+        bench.quiet_request_logs()
+        with bench.bench_database(options['keepdb'], options['verbosity']):
+            counts = bench.ensure_dataset(scale, options['seed'], options['keepdb'], stdout=self.stderr)
+            with override_settings(PAGE_CACHE_ENABLED=options['page_cache']):
+                if options['asgi']:
+                    with override_settings(**views):
+                        result = bench.run_asgi(
+                            options['scenario'], options['requests'], options['warmup'],
+                            seed=options['seed'], concurrency=concurrency, progress=self.progress,
+                        )
+                else:
+                    result = bench.run(
+                        options['scenario'], options['requests'], options['warmup'],
+                        seed=options['seed'], cold=options['cold'], progress=self.progress,
+                    )
+        result['meta'].update(scale=scale, dataset=counts, page_cache=options['page_cache'])
+
+        if baseline is not None:
+            result['comparison'] = bench.compare(baseline, result, options['threshold'])
+
+        output = json.dumps(result, indent=2)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as handle:
+                handle.write(output + '\n')
+            self.stderr.write(self.style.SUCCESS(f"Wrote {options['output']}"))
+        else:
+            sys.stdout.write(output + '\n')
+
+        if baseline is not None:
+            self.report(result['comparison'])
+
+    def async_views(self, value):
+        """Settings override for --async-views"""
+        if value is None:
+            return {}
+        if value == 'all':
+            return {'ASYNC_READ_VIEWS': list(ASYNC_VIEW_NAMES)}
+        if value == 'none':
+            return {'ASYNC_READ_VIEWS': []}
+        names = value.split(',')
+        unknown = sorted(set(names) - set(ASYNC_VIEW_NAMES))
+        if unknown:
+            raise CommandError(f"No async variant for: {', '.join(unknown)}")
+        return {'ASYNC_READ_VIEWS': names}
+
+    def progress(self, name, result):
+        self.stderr.write(
+            f"{name:<20} p50={result['p50_ms']}ms p95={result['p95_ms']}ms p99={result['p99_ms']}ms "
+            f"queries={result['queries_mean']} {result['throughput_rps']} req/s errors={result['errors']}"
+        )
+
+    def report(self, comparison):
+        regressed = [row['scenario'] for row in comparison if row['regressed']]
+        for row in comparison:
+            if row['p95_change_pct'] is None:
+                self.stderr.write(f"{row['scenario']:<20} not in baseline")
+                continue
+            line = (
+                f"{row['scenario']:<20} p95 {row['p95_before_ms']} -> {row['p95_ms']}ms "
+                f"({row['p95_change_pct']:+.1f}%), queries {row['queries_change']:+}"
+            )
+            self.stderr.write(self.style.ERROR(line) if row['regressed'] else line)
+        if regressed:
+            raise CommandError(f"Regressed against baseline: {', '.join(regressed)}")
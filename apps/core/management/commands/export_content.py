@@ -0,0 +1,51 @@
+"""
+Stream prompts, blog posts or news articles to NDJSON or CSV
+
+Memory use is constant: rows are read in primary-key chunks and written as
+they are encoded. The output can be fed back to ``import_content``.
+"""
+
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.core import export
+from apps.core.search import SEARCHABLE
+
+
+class Command(BaseCommand):
+    help = 'Export prompts, blog posts or news articles as NDJSON or CSV'
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=list(SEARCHABLE))
+        parser.add_argument('--format', choices=list(export.FORMATS), default='ndjson')
+        parser.add_argument('--output', '-o', default='-', help="Output file, or '-' for stdout")
+        parser.add_argument('--gzip', action='store_true', help='Gzip the output')
+        parser.add_argument('--updated-since', help='Only rows updated at or after this ISO date/datetime')
+        parser.add_argument('--chunk-size', type=int, default=export.DEFAULT_CHUNK_SIZE, help='Rows per query')
+
+    def handle(self, *args, **options):
+        updated_since = None
+        if options['updated_since']:
+            updated_since = export.parse_since(options['updated_since'])
+            if updated_since is None:
+                raise CommandError('--updated-since must be an ISO 8601 date or datetime')
+
+        chunks = export.stream(
+            options['kind'], options['format'], updated_since,
+            compress=options['gzip'], chunk_size=options['chunk_size'],
+        )
+        if options['output'] == '-':
+            self.write(sys.stdout.buffer, chunks)
+            return
+        with open(options['output'], 'wb') as output:
+            written = self.write(output, chunks)
+        self.stderr.write(self.style.SUCCESS(f"Wrote {written} bytes to {options['output']}"))
+
+    def write(self, output, chunks):
+        written = 0
+        for chunk in chunks:
+            output.write(chunk)
+            written += len(chunk)
+        output.flush()
+        return written
@@ -0,0 +1,19 @@
+"""
+Write buffered view counts that worker processes could not write on exit
+
+Run periodically from cron, e.g.:
+
+    */5 * * * * manage.py flush_view_counts
+"""
+
+from django.core.management.base import BaseCommand
+
+from apps.core.view_counter import flush_spilled
+
+
+class Command(BaseCommand):
+    help = 'Write view counts saved to VIEW_COUNT_SPILL_DIR by exiting workers'
+
+    def handle(self, *args, **options):
+        total = flush_spilled()
+        self.stdout.write(self.style.SUCCESS(f'Wrote {total} saved view count files'))
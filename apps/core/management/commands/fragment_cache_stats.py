@@ -0,0 +1,23 @@
+"""
+Show hit/miss counters for the shared context fragment cache
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.core import fragments
+
+
+class Command(BaseCommand):
+    help = 'Show hit/miss counters for cached context fragments (each process reports every FRAGMENT_STATS_INTERVAL seconds)'
+
+    def handle(self, *args, **options):
+        if not fragments.cache_is_shared():
+            raise CommandError(
+                'The default cache is local to each process, so the counters of the '
+                'running server cannot be read from here. Configure a shared cache '
+                '(see config/settings/prod.py).'
+            )
+        for key, counts in sorted(fragments.stats().items()):
+            total = counts['hits'] + counts['misses']
+            ratio = counts['hits'] / total * 100 if total else 0
+            self.stdout.write(f"{key:30} hits={counts['hits']:<8} misses={counts['misses']:<8} hit rate={ratio:.1f}%")
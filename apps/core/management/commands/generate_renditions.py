@@ -0,0 +1,25 @@
+"""
+Render responsive image sizes for existing uploads
+"""
+
+from django.apps import apps
+from django.core.management.base import BaseCommand
+
+from apps.core import images
+
+
+class Command(BaseCommand):
+    help = 'Generate image renditions for uploaded blog, news and avatar images'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--missing', action='store_true', help='Only images whose renditions were never generated')
+
+    def handle(self, *args, **options):
+        for label, fields in images.IMAGE_FIELDS.items():
+            model = apps.get_model(label)
+            rendered = 0
+            for field_name, presets in fields.items():
+                queryset = model._default_manager.exclude(**{field_name: ''}).exclude(**{f'{field_name}__isnull': True})
+                for instance in queryset.only('pk', field_name).iterator():
+                    rendered += images.render_field(instance, field_name, presets, missing_only=options['missing'])
+            self.stdout.write(self.style.SUCCESS(f'{label}: {rendered} renditions'))
@@ -0,0 +1,222 @@
+"""
+Bulk import prompts, blog posts or news articles from JSONL or CSV
+
+Rows are streamed from the input, so memory use is bounded by the chunk
+size. Categories and authors are resolved through maps loaded once, slugs
+are allocated in memory against the existing slug set, and each chunk is
+inserted with ``bulk_create`` in its own transaction. ``bulk_create`` sends
+no signals, so tag links, the search index, cached counts, cached pages,
+fragments and author profile counters are updated in bulk per chunk and
+once at the end, and related items are computed for the imported rows
+only (see ``related.rebuild``).
+
+Keys are model field names; ``category`` is a category name or slug and
+``author`` a username. ``tags`` is the usual comma-separated string.
+Fields with ``auto_now``/``auto_now_add`` are set to the import time.
+Columns the site maintains itself (view and comment counts, trending
+scores) are ignored, and every row is validated with ``full_clean()``.
+"""
+
+import csv
+import json
+import sys
+import time
+
+from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import models, transaction
+from django.utils import timezone
+
+from apps.core import counting, fragments, page_cache, related, tags
+from apps.core.search import SEARCHABLE, get_model, get_search_backend, is_published
+from apps.core.slugs import SlugAllocator
+from apps.users import stats as profile_stats
+
+
+# Maintained by the view counter and comment signals; the non-editable
+# trending columns are left out as well
+DERIVED_FIELDS = {'views', 'comment_count'}
+
+
+class Command(BaseCommand):
+    help = 'Bulk import prompts, blog posts or news articles from a JSONL or CSV file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=list(SEARCHABLE))
+        parser.add_argument('path', help="Input file, or '-' for stdin")
+        parser.add_argument('--format', choices=['jsonl', 'csv'], help='Defaults to the file extension')
+        parser.add_argument('--chunk-size', type=int, default=10000, help='Rows per transaction')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows per INSERT')
+        parser.add_argument('--default-author', help='Username for rows without an author')
+        parser.add_argument('--create-categories', action='store_true', help='Create unknown categories')
+        parser.add_argument('--skip-invalid', action='store_true', help='Report and skip bad rows instead of stopping')
+        parser.add_argument('--skip-related', action='store_true', help='Do not compute related items for the imported rows')
+
+    def handle(self, *args, **options):
+        self.kind = options['kind']
+        self.model = get_model(self.kind)
+        self.options = options
+        self.fields = {
+            field.name: field
+            for field in self.model._meta.concrete_fields
+            if not field.primary_key and not field.is_relation
+            and field.editable and field.name not in DERIVED_FIELDS
+        }
+        self.has_author = any(field.name == 'author' for field in self.model._meta.concrete_fields)
+        self.unknown_keys = set()
+        self.author_ids = set()
+        self.published_ids = []
+
+        self.load_maps()
+        self.slugs = SlugAllocator(self.model)
+
+        started = time.monotonic()
+        imported = skipped = 0
+        chunk = []
+        for line_number, row in self.read_rows(options['path'], options['format']):
+            try:
+                chunk.append(self.build(row))
+            except (KeyError, ValueError, ValidationError) as exc:
+                if not options['skip_invalid']:
+                    raise CommandError(f'Row {line_number}: {exc}')
+                self.stderr.write(f'Skipping row {line_number}: {exc}')
+                skipped += 1
+                continue
+            if len(chunk) >= options['chunk_size']:
+                imported += self.insert(chunk)
+                chunk = []
+                self.report(imported, started)
+        if chunk:
+            imported += self.insert(chunk)
+
+        self.finish()
+        if not options['skip_related']:
+            related.rebuild(self.kind, new_pks=self.published_ids)
+
+        elapsed = max(time.monotonic() - started, 1e-6)
+        self.stdout.write(self.style.SUCCESS(
+            f'Imported {imported} {self.kind} rows in {elapsed:.1f}s '
+            f'({imported / elapsed:.0f} rows/s, {skipped} skipped)'
+        ))
+
+    # Input
+
+    def read_rows(self, path, fmt):
+        """Yield (line number, dict) pairs"""
+        if fmt is None:
+            fmt = 'csv' if path.lower().endswith('.csv') else 'jsonl'
+        handle = sys.stdin if path == '-' else open(path, encoding='utf-8', newline='')
+        try:
+            if fmt == 'csv':
+                for index, row in enumerate(csv.DictReader(handle), start=2):
+                    yield index, row
+            else:
+                for index, line in enumerate(handle, start=1):
+                    if line.strip():
+                        try:
+                            yield index, json.loads(line)
+                        except json.JSONDecodeError as exc:
+                            raise CommandError(f'Row {index}: invalid JSON ({exc})')
+        finally:
+            if handle is not sys.stdin:
+                handle.close()
+
+    # Lookups
+
+    def load_maps(self):
+        category_model = self.model._meta.get_field('category').related_model
+        self.category_model = category_model
+        self.categories = {}
+        for pk, name, slug in category_model.objects.values_list('pk', 'name', 'slug'):
+            self.categories[slug] = pk
+            self.categories[name.lower()] = pk
+
+        self.authors = {}
+        self.default_author = None
+        if self.has_author:
+            self.authors = dict(User.objects.values_list('username', 'pk').iterator())
+            username = self.options['default_author']
+            if username:
+                if username not in self.authors:
+                    raise CommandError(f'Unknown default author "{username}"')
+                self.default_author = self.authors[username]
+
+    def category_id(self, value):
+        if not value:
+            return None
+        key = value.strip()
+        pk = self.categories.get(key) or self.categories.get(key.lower())
+        if pk is None:
+            if not self.options['create_categories']:
+                raise ValueError(f'unknown category "{value}"')
+            category = self.category_model(name=key)
+            category.save()
+            pk = self.categories[category.slug] = self.categories[key.lower()] = category.pk
+        return pk
+
+    def author_id(self, value):
+        if value:
+            if value not in self.authors:
+                raise ValueError(f'unknown author "{value}"')
+            return self.authors[value]
+        if self.default_author is None:
+            raise ValueError('no author and no --default-author')
+        return self.default_author
+
+    # Rows
+
+    def build(self, row):
+        """Return an unsaved model instance for an input row"""
+        if not (row.get('title') or '').strip():
+            raise ValueError('missing title')
+
+        values = {}
+        for key, value in row.items():
+            if key in ('category', 'author', 'slug'):
+                continue
+            field = self.fields.get(key)
+            if field is None:
+                if key not in self.unknown_keys:
+                    self.unknown_keys.add(key)
+                    self.stderr.write(f'Ignoring column "{key}" (unknown or maintained by the site)')
+                continue
+            if value in ('', None) and not isinstance(field, (models.CharField, models.TextField)):
+                continue
+            values[key] = field.to_python(value)
+
+        instance = self.model(**values)
+        instance.slug = self.slugs.allocate(row.get('slug') or instance.title)
+        instance.category_id = self.category_id(row.get('category'))
+        if self.has_author:
+            instance.author_id = self.author_id(row.get('author'))
+            self.author_ids.add(instance.author_id)
+        # Mirror BlogPost.save(): published posts always have a publish date
+        if getattr(instance, 'status', None) == 'published' and not instance.published_at:
+            instance.published_at = timezone.now()
+        # Category and author come from the maps and slugs from the
+        # allocator, so skip the checks that would query per row
+        instance.full_clean(exclude=['category', 'author'], validate_unique=False, validate_constraints=False)
+        return instance
+
+    def insert(self, instances):
+        """Insert one chunk and its tag links and index entries atomically"""
+        with transaction.atomic():
+            self.model.objects.bulk_create(instances, batch_size=self.options['batch_size'])
+            tags.link_new_instances(self.model, [obj for obj in instances if obj.tags])
+            published = [obj for obj in instances if is_published(self.kind, obj)]
+            get_search_backend().index_many(self.kind, published)
+        self.published_ids.extend(obj.pk for obj in published)
+        return len(instances)
+
+    def finish(self):
+        """Invalidate caches that signals would normally have cleared"""
+        counting.bump_version(self.model)
+        page_cache.purge_list(self.model)
+        fragments.invalidate_model(self.model._meta.label)
+        if self.author_ids:
+            profile_stats.recount(self.author_ids)
+
+    def report(self, imported, started):
+        elapsed = max(time.monotonic() - started, 1e-6)
+        self.stdout.write(f'{imported} rows ({imported / elapsed:.0f} rows/s)')
@@ -0,0 +1,91 @@
+"""
+Concurrent read/write load test against the WSGI application
+
+Uses the benchmark database and dataset (see ``manage.py bench``) and runs
+apps.core.loadtest once per ``--processes`` value, so one command shows
+how throughput, tail latency, lock wait and ``database is locked`` errors
+scale with workers:
+
+    manage.py loadtest --scale 100k --keepdb --processes 1,2,4,8 --threads 4
+    manage.py loadtest --settings config.settings.prod --keepdb --write-ratio 0.3
+
+Pass the settings to compare (e.g. the production SQLite pragmas) with
+``--settings``; production settings need ``collectstatic`` to have run.
+"""
+
+import json
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from apps.core import bench, loadtest
+
+
+class Command(BaseCommand):
+    help = 'Run concurrent reads and writes through the WSGI app and report contention'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', default='10k', help='Number of prompts, e.g. 10k, 100k, 1m')
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument('--processes', default='1', help='Worker processes; a comma-separated list runs each in turn')
+        parser.add_argument('--threads', type=int, default=4, help='Threads (simulated visitors) per process')
+        parser.add_argument('--duration', type=float, default=30.0, help='Measured seconds per run')
+        parser.add_argument('--warmup', type=float, default=2.0, help='Unmeasured seconds before each run')
+        parser.add_argument('--write-ratio', type=float, default=0.1, help='Share of requests that write')
+        parser.add_argument('--read', action='append', choices=list(bench.SCENARIOS),
+                            help='Read scenario to include (repeatable)')
+        parser.add_argument('--write', action='append', choices=list(loadtest.WRITE_SCENARIOS),
+                            help='Write scenario to include (repeatable)')
+        parser.add_argument('--keepdb', action='store_true', help='Reuse the benchmark database and dataset')
+        parser.add_argument('--output', '-o', help='Write the JSON result to this file')
+
+    def handle(self, *args, **options):
+        try:
+            scale = bench.parse_scale(options['scale'])
+            processes = [int(value) for value in options['processes'].split(',')]
+        except ValueError:
+            raise CommandError('--scale and --processes must be numbers')
+        if not 0 <= options['write_ratio'] <= 1:
+            raise CommandError('--write-ratio must be between 0 and 1')
+
+        runs = []
+        with bench.bench_database(options['keepdb'], options['verbosity']):
+            counts = bench.ensure_dataset(scale, options['seed'], options['keepdb'], stdout=self.stderr)
+            database = loadtest.database_info()
+            for count in processes:
+                try:
+                    result = loadtest.run(
+                        processes=count, threads=options['threads'], duration=options['duration'],
+                        warmup=options['warmup'], write_ratio=options['write_ratio'],
+                        reads=options['read'], writes=options['write'], seed=options['seed'],
+                    )
+                except loadtest.LoadTestError as exc:
+                    raise CommandError(str(exc))
+                self.progress(result)
+                runs.append(result)
+
+        output = json.dumps({
+            'meta': {
+                'created': timezone.now().isoformat(),
+                'scale': scale,
+                'dataset': counts,
+                'database': database,
+            },
+            'runs': runs,
+        }, indent=2)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as handle:
+                handle.write(output + '\n')
+            self.stderr.write(self.style.SUCCESS(f"Wrote {options['output']}"))
+        else:
+            sys.stdout.write(output + '\n')
+
+    def progress(self, result):
+        total, writes = result['total'], result['writes']
+        self.stderr.write(
+            f"{result['processes']}x{result['threads']} clients: {total['throughput_rps']} req/s "
+            f"p50={total['p50_ms']}ms p95={total['p95_ms']}ms p99={total['p99_ms']}ms "
+            f"errors={total['error_rate']:.2%} locked={total['locked_errors']} "
+            f"write p95={writes['p95_ms']}ms write wait={writes['write_wait_total_s']}s"
+        )
@@ -0,0 +1,22 @@
+"""
+Recompute the precomputed related-content tables
+"""
+
+from django.core.management.base import BaseCommand
+
+from apps.core.related import RELATED, rebuild
+
+
+class Command(BaseCommand):
+    help = 'Recompute related items for prompts, blog posts and news'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--kind', choices=list(RELATED), help='Only rebuild one content type')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        kinds = [options['kind']] if options['kind'] else list(RELATED)
+
+        for kind in kinds:
+            total = rebuild(kind, batch_size=options['batch_size'])
+            self.stdout.write(self.style.SUCCESS(f'Wrote {total} related {kind} rows'))
@@ -0,0 +1,38 @@
+"""
+Rebuild the full-text search index from the content tables
+"""
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from apps.core.search import SEARCHABLE, get_model, get_search_backend
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the full-text search index for prompts, blog posts and news'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--kind', choices=list(SEARCHABLE), help='Only rebuild one content type')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        backend = get_search_backend()
+        kinds = [options['kind']] if options['kind'] else list(SEARCHABLE)
+        batch_size = options['batch_size']
+
+        for kind in kinds:
+            queryset = get_model(kind).objects.filter(**SEARCHABLE[kind]['published']).order_by('pk')
+            total = 0
+            with transaction.atomic():
+                backend.clear(kind)
+                batch = []
+                for obj in queryset.iterator(chunk_size=batch_size):
+                    batch.append(obj)
+                    if len(batch) >= batch_size:
+                        backend.index_many(kind, batch)
+                        total += len(batch)
+                        batch = []
+                if batch:
+                    backend.index_many(kind, batch)
+                    total += len(batch)
+            self.stdout.write(self.style.SUCCESS(f'Indexed {total} {kind} documents'))
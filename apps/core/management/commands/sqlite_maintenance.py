@@ -0,0 +1,74 @@
+"""
+Routine SQLite maintenance
+
+Refreshes planner statistics (``PRAGMA optimize``, or a full ``ANALYZE``),
+returns free pages to the filesystem with an incremental vacuum and
+truncates the WAL file. Cheap enough to run from cron every night.
+"""
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from apps.core.db import pragma
+
+
+class Command(BaseCommand):
+    help = 'Run ANALYZE/PRAGMA optimize, incremental vacuum and a WAL checkpoint on the SQLite database'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--analyze', action='store_true', help='Run a full ANALYZE instead of PRAGMA optimize')
+        parser.add_argument('--vacuum-pages', type=int, default=0, help='Free pages to release (0 = all)')
+        parser.add_argument(
+            '--enable-incremental-vacuum', action='store_true',
+            help='Switch auto_vacuum to INCREMENTAL; runs one full VACUUM, which locks the database',
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError('This command only supports SQLite databases')
+
+        with connection.cursor() as cursor:
+            self.report(cursor, 'Before')
+
+            started = time.monotonic()
+            if options['analyze']:
+                cursor.execute('ANALYZE')
+            else:
+                # Limit the work per index on large tables
+                cursor.execute('PRAGMA analysis_limit = 1000')
+                cursor.execute('PRAGMA optimize')
+            self.stdout.write(f'Statistics refreshed in {time.monotonic() - started:.2f}s')
+
+            if options['enable_incremental_vacuum'] and pragma(cursor, 'auto_vacuum') != 2:
+                cursor.execute('PRAGMA auto_vacuum = INCREMENTAL')
+                cursor.execute('VACUUM')
+                self.stdout.write('auto_vacuum set to INCREMENTAL (full VACUUM done)')
+
+            if pragma(cursor, 'auto_vacuum') == 2:
+                freed = pragma(cursor, 'freelist_count')
+                if options['vacuum_pages']:
+                    cursor.execute(f"PRAGMA incremental_vacuum({options['vacuum_pages']})")
+                else:
+                    cursor.execute('PRAGMA incremental_vacuum')
+                cursor.fetchall()
+                self.stdout.write(f"Incremental vacuum: {freed - pragma(cursor, 'freelist_count')} pages released")
+            elif pragma(cursor, 'freelist_count'):
+                self.stdout.write('auto_vacuum is off; use --enable-incremental-vacuum to reclaim free pages')
+
+            if pragma(cursor, 'journal_mode') == 'wal':
+                cursor.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+                busy, log_frames, checkpointed = cursor.fetchone()
+                self.stdout.write(f'WAL checkpoint: {checkpointed}/{log_frames} frames' + (' (busy)' if busy else ''))
+
+            self.report(cursor, 'After')
+
+    def report(self, cursor, label):
+        page_size = pragma(cursor, 'page_size')
+        pages = pragma(cursor, 'page_count')
+        free = pragma(cursor, 'freelist_count')
+        self.stdout.write(
+            f'{label}: {pages * page_size / 1048576:.1f} MB in {pages} pages, '
+            f'{free} free, journal_mode={pragma(cursor, "journal_mode")}'
+        )
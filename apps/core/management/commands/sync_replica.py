@@ -0,0 +1,41 @@
+"""
+Copy the primary SQLite database into each local SQLite replica
+
+For development and tests of the replica routing; real deployments keep
+replicas in sync with the database's own replication (e.g. Litestream or
+LiteFS for SQLite, streaming replication elsewhere).
+"""
+
+import sqlite3
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from apps.core.routing import get_replicas
+
+
+class Command(BaseCommand):
+    help = 'Copy the default SQLite database into the configured SQLite replicas'
+
+    def handle(self, *args, **options):
+        replicas = get_replicas()
+        if not replicas:
+            raise CommandError('No DATABASE_REPLICAS configured')
+        primary = connections[DEFAULT_DB_ALIAS]
+        if primary.vendor != 'sqlite':
+            raise CommandError('sync_replica only copies SQLite databases')
+
+        for alias in replicas:
+            replica = connections[alias]
+            if replica.vendor != 'sqlite':
+                raise CommandError(f'Replica {alias!r} is not SQLite')
+            replica.close()
+            # The backup API copies a consistent snapshot while writers continue
+            source = sqlite3.connect(primary.settings_dict['NAME'])
+            target = sqlite3.connect(replica.settings_dict['NAME'])
+            try:
+                source.backup(target)
+            finally:
+                target.close()
+                source.close()
+            self.stdout.write(self.style.SUCCESS(f"Copied {primary.settings_dict['NAME']} to {alias} ({replica.settings_dict['NAME']})"))
@@ -0,0 +1,26 @@
+"""
+Recompute the time-decayed trending scores
+
+Run periodically, e.g. every 15 minutes from cron:
+
+    */15 * * * * manage.py update_trending
+"""
+
+from django.core.management.base import BaseCommand
+
+from apps.core.trending import TRENDING, update
+
+
+class Command(BaseCommand):
+    help = 'Update trending scores for prompts, blog posts and news'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--kind', choices=list(TRENDING), help='Only update one content type')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        kinds = [options['kind']] if options['kind'] else list(TRENDING)
+
+        for kind in kinds:
+            total = update(kind, batch_size=options['batch_size'])
+            self.stdout.write(self.style.SUCCESS(f'Updated {total} {kind} trending scores'))
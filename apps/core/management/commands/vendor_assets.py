@@ -0,0 +1,41 @@
+"""
+Download third-party CSS, JS and fonts into static/vendor/
+
+The files are meant to be committed, so builds and pages do not depend on
+public CDNs. Existing files are kept unless --force is given.
+"""
+
+import urllib.request
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.core import assets
+
+
+class Command(BaseCommand):
+    help = 'Download vendored third-party static assets into static/vendor/'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help='Download files that already exist')
+        parser.add_argument('--timeout', type=int, default=30)
+
+    def handle(self, *args, **options):
+        root = Path(settings.STATICFILES_DIRS[0])
+        downloaded = 0
+        for path, url in assets.VENDOR_FILES:
+            target = root / path
+            if target.exists() and not options['force']:
+                continue
+            try:
+                with urllib.request.urlopen(url, timeout=options['timeout']) as response:
+                    content = response.read()
+            except OSError as exc:
+                raise CommandError(f'Could not download {url}: {exc}')
+            target.parent.mkdir(parents=True, exist_ok=True)
+            target.write_bytes(content)
+            downloaded += 1
+            self.stdout.write(f'{path} ({len(content)} bytes)')
+        assets.is_vendored.cache_clear()
+        self.stdout.write(self.style.SUCCESS(f'Downloaded {downloaded} of {len(assets.VENDOR_FILES)} files'))
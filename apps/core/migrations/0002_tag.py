@@ -0,0 +1,29 @@
+# Generated by Django 5.0 on 2026-10-18 20:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('core', '0001_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tag',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('slug', models.SlugField(allow_unicode=True, max_length=60, unique=True)),
+                ('usage_count', models.PositiveIntegerField(default=0, help_text='Number of tagged items')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['name'],
+                'indexes': [models.Index(fields=['-usage_count'], name='core_tag_usage_c_7f2772_idx')],
+            },
+        ),
+    ]
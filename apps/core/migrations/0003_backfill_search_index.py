@@ -0,0 +1,35 @@
+from django.db import migrations
+
+
+def backfill_search_index(apps, schema_editor):
+    """Index the content that existed before the search index"""
+    from apps.core.search import SEARCHABLE, get_search_backend
+
+    # The index table only exists on SQLite (see 0001_search_index)
+    if schema_editor.connection.vendor != 'sqlite' or schema_editor.connection.alias != 'default':
+        return
+    backend = get_search_backend()
+    for kind, conf in SEARCHABLE.items():
+        model = apps.get_model(conf['model'])
+        batch = []
+        for obj in model.objects.filter(**conf['published']).order_by('pk').iterator(chunk_size=1000):
+            batch.append(obj)
+            if len(batch) >= 1000:
+                backend.index_many(kind, batch)
+                batch = []
+        if batch:
+            backend.index_many(kind, batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_tag'),
+        ('prompts', '0001_initial'),
+        ('blog', '0001_initial'),
+        ('news', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_search_index, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,73 @@
+from django.db import migrations
+from django.db.models import Count
+
+
+# (model, through model, content field, published filter)
+TAGGED = [
+    ('prompts.Prompt', 'prompts.PromptTag', 'prompt', {'is_published': True}),
+    ('blog.BlogPost', 'blog.BlogPostTag', 'post', {'status': 'published'}),
+    ('news.NewsArticle', 'news.NewsArticleTag', 'article', {'is_published': True}),
+]
+
+
+def resync_tags(apps, schema_editor):
+    """
+    Rebuild the tag links with the slug rule that keeps "C++" apart from
+    "C", and recount usage_count from published items only
+    """
+    from apps.core.slugs import tag_slug
+
+    Tag = apps.get_model('core', 'Tag')
+    tags = {tag.slug: tag for tag in Tag.objects.all()}
+
+    # A tag first created as "C++" holds the slug "c"; give it its own slug
+    # so a "C" tag can be created
+    for tag in list(tags.values()):
+        slug = tag_slug(tag.name)
+        if slug and slug != tag.slug and slug not in tags:
+            del tags[tag.slug]
+            tag.slug = slug
+            tag.save(update_fields=['slug'])
+            tags[slug] = tag
+
+    for label, through_label, field, published in TAGGED:
+        model = apps.get_model(label)
+        through = apps.get_model(through_label)
+        links = []
+        for pk, value in model.objects.exclude(tags='').values_list('pk', 'tags').iterator():
+            slugs = set()
+            for name in value.split(','):
+                name = ' '.join(name.split())[:50]
+                slug = tag_slug(name)
+                if not slug or slug in slugs:
+                    continue
+                slugs.add(slug)
+                if slug not in tags:
+                    tags[slug] = Tag.objects.create(name=name, slug=slug)
+                links.append(through(**{f'{field}_id': pk, 'tag_id': tags[slug].pk}))
+        through.objects.all().delete()
+        through.objects.bulk_create(links, batch_size=500)
+
+    Tag.objects.update(usage_count=0)
+    usage = {}
+    for label, through_label, field, published in TAGGED:
+        through = apps.get_model(through_label)
+        filters = {f'{field}__{name}': value for name, value in published.items()}
+        for row in through.objects.filter(**filters).values('tag').annotate(total=Count('id')):
+            usage[row['tag']] = usage.get(row['tag'], 0) + row['total']
+    for tag_id, total in usage.items():
+        Tag.objects.filter(pk=tag_id).update(usage_count=total)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_backfill_search_index'),
+        ('prompts', '0002_tags'),
+        ('blog', '0002_tags'),
+        ('news', '0002_tags'),
+    ]
+
+    operations = [
+        migrations.RunPython(resync_tags, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,47 @@
+"""
+Models for Core app
+"""
+
+from django.db import models
+from django.urls import reverse
+
+from .slugs import TAG_SLUG_MAX_LENGTH, tag_slug
+
+
+class Tag(models.Model):
+    """
+    Shared tag for prompts, blog posts and news articles
+    """
+    name = models.CharField(max_length=50, unique=True)
+    slug = models.SlugField(max_length=TAG_SLUG_MAX_LENGTH, unique=True, allow_unicode=True)
+    usage_count = models.PositiveIntegerField(default=0, help_text="Number of tagged items")
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['name']
+        indexes = [
+            models.Index(fields=['-usage_count']),
+        ]
+    
+    def save(self, *args, **kwargs):
+        if not self.slug:
+            self.slug = tag_slug(self.name)
+        super().save(*args, **kwargs)
+    
+    def get_absolute_url(self):
+        return reverse('core:tag_detail', kwargs={'slug': self.slug})
+    
+    def __str__(self):
+        return self.name
+
+
+class RelatedContent(models.Model):
+    """
+    Precomputed "related items" row; each content app subclasses this with
+    ``source`` and ``target`` foreign keys to its own model
+    """
+    score = models.FloatField()
+    
+    class Meta:
+        abstract = True
+        ordering = ['-score']
@@ -0,0 +1,186 @@
+"""
+Full-page response cache for anonymous visitors
+
+Rendered list and detail pages are cached for logged-out requests, keyed on
+path, query string, active language and the session theme/language used by
+the ``site_settings`` context processor. Authenticated users, requests with
+pending flash messages and responses that set cookies or use a CSRF token
+always bypass the cache.
+
+Purging is done with version counters rather than key deletion: saving or
+deleting a Prompt, BlogPost or NewsArticle bumps the list version of its
+model and the version of that object's detail page (under its old slug
+too when the slug changed), which orphans exactly the affected entries.
+
+The counters live in the default cache, so purges reach every process only
+when that cache is shared (see config/settings/prod.py). With the
+per-process LocMemCache other processes keep serving their copy of a page
+until it expires, i.e. for at most PAGE_CACHE_TIMEOUT seconds.
+"""
+
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.template.response import SimpleTemplateResponse
+from django.views.generic.detail import SingleObjectMixin
+
+from .view_counter import view_counts
+
+
+def list_version_key(model):
+    return f'pagecache:v:list:{model._meta.label_lower}'
+
+
+def object_version_key(model, slug):
+    return f'pagecache:v:obj:{model._meta.label_lower}:{slug}'
+
+
+def get_versions(keys):
+    """Return the current value of each version counter, creating missing ones"""
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, time.time_ns(), None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def purge_object(model, slug):
+    """Invalidate the list pages of ``model`` and the detail page of ``slug``"""
+    now = time.time_ns()
+    cache.set_many({list_version_key(model): now, object_version_key(model, slug): now}, None)
+
+
+def purge_list(model):
+    """Invalidate the list pages of ``model`` (e.g. after a bulk insert)"""
+    cache.set(list_version_key(model), time.time_ns(), None)
+
+
+def remember_slug(sender, instance, raw=False, **kwargs):
+    """``pre_save`` receiver: the stored slug, so a rename purges the old URL"""
+    instance._page_cache_slug = None
+    if not raw and not instance._state.adding and instance.pk is not None:
+        instance._page_cache_slug = (
+            sender._default_manager.filter(pk=instance.pk).values_list('slug', flat=True).first()
+        )
+
+
+def purge_on_change(sender, instance, **kwargs):
+    """``post_save``/``post_delete`` receiver for cached content models"""
+    purge_object(sender, instance.slug)
+    old_slug = getattr(instance, '_page_cache_slug', None)
+    if old_slug and old_slug != instance.slug:
+        cache.set(object_version_key(sender, old_slug), time.time_ns(), None)
+    instance._page_cache_slug = None
+
+
+class AnonymousPageCacheMixin:
+    """
+    View mixin caching the full response for anonymous GET requests.
+
+    Detail views (SingleObjectMixin) are keyed on the object's slug version,
+    other views on the list version of ``model``. Cache hits on detail pages
+    still record a buffered view count.
+    """
+    page_cache_timeout = None
+
+    def page_cache_enabled(self):
+        request = self.request
+        if not getattr(settings, 'PAGE_CACHE_ENABLED', True):
+            return False
+        if request.method not in ('GET', 'HEAD'):
+            return False
+        if request.user.is_authenticated:
+            return False
+        # Pages rendered now would swallow (or later replay) flash messages
+        if 'messages' in request.COOKIES or '_messages' in request.session:
+            return False
+        return True
+
+    def get_page_cache_versions(self):
+        model = self.model
+        if isinstance(self, SingleObjectMixin):
+            return get_versions([object_version_key(model, self.kwargs.get(self.slug_url_kwarg))])
+        return get_versions([list_version_key(model)])
+
+    def get_page_cache_key(self):
+        request = self.request
+        parts = [
+            request.path,
+            '&'.join(sorted(request.GET.urlencode().split('&'))),
+            getattr(request, 'LANGUAGE_CODE', ''),
+            request.session.get('language', ''),
+            request.session.get('theme', ''),
+            *map(str, self.get_page_cache_versions()),
+        ]
+        digest = hashlib.sha1('|'.join(parts).encode()).hexdigest()
+        return f'pagecache:page:{digest}'
+
+    def dispatch(self, request, *args, **kwargs):
+        # self.request/kwargs are set by View.setup() before dispatch
+        key, cached = self.get_cached_page()
+        if cached is not None:
+            return cached
+        response = super().dispatch(request, *args, **kwargs)
+        if key is not None:
+            self.cache_page(key, response)
+        return response
+
+    def get_cached_page(self):
+        """
+        Return (key, cached response or None); the key is None when the
+        page cache does not apply to this request
+        """
+        if not self.page_cache_enabled():
+            return None, None
+        key = self.get_page_cache_key()
+        entry = cache.get(key)
+        if entry is None:
+            return key, None
+        if entry.get('view_count'):
+            view_counts.record_pk(*entry['view_count'])
+        response = HttpResponse(entry['content'], status=entry['status'])
+        for header, value in entry['headers'].items():
+            response[header] = value
+        response['X-Page-Cache'] = 'hit'
+        return key, response
+
+    def cache_page(self, key, response):
+        """Store ``response`` under ``key`` once it is rendered"""
+        if isinstance(response, SimpleTemplateResponse) and not response.is_rendered:
+            response.add_post_render_callback(lambda rendered: self.store_page(key, rendered))
+        else:
+            self.store_page(key, response)
+        response['X-Page-Cache'] = 'miss'
+
+    def is_response_cacheable(self, response):
+        request = self.request
+        return (
+            response.status_code == 200
+            and not response.streaming
+            and not response.cookies
+            and not request.META.get('CSRF_COOKIE_NEEDS_UPDATE')
+            and not request.session.modified
+        )
+
+    def store_page(self, key, response):
+        if not self.is_response_cacheable(response):
+            return
+        entry = {
+            'content': response.content,
+            'status': response.status_code,
+            'headers': {
+                header: response[header]
+                for header in ('Content-Type', 'Content-Language')
+                if response.has_header(header)
+            },
+            'view_count': None,
+        }
+        obj = getattr(self, 'object', None)
+        if isinstance(self, SingleObjectMixin) and obj is not None and hasattr(obj, 'increment_views'):
+            entry['view_count'] = (obj._meta.label, obj.pk)
+        timeout = self.page_cache_timeout or getattr(settings, 'PAGE_CACHE_TIMEOUT', 120)
+        cache.set(key, entry, timeout)
@@ -0,0 +1,198 @@
+"""
+Keyset (cursor) pagination
+
+Pages are fetched with ``WHERE (a, b) < (last_a, last_b) ORDER BY a, b
+LIMIT n`` instead of ``OFFSET``, so every page costs the same as the first
+and no ``COUNT(*)`` is needed. Cursors are opaque URL-safe tokens holding
+the ordering values of the boundary row and the paging direction.
+"""
+
+import base64
+import binascii
+import json
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from django.http import Http404, JsonResponse
+from django.template.loader import render_to_string
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+class CursorPaginator:
+    """
+    Paginate a queryset by a fixed ordering of non-null fields, e.g.
+    ``('-created_at', '-id')``. The last field must be unique.
+    Works with model instances and ``.values()`` rows.
+    """
+
+    def __init__(self, queryset, per_page, ordering):
+        self.queryset = queryset
+        self.per_page = int(per_page)
+        self.ordering = tuple(ordering)
+        self.fields = [field.lstrip('-') for field in self.ordering]
+
+    def encode_cursor(self, row, direction):
+        values = [self.value_of(row, field) for field in self.fields]
+        payload = json.dumps([direction, [str(value) for value in values]], separators=(',', ':'))
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, cursor):
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            direction, raw_values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            if direction not in ('next', 'prev') or len(raw_values) != len(self.fields):
+                raise InvalidCursor(cursor)
+            opts = self.queryset.model._meta
+            values = [opts.get_field(field).to_python(value) for field, value in zip(self.fields, raw_values)]
+        except (binascii.Error, ValidationError, ValueError, TypeError, UnicodeDecodeError) as exc:
+            raise InvalidCursor(cursor) from exc
+        return direction, values
+
+    @staticmethod
+    def value_of(row, field):
+        if isinstance(row, dict):
+            return row[field]
+        return getattr(row, field)
+
+    def seek_filter(self, values, reverse=False):
+        """Q matching rows strictly after ``values`` in the ordering"""
+        condition = Q()
+        for index, field in enumerate(self.ordering):
+            name = field.lstrip('-')
+            descending = field.startswith('-') != reverse
+            lookup = f'{name}__lt' if descending else f'{name}__gt'
+            term = Q(**{lookup: values[index]})
+            for prev_name, prev_value in zip(self.fields[:index], values[:index]):
+                term &= Q(**{prev_name: prev_value})
+            condition |= term
+        return condition
+
+    def reversed_ordering(self):
+        return [field[1:] if field.startswith('-') else f'-{field}' for field in self.ordering]
+
+    def page(self, cursor=None):
+        """Return the CursorPage for ``cursor`` (None for the first page)"""
+        direction, values, queryset = self.page_queryset(cursor)
+        return self.build_page(direction, values, list(queryset))
+
+    async def apage(self, cursor=None):
+        """page() for async views"""
+        direction, values, queryset = self.page_queryset(cursor)
+        return self.build_page(direction, values, [row async for row in queryset])
+
+    def page_queryset(self, cursor):
+        """Return (direction, boundary values, queryset of up to per_page + 1 rows)"""
+        direction, values = ('next', None) if not cursor else self.decode_cursor(cursor)
+        if direction == 'next':
+            queryset = self.queryset.order_by(*self.ordering)
+            if values is not None:
+                queryset = queryset.filter(self.seek_filter(values))
+        else:
+            queryset = self.queryset.order_by(*self.reversed_ordering()).filter(self.seek_filter(values, reverse=True))
+        return direction, values, queryset[:self.per_page + 1]
+
+    def build_page(self, direction, values, rows):
+        has_more = len(rows) > self.per_page
+        if direction == 'next':
+            rows = rows[:self.per_page]
+            has_next, has_previous = has_more, values is not None
+        else:
+            rows = rows[:self.per_page][::-1]
+            has_next, has_previous = True, has_more
+        return CursorPage(rows, self, has_next, has_previous)
+
+
+class CursorPage:
+    """
+    One page from a CursorPaginator; mirrors the parts of Django's Page
+    API that templates use
+    """
+    is_cursor = True
+
+    def __init__(self, object_list, paginator, has_next, has_previous):
+        self.object_list = object_list
+        self.paginator = paginator
+        self._has_next = has_next and bool(object_list)
+        self._has_previous = has_previous and bool(object_list)
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self._has_next or self._has_previous
+
+    @property
+    def next_cursor(self):
+        if not self._has_next:
+            return None
+        return self.paginator.encode_cursor(self.object_list[-1], 'next')
+
+    @property
+    def previous_cursor(self):
+        if not self._has_previous:
+            return None
+        return self.paginator.encode_cursor(self.object_list[0], 'prev')
+
+
+class CursorPaginationMixin:
+    """
+    ListView mixin adding keyset pagination.
+
+    Cursor mode is used when the request carries a ``cursor`` parameter
+    (empty for the first page), when LIST_PAGINATION_MODE is 'cursor', or
+    for the infinite-scroll fragment endpoint (``response_format='fragment'``).
+    Views whose current ordering differs from ``cursor_ordering`` (search,
+    custom sorts) fall back to offset pagination via ``can_use_cursor()``.
+    """
+    cursor_ordering = ('-created_at', '-id')
+    fragment_template_name = None
+    response_format = 'html'
+
+    def can_use_cursor(self):
+        return True
+
+    def use_cursor_pagination(self):
+        if not self.can_use_cursor():
+            return False
+        return (
+            self.response_format == 'fragment'
+            or 'cursor' in self.request.GET
+            or getattr(settings, 'LIST_PAGINATION_MODE', 'offset') == 'cursor'
+        )
+
+    def paginate_queryset(self, queryset, page_size):
+        if not self.use_cursor_pagination():
+            return super().paginate_queryset(queryset, page_size)
+
+        paginator = CursorPaginator(queryset, page_size, self.cursor_ordering)
+        try:
+            page = paginator.page(self.request.GET.get('cursor') or None)
+        except InvalidCursor:
+            raise Http404('Invalid cursor.')
+        return (paginator, page, page.object_list, page.has_other_pages())
+
+    def render_to_response(self, context, **response_kwargs):
+        if self.response_format != 'fragment':
+            return super().render_to_response(context, **response_kwargs)
+
+        page = context['page_obj']
+        html = render_to_string(self.fragment_template_name, context, request=self.request)
+        data = {'html': html, 'has_next': page.has_next()}
+        if getattr(page, 'is_cursor', False):
+            data['next_cursor'] = page.next_cursor
+        else:
+            data['next_page'] = page.next_page_number() if page.has_next() else None
+        return JsonResponse(data)
@@ -0,0 +1,308 @@
+"""
+Precomputed related content for detail pages
+
+Each content type keeps a table of (source, target, score) rows holding the
+top RELATED_CONTENT_SIZE items for every published object, so a detail page
+reads its related items with one indexed lookup joined to the targets.
+
+Candidates are items of the same type sharing tags or category. The score
+is SHARED_TAG_WEIGHT per shared tag, SAME_CATEGORY_WEIGHT for the same
+category and a recency bonus of up to RECENCY_WEIGHT that halves every
+RECENCY_HALF_LIFE_DAYS.
+
+Saving an object recomputes its own list and re-scores it into the lists
+of its candidates. Lists that lose an item (unpublish, delete) are refilled
+by the next ``rebuild_related`` run. Bulk imports, which send no signals,
+rebuild only the lists of the new objects and score them into the lists
+of their candidates.
+"""
+
+import heapq
+from collections import Counter, defaultdict
+from functools import partial
+
+from django.apps import apps
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from .search import SEARCHABLE, get_model, kind_for_model
+
+
+# Related-item tables and the date used for the recency bonus
+RELATED = {
+    'prompt': {'model': 'prompts.RelatedPrompt', 'date': 'created_at'},
+    'blog': {'model': 'blog.RelatedBlogPost', 'date': 'published_at'},
+    'news': {'model': 'news.RelatedNewsArticle', 'date': 'published_at'},
+}
+
+SHARED_TAG_WEIGHT = 3.0
+SAME_CATEGORY_WEIGHT = 2.0
+RECENCY_WEIGHT = 1.0
+RECENCY_HALF_LIFE_DAYS = 30
+
+# Candidate limits per source, so popular tags stay cheap
+MAX_TAG_CANDIDATES = 200
+MAX_CATEGORY_CANDIDATES = 50
+
+# Fields whose change can move an object in other lists
+SCORED_FIELDS = {'tags', 'category'}
+
+
+def get_related_model(kind):
+    return apps.get_model(RELATED[kind]['model'])
+
+
+def get_link_model(kind):
+    """Return the tag through model and its foreign key name to the content"""
+    field = get_model(kind)._meta.get_field('tag_set')
+    return field.remote_field.through, field.m2m_field_name()
+
+
+def list_size():
+    return getattr(settings, 'RELATED_CONTENT_SIZE', 8)
+
+
+def published_filter(kind, prefix=''):
+    return {f'{prefix}{field}': value for field, value in SEARCHABLE[kind]['published'].items()}
+
+
+def recency_bonus(date, now):
+    if date is None:
+        return 0.0
+    age_days = max((now - date).total_seconds(), 0) / 86400
+    return RECENCY_WEIGHT * 0.5 ** (age_days / RECENCY_HALF_LIFE_DAYS)
+
+
+def pair_score(shared_tags, same_category, target_bonus):
+    """Score of a target; only its recency bonus makes this asymmetric"""
+    score = shared_tags * SHARED_TAG_WEIGHT + target_bonus
+    if same_category:
+        score += SAME_CATEGORY_WEIGHT
+    return score
+
+
+def rank(source_id, category_id, shared, candidates, size):
+    """
+    Return the top ``size`` (target_id, score) pairs for a source.
+    ``shared`` maps candidate id to shared tag count and ``candidates``
+    maps candidate id to (category_id, recency bonus).
+    """
+    scored = []
+    for pk, (candidate_category, bonus) in candidates.items():
+        if pk == source_id:
+            continue
+        same_category = category_id is not None and candidate_category == category_id
+        scored.append((pk, pair_score(shared.get(pk, 0), same_category, bonus)))
+    return heapq.nlargest(size, scored, key=lambda item: item[1])
+
+
+def get_related(instance, limit=None):
+    """Return the related objects of ``instance``, best first, in one query"""
+    kind = kind_for_model(type(instance))
+    select = [f'target__{field}' for field in SEARCHABLE[kind]['select_related']]
+    rows = (
+        get_related_model(kind).objects
+        .filter(source=instance)
+        .select_related('target', *select)
+        .order_by('-score')[:limit or list_size()]
+    )
+    return [row.target for row in rows]
+
+
+async def aget_related(instance, limit=None):
+    """get_related() for async views"""
+    kind = kind_for_model(type(instance))
+    select = [f'target__{field}' for field in SEARCHABLE[kind]['select_related']]
+    rows = (
+        get_related_model(kind).objects
+        .filter(source=instance)
+        .select_related('target', *select)
+        .order_by('-score')[:limit or list_size()]
+    )
+    return [row.target async for row in rows]
+
+
+def refresh(kind, pk):
+    """Recompute the related rows for one object and its candidates"""
+    model = get_model(kind)
+    related_model = get_related_model(kind)
+    date_field = RELATED[kind]['date']
+    now = timezone.now()
+
+    source = model.objects.filter(pk=pk, **published_filter(kind)).values('pk', 'category_id', date_field).first()
+    if source is None:
+        related_model.objects.filter(source_id=pk).delete()
+        related_model.objects.filter(target_id=pk).delete()
+        return
+
+    # Candidates sharing tags, with their shared tag counts
+    link_model, link_field = get_link_model(kind)
+    tag_ids = link_model.objects.filter(**{f'{link_field}_id': pk}).values_list('tag_id', flat=True)
+    shared = dict(
+        link_model.objects
+        .filter(tag_id__in=list(tag_ids), **published_filter(kind, f'{link_field}__'))
+        .exclude(**{f'{link_field}_id': pk})
+        .values_list(f'{link_field}_id')
+        .annotate(shared=Count('tag_id'))
+        .order_by('-shared')[:MAX_TAG_CANDIDATES]
+    )
+
+    # Plus the most recent items of the same category
+    candidate_ids = set(shared)
+    if source['category_id'] is not None:
+        candidate_ids.update(
+            model.objects
+            .filter(category_id=source['category_id'], **published_filter(kind))
+            .exclude(pk=pk)
+            .order_by(f'-{date_field}')
+            .values_list('pk', flat=True)[:MAX_CATEGORY_CANDIDATES]
+        )
+
+    candidates = {
+        row['pk']: (row['category_id'], recency_bonus(row[date_field], now))
+        for row in model.objects.filter(pk__in=candidate_ids).values('pk', 'category_id', date_field)
+    }
+
+    size = list_size()
+    with transaction.atomic():
+        # This object's own list
+        related_model.objects.filter(source_id=pk).delete()
+        top = rank(pk, source['category_id'], shared, candidates, size)
+        related_model.objects.bulk_create([
+            related_model(source_id=pk, target_id=target_id, score=score) for target_id, score in top
+        ])
+
+        # This object as an item in its candidates' lists
+        related_model.objects.filter(target_id=pk).delete()
+        source_bonus = recency_bonus(source[date_field], now)
+        related_model.objects.bulk_create([
+            related_model(
+                source_id=candidate_id,
+                target_id=pk,
+                score=pair_score(
+                    shared.get(candidate_id, 0),
+                    source['category_id'] is not None and category_id == source['category_id'],
+                    source_bonus,
+                ),
+            )
+            for candidate_id, (category_id, bonus) in candidates.items()
+        ])
+        trim(related_model, candidates, size)
+
+
+def trim(related_model, source_ids, size):
+    """Delete rows beyond the top ``size`` for each of ``source_ids``"""
+    rows = (
+        related_model.objects
+        .filter(source_id__in=list(source_ids))
+        .order_by('source_id', '-score')
+        .values_list('pk', 'source_id')
+    )
+    kept = Counter()
+    excess = []
+    for row_pk, source_id in rows:
+        kept[source_id] += 1
+        if kept[source_id] > size:
+            excess.append(row_pk)
+    for start in range(0, len(excess), 500):
+        related_model.objects.filter(pk__in=excess[start:start + 500]).delete()
+
+
+def rebuild(kind, batch_size=1000, new_pks=None):
+    """
+    Recompute related lists of one content type from in-memory tag and
+    category maps, one transaction per ``batch_size`` sources, so readers
+    never wait for the whole table. With ``new_pks`` (objects no list can
+    point to yet, e.g. just imported) only their lists are computed, and
+    they are scored into the lists of their candidates. Returns the number
+    of rows written.
+    """
+    model = get_model(kind)
+    related_model = get_related_model(kind)
+    date_field = RELATED[kind]['date']
+    link_model, link_field = get_link_model(kind)
+    now = timezone.now()
+    size = list_size()
+
+    dates = {}
+    objects = {}
+    for row in model.objects.filter(**published_filter(kind)).values('pk', 'category_id', date_field).iterator():
+        dates[row['pk']] = row[date_field]
+        objects[row['pk']] = (row['category_id'], recency_bonus(row[date_field], now))
+
+    tags_by_object = defaultdict(list)
+    objects_by_tag = defaultdict(list)
+    links = link_model.objects.filter(**published_filter(kind, f'{link_field}__'))
+    for object_id, tag_id in links.values_list(f'{link_field}_id', 'tag_id').iterator():
+        tags_by_object[object_id].append(tag_id)
+        objects_by_tag[tag_id].append(object_id)
+
+    newest_first = sorted(objects, key=lambda pk: dates[pk] or now, reverse=True)
+    position = {pk: index for index, pk in enumerate(newest_first)}
+
+    # Only the newest items of a popular tag are candidates, which keeps
+    # the pass linear in the number of objects
+    for tag_id, tagged in objects_by_tag.items():
+        if len(tagged) > MAX_TAG_CANDIDATES:
+            tagged.sort(key=position.__getitem__)
+            del tagged[MAX_TAG_CANDIDATES:]
+
+    recent_by_category = defaultdict(list)
+    for pk in newest_first:
+        category_id = objects[pk][0]
+        if category_id is not None and len(recent_by_category[category_id]) < MAX_CATEGORY_CANDIDATES + 1:
+            recent_by_category[category_id].append(pk)
+
+    if new_pks is None:
+        sources = list(objects)
+        new = set()
+    else:
+        new = set(new_pks) & set(objects)
+        sources = sorted(new)
+
+    written = 0
+    for start in range(0, len(sources), batch_size):
+        batch_ids = sources[start:start + batch_size]
+        rows = []
+        extended = set()
+        for pk in batch_ids:
+            category_id, bonus = objects[pk]
+            shared = Counter()
+            for tag_id in tags_by_object.get(pk, ()):
+                shared.update(objects_by_tag[tag_id])
+            shared = dict(shared.most_common(MAX_TAG_CANDIDATES + 1))
+            candidate_ids = set(shared) | set(recent_by_category.get(category_id, ()))
+            candidates = {candidate_id: objects[candidate_id] for candidate_id in candidate_ids}
+            for target_id, score in rank(pk, category_id, shared, candidates, size):
+                rows.append(related_model(source_id=pk, target_id=target_id, score=score))
+            # A new object as an item in the lists of existing candidates
+            for candidate_id, (candidate_category, _) in candidates.items():
+                if new and candidate_id not in new:
+                    same_category = category_id is not None and candidate_category == category_id
+                    score = pair_score(shared.get(candidate_id, 0), same_category, bonus)
+                    rows.append(related_model(source_id=candidate_id, target_id=pk, score=score))
+                    extended.add(candidate_id)
+        with transaction.atomic():
+            related_model.objects.filter(source_id__in=batch_ids).delete()
+            related_model.objects.bulk_create(rows, batch_size=batch_size)
+            extended = sorted(extended)
+            for trim_start in range(0, len(extended), 500):
+                trim(related_model, extended[trim_start:trim_start + 500], size)
+        written += len(rows)
+
+    if new_pks is None:
+        # Lists of objects that are no longer published, and such items in lists
+        related_model.objects.exclude(**published_filter(kind, 'source__')).delete()
+        related_model.objects.exclude(**published_filter(kind, 'target__')).delete()
+    return written
+
+
+def schedule_refresh(sender, instance, update_fields=None, **kwargs):
+    """``post_save`` receiver; recomputes after the transaction commits"""
+    kind = kind_for_model(sender)
+    watched = SCORED_FIELDS | set(SEARCHABLE[kind]['published'])
+    if update_fields is not None and not watched & set(update_fields):
+        return
+    transaction.on_commit(partial(refresh, kind, instance.pk))
@@ -0,0 +1,150 @@
+"""
+Primary/replica database routing
+
+Aliases listed in ``DATABASE_REPLICAS`` are read-only copies of
+``default``. Reads go to a replica only for views marked with
+``ReplicaReadMixin`` (public list and detail pages), on GET/HEAD, and only
+while nothing forces the primary:
+
+- any write during the request pins the rest of the request to the primary,
+- a request that changed data (POST etc.) sets a short-lived cookie that
+  pins the visitor's next requests, so they read their own writes despite
+  replication lag (``REPLICA_STICKY_SECONDS``),
+- reads inside ``transaction.atomic()`` or ``use_primary()`` use the primary.
+
+Everything else, including all writes and migrations, uses ``default``.
+Cached counts are always computed on the primary (see apps.core.counting);
+cached pages and fragments rendered from a lagging replica can be stale
+for at most their timeout.
+"""
+
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+STICKY_COOKIE = 'db_primary'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+class RouteState:
+    """Routing decisions for the current request"""
+
+    def __init__(self):
+        self.replica_reads = False
+        self.pinned = False
+
+
+_state = ContextVar('db_route_state', default=None)
+
+
+def get_replicas():
+    return getattr(settings, 'DATABASE_REPLICAS', [])
+
+
+def sticky_seconds():
+    return getattr(settings, 'REPLICA_STICKY_SECONDS', 15)
+
+
+@contextmanager
+def use_primary():
+    """Read from the primary inside this block"""
+    state = RouteState()
+    state.pinned = True
+    token = _state.set(state)
+    try:
+        yield
+    finally:
+        _state.reset(token)
+
+
+class ReplicaRouter:
+    """
+    Send marked reads to a random replica, everything else to ``default``
+    """
+
+    def db_for_read(self, model, **hints):
+        instance = hints.get('instance')
+        if instance is not None and instance._state.db:
+            # Follow relations on the database the instance came from
+            return instance._state.db
+        state = _state.get()
+        replicas = get_replicas()
+        if (
+            not replicas or state is None or not state.replica_reads or state.pinned
+            or connections[DEFAULT_DB_ALIAS].in_atomic_block
+        ):
+            return DEFAULT_DB_ALIAS
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None:
+            state.pinned = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db not in get_replicas()
+
+
+class ReplicaReadMixin:
+    """
+    Mark a view whose GET/HEAD reads may be served from a replica
+    """
+    read_from_replica = True
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Track the routing state for each request and set the sticky cookie
+    after requests that changed data
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token = self.start(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            _state.reset(token)
+        return self.finish(request, response)
+
+    async def __acall__(self, request):
+        # The state object is shared with the sync_to_async threads the ORM runs in
+        token = self.start(request)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _state.reset(token)
+        return self.finish(request, response)
+
+    def start(self, request):
+        state = RouteState()
+        state.pinned = request.method not in SAFE_METHODS or STICKY_COOKIE in request.COOKIES
+        return _state.set(state)
+
+    def finish(self, request, response):
+        if get_replicas() and request.method not in SAFE_METHODS:
+            response.set_cookie(STICKY_COOKIE, '1', max_age=sticky_seconds(), httponly=True, samesite='Lax')
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        view_class = getattr(view_func, 'view_class', None)
+        if getattr(view_class, 'read_from_replica', False):
+            _state.get().replica_reads = True
@@ -0,0 +1,424 @@
+"""
+Full-text search for prompts, blog posts and news
+
+Searchable content is mirrored into a search index that is kept in sync from
+model saves and deletes. The backend is pluggable through the
+``SEARCH_BACKEND`` setting; the default uses an SQLite FTS5 virtual table
+with BM25 ranking and highlighted snippets.
+"""
+
+import re
+from collections import namedtuple
+from functools import lru_cache
+
+from django.apps import apps
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+from django.utils.html import escape
+from django.utils.module_loading import import_string
+from django.utils.safestring import mark_safe
+
+
+# Content types covered by the search index
+SEARCHABLE = {
+    'prompt': {
+        'label': 'Prompts',
+        'model': 'prompts.Prompt',
+        'code': 1,
+        'title': 'title',
+        'body': ('description', 'prompt_text'),
+        'tags': 'tags',
+        'published': {'is_published': True},
+        'select_related': ('author', 'category'),
+    },
+    'blog': {
+        'label': 'Blog Posts',
+        'model': 'blog.BlogPost',
+        'code': 2,
+        'title': 'title',
+        'body': ('excerpt', 'content'),
+        'tags': 'tags',
+        'published': {'status': 'published'},
+        'select_related': ('author', 'category'),
+    },
+    'news': {
+        'label': 'News',
+        'model': 'news.NewsArticle',
+        'code': 3,
+        'title': 'title',
+        'body': ('subtitle', 'summary', 'content'),
+        'tags': 'tags',
+        'published': {'is_published': True},
+        'select_related': ('category',),
+    },
+}
+
+SearchHit = namedtuple('SearchHit', ['kind', 'object_id', 'score', 'snippet'])
+
+# Snippet markers; replaced with <mark> after the snippet text is escaped
+HIGHLIGHT_START = '\x02'
+HIGHLIGHT_END = '\x03'
+
+
+def get_model(kind):
+    return apps.get_model(SEARCHABLE[kind]['model'])
+
+
+def kind_for_model(model):
+    """Return the search kind for a model class, or None"""
+    for kind, conf in SEARCHABLE.items():
+        if model._meta.label == conf['model']:
+            return kind
+    return None
+
+
+def indexed_fields(kind):
+    """Return the model fields that affect the indexed document"""
+    conf = SEARCHABLE[kind]
+    return {conf['title'], conf['tags'], *conf['body'], *conf['published']}
+
+
+def is_published(kind, instance):
+    conf = SEARCHABLE[kind]
+    return all(getattr(instance, field) == value for field, value in conf['published'].items())
+
+
+def build_document(kind, instance):
+    """Return the (title, body, tags) text indexed for an instance"""
+    conf = SEARCHABLE[kind]
+    body = '\n'.join(getattr(instance, field) or '' for field in conf['body'])
+    return getattr(instance, conf['title']), body, getattr(instance, conf['tags']) or ''
+
+
+def parse_terms(query):
+    """Split a user query into lowercase search terms"""
+    return re.findall(r'\w+', query.lower())
+
+
+def highlight(snippet):
+    """Escape snippet text and turn match markers into <mark> tags"""
+    html = escape(snippet).replace(HIGHLIGHT_START, '<mark>').replace(HIGHLIGHT_END, '</mark>')
+    return mark_safe(html)
+
+
+class BaseSearchBackend:
+    """
+    Interface for search backends
+    """
+
+    def index(self, kind, instance):
+        """Add or replace the document for an instance"""
+        self.index_many(kind, [instance])
+
+    def index_many(self, kind, instances):
+        raise NotImplementedError
+
+    def remove(self, kind, pk):
+        raise NotImplementedError
+
+    def clear(self, kind=None):
+        raise NotImplementedError
+
+    def search(self, query, kinds=None, limit=20, offset=0):
+        """Return a list of SearchHit ordered by relevance"""
+        raise NotImplementedError
+
+    def facets(self, query, kinds=None):
+        """Return {kind: number of matches}"""
+        raise NotImplementedError
+
+    def ranked(self, queryset, kind, query):
+        """
+        Restrict ``queryset`` to matches in the database query itself, best
+        first; None when the query has no search terms
+        """
+        raise NotImplementedError
+
+    def snippets(self, kind, query, pks):
+        """Return {pk: highlighted snippet} for the given objects"""
+        raise NotImplementedError
+
+
+class SQLiteFTSBackend(BaseSearchBackend):
+    """
+    Search backend using an SQLite FTS5 virtual table.
+
+    All content types share one table. The rowid encodes both the content
+    type and the object id, so updates and deletes are rowid lookups.
+    """
+    table = 'core_search_index'
+    kind_slots = 8
+
+    # bm25() column weights: kind, title, body, tags
+    weights = (0.0, 10.0, 1.0, 5.0)
+
+    def rowid(self, kind, pk):
+        return pk * self.kind_slots + SEARCHABLE[kind]['code']
+
+    def object_id(self, rowid):
+        return rowid // self.kind_slots
+
+    def match_expression(self, query, kinds=None):
+        terms = parse_terms(query)
+        if not terms:
+            return None
+        expression = '{title body tags} : (%s)' % ' AND '.join(f'"{term}"*' for term in terms)
+        if kinds:
+            expression = 'kind : (%s) AND %s' % (' OR '.join(kinds), expression)
+        return expression
+
+    def index_many(self, kind, instances):
+        rows = [(self.rowid(kind, obj.pk), kind, *build_document(kind, obj)) for obj in instances]
+        with connection.cursor() as cursor:
+            cursor.executemany(f'DELETE FROM {self.table} WHERE rowid = %s', [row[:1] for row in rows])
+            cursor.executemany(
+                f'INSERT INTO {self.table} (rowid, kind, title, body, tags) VALUES (%s, %s, %s, %s, %s)',
+                rows,
+            )
+
+    def remove(self, kind, pk):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {self.table} WHERE rowid = %s', [self.rowid(kind, pk)])
+
+    def clear(self, kind=None):
+        with connection.cursor() as cursor:
+            if kind:
+                cursor.execute(f'DELETE FROM {self.table} WHERE kind = %s', [kind])
+            else:
+                cursor.execute(f'DELETE FROM {self.table}')
+
+    def search(self, query, kinds=None, limit=20, offset=0):
+        expression = self.match_expression(query, kinds)
+        if expression is None:
+            return []
+        weights = ', '.join(str(weight) for weight in self.weights)
+        sql = (
+            f'SELECT rowid, kind, bm25({self.table}, {weights}) AS score, '
+            f'snippet({self.table}, 2, %s, %s, %s, 24) '
+            f'FROM {self.table} WHERE {self.table} MATCH %s '
+            f'ORDER BY score LIMIT %s OFFSET %s'
+        )
+        params = [HIGHLIGHT_START, HIGHLIGHT_END, '…', expression, limit, offset]
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            rows = cursor.fetchall()
+        return [
+            SearchHit(kind, self.object_id(rowid), -score, highlight(snippet))
+            for rowid, kind, score, snippet in rows
+        ]
+
+    def facets(self, query, kinds=None):
+        expression = self.match_expression(query, kinds)
+        if expression is None:
+            return {}
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT kind, COUNT(*) FROM {self.table} WHERE {self.table} MATCH %s GROUP BY kind',
+                [expression],
+            )
+            return dict(cursor.fetchall())
+
+    def ranked(self, queryset, kind, query):
+        expression = self.match_expression(query, [kind])
+        if expression is None:
+            return None
+        meta = queryset.model._meta
+        column = f'{connection.ops.quote_name(meta.db_table)}.{connection.ops.quote_name(meta.pk.column)}'
+        weights = ', '.join(str(weight) for weight in self.weights)
+        # The index drives both parts: matches come out as primary keys, and
+        # each score is looked up by rowid in the ranked matches. LIMIT -1
+        # keeps SQLite from flattening that subquery, so it is computed once
+        # and searched through an automatic index instead of once per row.
+        matches = RawSQL(f'SELECT rowid / {self.kind_slots} FROM {self.table} WHERE {self.table} MATCH %s', [expression])
+        score = RawSQL(
+            f'SELECT ranked.score FROM ('
+            f'SELECT rowid, bm25({self.table}, {weights}) AS score '
+            f'FROM {self.table} WHERE {self.table} MATCH %s LIMIT -1'
+            f') AS ranked WHERE ranked.rowid = {column} * {self.kind_slots} + {SEARCHABLE[kind]["code"]}',
+            [expression],
+        )
+        return queryset.filter(pk__in=matches).annotate(search_score=score).order_by('search_score')
+
+    def snippets(self, kind, query, pks):
+        expression = self.match_expression(query, [kind])
+        if expression is None or not pks:
+            return {}
+        rowids = [self.rowid(kind, pk) for pk in pks]
+        placeholders = ', '.join(['%s'] * len(rowids))
+        sql = (
+            f'SELECT rowid, snippet({self.table}, 2, %s, %s, %s, 24) '
+            f'FROM {self.table} WHERE {self.table} MATCH %s AND rowid IN ({placeholders})'
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [HIGHLIGHT_START, HIGHLIGHT_END, '…', expression, *rowids])
+            return {self.object_id(rowid): highlight(snippet) for rowid, snippet in cursor.fetchall()}
+
+
+class DatabaseSearchBackend(BaseSearchBackend):
+    """
+    Fallback backend that searches the content tables directly with
+    ``icontains``. Needs no index, but scans; use for databases without FTS.
+    """
+
+    def index_many(self, kind, instances):
+        pass
+
+    def remove(self, kind, pk):
+        pass
+
+    def clear(self, kind=None):
+        pass
+
+    def matching(self, kind, query):
+        conf = SEARCHABLE[kind]
+        condition = Q()
+        for term in parse_terms(query):
+            term_condition = Q()
+            for field in (conf['title'], conf['tags'], *conf['body']):
+                term_condition |= Q(**{f'{field}__icontains': term})
+            condition &= term_condition
+        return get_model(kind).objects.filter(condition, **conf['published'])
+
+    def search(self, query, kinds=None, limit=20, offset=0):
+        if not parse_terms(query):
+            return []
+        hits = []
+        for kind in kinds or SEARCHABLE:
+            conf = SEARCHABLE[kind]
+            for obj in self.matching(kind, query).order_by('-pk')[:offset + limit]:
+                snippet = getattr(obj, conf['body'][0]) or ''
+                hits.append(SearchHit(kind, obj.pk, 0.0, escape(snippet[:200])))
+        return hits[offset:offset + limit]
+
+    def facets(self, query, kinds=None):
+        if not parse_terms(query):
+            return {}
+        return {kind: self.matching(kind, query).count() for kind in kinds or SEARCHABLE}
+
+    def ranked(self, queryset, kind, query):
+        if not parse_terms(query):
+            return None
+        return queryset.filter(pk__in=self.matching(kind, query).values('pk')).order_by('-pk')
+
+    def snippets(self, kind, query, pks):
+        field = SEARCHABLE[kind]['body'][0]
+        rows = get_model(kind).objects.filter(pk__in=pks).values_list('pk', field)
+        return {pk: escape((text or '')[:200]) for pk, text in rows}
+
+
+@lru_cache(maxsize=None)
+def get_search_backend():
+    backend_path = getattr(settings, 'SEARCH_BACKEND', 'apps.core.search.SQLiteFTSBackend')
+    return import_string(backend_path)()
+
+
+def ranked_queryset(queryset, kind, query):
+    """
+    Restrict ``queryset`` to search matches ordered by relevance. Filters
+    added afterwards apply to all matches. Returns (queryset, snippets);
+    hand the snippets to ``attach_snippets()`` with the displayed page.
+    """
+    backend = get_search_backend()
+    matches = backend.ranked(queryset, kind, query)
+    if matches is None:
+        return queryset.none(), {}
+    return matches, SearchSnippets(backend, kind, query)
+
+
+class SearchSnippets:
+    """Snippets of one search, fetched for the objects actually shown"""
+
+    def __init__(self, backend, kind, query):
+        self.backend = backend
+        self.kind = kind
+        self.query = query
+
+    def load(self, pks):
+        return self.backend.snippets(self.kind, self.query, pks)
+
+
+class SearchResults:
+    """
+    Lazy, sliceable sequence of merged search results across content types.
+
+    Designed to be handed to Django's Paginator: the total comes from one
+    facet query and each page is one ranked index query, followed by one
+    bulk fetch per content type present on that page.
+    """
+
+    def __init__(self, query, kinds=None):
+        self.query = query
+        self.kinds = list(kinds or SEARCHABLE)
+        self.backend = get_search_backend()
+        self.facets = self.backend.facets(query)
+
+    def count(self):
+        return sum(self.facets.get(kind, 0) for kind in self.kinds)
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return self[index:index + 1][0]
+        start = index.start or 0
+        stop = index.stop if index.stop is not None else self.count()
+        if stop <= start:
+            return []
+        hits = self.backend.search(self.query, kinds=self.kinds, limit=stop - start, offset=start)
+        return self.hydrate(hits)
+
+    def hydrate(self, hits):
+        """Return result dicts with model instances, keeping hit order"""
+        ids_by_kind = {}
+        for hit in hits:
+            ids_by_kind.setdefault(hit.kind, []).append(hit.object_id)
+
+        objects = {}
+        for kind, ids in ids_by_kind.items():
+            conf = SEARCHABLE[kind]
+            queryset = get_model(kind).objects.filter(**conf['published']).select_related(*conf['select_related'])
+            objects[kind] = queryset.in_bulk(ids)
+
+        results = []
+        for hit in hits:
+            obj = objects[hit.kind].get(hit.object_id)
+            if obj is not None:
+                results.append({
+                    'type': hit.kind,
+                    'label': SEARCHABLE[hit.kind]['label'],
+                    'object': obj,
+                    'score': hit.score,
+                    'snippet': hit.snippet,
+                })
+        return results
+
+
+def attach_snippets(objects, snippets):
+    """
+    Set ``search_snippet`` on each object for the template. ``snippets`` is
+    a {pk: snippet} dict or the SearchSnippets from ``ranked_queryset()``.
+    """
+    if isinstance(snippets, SearchSnippets):
+        snippets = snippets.load([obj.pk for obj in objects])
+    for obj in objects:
+        obj.search_snippet = snippets.get(obj.pk, '')
+
+
+def update_search_index(sender, instance, update_fields=None, **kwargs):
+    """``post_save`` receiver keeping the index in sync"""
+    kind = kind_for_model(sender)
+    if update_fields is not None and not indexed_fields(kind) & set(update_fields):
+        return
+    backend = get_search_backend()
+    if is_published(kind, instance):
+        backend.index(kind, instance)
+    else:
+        backend.remove(kind, instance.pk)
+
+
+def remove_from_search_index(sender, instance, **kwargs):
+    """``post_delete`` receiver keeping the index in sync"""
+    get_search_backend().remove(kind_for_model(sender), instance.pk)
@@ -0,0 +1,99 @@
+"""
+Unique slug allocation
+
+``unique_slug`` probes the base slug with one indexed ``exists()`` and, only
+when that is taken, finds a free ``-N`` suffix from one prefix query instead
+of probing ``slug-1``, ``slug-2``... one ``exists()`` at a time.
+``SlugAllocator`` does the same entirely in memory against a preloaded
+slug set, for bulk imports. ``tag_slug`` is the slug rule for tag names.
+"""
+
+import hashlib
+
+from django.utils.text import slugify
+
+
+# Tag.slug max_length
+TAG_SLUG_MAX_LENGTH = 60
+
+# Symbols that tell tags apart ("C++" / "C", "C#") and would otherwise be
+# stripped by slugify
+TAG_SYMBOLS = {'+': ' plus ', '#': ' sharp '}
+
+
+def tag_slug(name):
+    """
+    Slug of a tag name (keeps non-ASCII letters). Names that differ only
+    in case, spacing or other punctuation ("Machine learning",
+    "machine-learning") share a slug, and therefore a tag, on purpose.
+    Slugs longer than TAG_SLUG_MAX_LENGTH are cut and end in a digest.
+    """
+    for symbol, word in TAG_SYMBOLS.items():
+        name = name.replace(symbol, word)
+    slug = slugify(name, allow_unicode=True)
+    if len(slug) <= TAG_SLUG_MAX_LENGTH:
+        return slug
+    # The expansion can outgrow the field; the slug is the tag's identity, so
+    # long slugs that share a prefix keep apart by a digest of the full slug
+    digest = hashlib.sha1(slug.encode()).hexdigest()[:8]
+    return f"{slug[:TAG_SLUG_MAX_LENGTH - 9].rstrip('-')}-{digest}"
+
+
+def base_slug(model, value, field='slug', fallback='item'):
+    """Slugify ``value``, leaving room in the field for a ``-N`` suffix"""
+    max_length = model._meta.get_field(field).max_length
+    slug = slugify(value)[:max_length - 8].strip('-')
+    return slug or fallback
+
+
+def next_free(base, taken):
+    """Return ``base`` or the first ``base-N`` not in ``taken``"""
+    if base not in taken:
+        return base
+    counter = 1
+    while f'{base}-{counter}' in taken:
+        counter += 1
+    return f'{base}-{counter}'
+
+
+def unique_slug(model, value, field='slug'):
+    """Return a slug for ``value`` that is not used by any ``model`` row"""
+    base = base_slug(model, value, field)
+    manager = model._default_manager
+    if not manager.filter(**{field: base}).exists():
+        return base
+    # Collision: load the taken "base-*" slugs. A range rather than
+    # startswith, whose LIKE cannot use the slug index on SQLite ("." sorts
+    # right after "-")
+    taken = {base}
+    taken.update(
+        manager.filter(**{f'{field}__gte': f'{base}-', f'{field}__lt': f'{base}.'})
+        .order_by().values_list(field, flat=True)
+    )
+    return next_free(base, taken)
+
+
+class SlugAllocator:
+    """
+    Hands out unique slugs for many new rows of one model. Existing slugs
+    are loaded once; allocated slugs are remembered, and the last counter
+    used per base slug is kept so repeated titles stay O(1).
+    """
+
+    def __init__(self, model, field='slug'):
+        self.model = model
+        self.field = field
+        self.taken = set(model._default_manager.values_list(field, flat=True).iterator())
+        self._counters = {}
+
+    def allocate(self, value):
+        base = base_slug(self.model, value, self.field)
+        slug = base
+        if slug in self.taken:
+            counter = self._counters.get(base, 0) + 1
+            while f'{base}-{counter}' in self.taken:
+                counter += 1
+            self._counters[base] = counter
+            slug = f'{base}-{counter}'
+        self.taken.add(slug)
+        return slug
@@ -0,0 +1,71 @@
+"""
+Static files storage for production builds
+
+``collectstatic`` with ``BundledManifestStorage``:
+
+1. checks that every vendored file is present (pages would otherwise load
+   them from the CDN) and writes each bundle from ``STATIC_BUNDLES`` (see
+   apps.core.assets),
+2. fingerprints every file and rewrites CSS ``url()`` references
+   (ManifestStaticFilesStorage),
+3. stores a precompressed ``.gz`` next to each compressible file, so the
+   web server can send it as is (e.g. nginx ``gzip_static on``).
+"""
+
+import gzip
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+
+from . import assets
+
+
+class BundledManifestStorage(ManifestStaticFilesStorage):
+    """
+    Manifest storage that also builds bundles and writes .gz siblings
+    """
+    # Smallest file worth compressing, in bytes
+    gzip_min_size = 256
+
+    def post_process(self, paths, dry_run=False, **options):
+        if dry_run:
+            yield from super().post_process(paths, dry_run, **options)
+            return
+
+        missing = [path for path, _ in assets.VENDOR_FILES if path not in paths]
+        if missing:
+            raise FileNotFoundError(
+                f"Vendored static files are missing: {', '.join(missing)}. "
+                'Run manage.py vendor_assets and commit static/vendor/.'
+            )
+
+        for name, sources in assets.get_bundles().items():
+            if self.exists(name):
+                self.delete(name)
+            self._save(name, ContentFile(assets.build_bundle(name, sources).encode()))
+            paths[name] = (self, name)
+
+        hashed_files = set()
+        for name, hashed_name, processed in super().post_process(paths, dry_run, **options):
+            if hashed_name and not isinstance(processed, Exception):
+                hashed_files.add(hashed_name)
+            yield name, hashed_name, processed
+
+        for hashed_name in sorted(hashed_files):
+            self.write_gzip(hashed_name)
+
+    def write_gzip(self, name):
+        if not name.endswith(assets.COMPRESSIBLE):
+            return
+        with self.open(name) as original:
+            content = original.read()
+        if len(content) < self.gzip_min_size:
+            return
+        # mtime=0 keeps the output identical between builds
+        compressed = gzip.compress(content, compresslevel=9, mtime=0)
+        if len(compressed) >= len(content):
+            return
+        gz_name = f'{name}.gz'
+        if self.exists(gz_name):
+            self.delete(gz_name)
+        self._save(gz_name, ContentFile(compressed))
@@ -0,0 +1,150 @@
+"""
+Helpers for the normalized Tag model
+
+Content models keep their comma-separated ``tags`` string for display and
+mirror it into a ``tag_set`` many-to-many through a per-model table, which
+is what tag filtering and tag pages query. ``Tag.usage_count`` counts
+published items only, since tag pages list nothing else; it is kept up to
+date with atomic deltas as links change and items are published or
+unpublished, so tag clouds never need to count.
+
+Tag identity is the slug (see ``slugs.tag_slug``): "Python" and "python"
+are one tag, while "C++", "C#" and "C" are three.
+"""
+
+from collections import Counter, defaultdict
+
+from django.db.models import F
+
+from .models import Tag
+from .search import SEARCHABLE, kind_for_model
+from .slugs import tag_slug
+
+
+MAX_TAG_LENGTH = 50
+
+
+def parse_tags(value):
+    """
+    Split a comma-separated string into clean tag names.
+    Empty and duplicate tags (same slug) are dropped.
+    """
+    names = []
+    seen = set()
+    for name in (value or '').split(','):
+        name = ' '.join(name.split())[:MAX_TAG_LENGTH]
+        slug = tag_slug(name)
+        if slug and slug not in seen:
+            seen.add(slug)
+            names.append(name)
+    return names
+
+
+def get_or_create_tags(names):
+    """Return Tag objects for ``names``, creating missing ones in bulk"""
+    slugs = {tag_slug(name): name for name in names}
+    existing = {tag.slug: tag for tag in Tag.objects.filter(slug__in=slugs)}
+    missing = [Tag(name=name, slug=slug) for slug, name in slugs.items() if slug not in existing]
+    if missing:
+        Tag.objects.bulk_create(missing, ignore_conflicts=True)
+        existing.update({tag.slug: tag for tag in Tag.objects.filter(slug__in=[tag.slug for tag in missing])})
+    return [existing[slug] for slug in slugs if slug in existing]
+
+
+def adjust_usage(tag_ids, delta):
+    if tag_ids:
+        Tag.objects.filter(pk__in=tag_ids).update(usage_count=F('usage_count') + delta)
+
+
+def is_published(instance):
+    conditions = SEARCHABLE[kind_for_model(type(instance))]['published']
+    return all(getattr(instance, field) == value for field, value in conditions.items())
+
+
+def sync_tags(instance, was_published=False):
+    """
+    Make ``instance.tag_set`` match its ``tags`` string, and move the
+    usage counts of its tags when it was or is published
+    """
+    tags = get_or_create_tags(parse_tags(instance.tags))
+    wanted = {tag.pk for tag in tags}
+    current = set(instance.tag_set.values_list('pk', flat=True))
+
+    if wanted - current:
+        instance.tag_set.add(*(wanted - current))
+    if current - wanted:
+        instance.tag_set.remove(*(current - wanted))
+
+    counted_before = current if was_published else set()
+    counted_after = wanted if is_published(instance) else set()
+    adjust_usage(counted_after - counted_before, 1)
+    adjust_usage(counted_before - counted_after, -1)
+
+
+def link_new_instances(model, instances):
+    """
+    Create tag links for freshly inserted ``instances`` in bulk (used
+    after ``bulk_create``, which sends no signals)
+    """
+    names = {}
+    published = set()
+    for instance in instances:
+        names[instance.pk] = parse_tags(instance.tags)
+        if is_published(instance):
+            published.add(instance.pk)
+    tags = {tag.slug: tag for tag in get_or_create_tags({name for row in names.values() for name in row})}
+
+    field = model._meta.get_field('tag_set')
+    through = field.remote_field.through
+    source, target = field.m2m_field_name(), field.m2m_reverse_field_name()
+    links = []
+    usage = Counter()
+    for pk, row in names.items():
+        for name in row:
+            tag = tags.get(tag_slug(name))
+            if tag is not None:
+                links.append(through(**{f'{source}_id': pk, f'{target}_id': tag.pk}))
+                if pk in published:
+                    usage[tag.pk] += 1
+    through.objects.bulk_create(links, batch_size=500, ignore_conflicts=True)
+
+    # One UPDATE per distinct delta
+    by_delta = defaultdict(list)
+    for tag_id, delta in usage.items():
+        by_delta[delta].append(tag_id)
+    for delta, tag_ids in by_delta.items():
+        for start in range(0, len(tag_ids), 500):
+            adjust_usage(tag_ids[start:start + 500], delta)
+
+
+def tracked_fields(sender):
+    return {'tags', *SEARCHABLE[kind_for_model(sender)]['published']}
+
+
+def stored_published(sender, pk):
+    conditions = SEARCHABLE[kind_for_model(sender)]['published']
+    return sender._default_manager.filter(pk=pk, **conditions).exists()
+
+
+def remember_published(sender, instance, update_fields=None, **kwargs):
+    """``pre_save`` receiver: whether the stored row is published"""
+    instance._tags_were_published = False
+    if instance._state.adding or instance.pk is None:
+        return
+    if update_fields is not None and not tracked_fields(sender) & set(update_fields):
+        return
+    instance._tags_were_published = stored_published(sender, instance.pk)
+
+
+def sync_tags_on_save(sender, instance, update_fields=None, **kwargs):
+    """``post_save`` receiver for tagged models"""
+    if update_fields is not None and not tracked_fields(sender) & set(update_fields):
+        return
+    sync_tags(instance, was_published=getattr(instance, '_tags_were_published', False))
+    instance._tags_were_published = False
+
+
+def release_tags_on_delete(sender, instance, **kwargs):
+    """``pre_delete`` receiver; the through rows are removed by cascade"""
+    if stored_published(sender, instance.pk):
+        adjust_usage(list(instance.tag_set.values_list('pk', flat=True)), -1)
@@ -0,0 +1,82 @@
+"""
+Template tags and filters shared across apps
+"""
+
+from django import template
+from django.templatetags.static import static
+from django.utils.html import format_html, format_html_join
+
+from apps.core import assets, images
+from apps.core.slugs import tag_slug as slug_of_tag
+
+register = template.Library()
+
+
+@register.filter
+def tag_slug(name):
+    """Slug of a tag name, matching Tag.slug"""
+    return slug_of_tag(name)
+
+
+@register.simple_tag(takes_context=True)
+def query_replace(context, **kwargs):
+    """
+    Current query string with some parameters replaced; a value of None
+    removes the parameter. Usage: href="?{% query_replace cursor=token page=None %}"
+    """
+    query = context['request'].GET.copy()
+    for key, value in kwargs.items():
+        if value is None:
+            query.pop(key, None)
+        else:
+            query[key] = value
+    return query.urlencode()
+
+
+@register.simple_tag
+def responsive_image(field_file, preset, alt='', css_class='', loading='lazy'):
+    """
+    <picture> with WebP and fallback srcsets for an image field, using the
+    sizes of a rendition preset, or a plain <img> of the original until its
+    renditions are generated. Usage: {% responsive_image post.featured_image 'card' alt=post.title %}
+    """
+    if not field_file:
+        return ''
+    entries = images.get_renditions(field_file, preset)
+    if not entries:
+        return format_html('<img src="{}" alt="{}" class="{}" loading="{}">', field_file.url, alt, css_class, loading)
+    sizes = images.PRESETS[preset]['sizes']
+    # The smallest rendition gives the display size hint; srcset picks the file
+    smallest, largest = entries[0], entries[-1]
+    return format_html(
+        '<picture><source type="image/webp" srcset="{}" sizes="{}">'
+        '<img src="{}" srcset="{}" sizes="{}" width="{}" height="{}" alt="{}" class="{}" loading="{}" decoding="async">'
+        '</picture>',
+        images.srcset(entries, 'webp'), sizes,
+        largest['src'], images.srcset(entries, 'src'), sizes,
+        smallest['width'], smallest['height'], alt, css_class, loading,
+    )
+
+
+def asset_tag(url):
+    if url.endswith('.css'):
+        return format_html('<link rel="stylesheet" href="{}">', url)
+    return format_html('<script src="{}"></script>', url)
+
+
+@register.simple_tag
+def asset_bundle(name):
+    """
+    One fingerprinted bundle from STATIC_BUNDLES, or its source files
+    while bundling is disabled. Usage: {% asset_bundle 'css/site.css' %}
+    """
+    if assets.bundles_enabled():
+        return asset_tag(static(name))
+    return format_html_join('\n', '{}', ((asset_tag(static(source)),) for source in assets.get_bundles()[name]))
+
+
+@register.simple_tag
+def vendor_asset(name):
+    """Local copy of a third-party asset, or its CDN URL until vendored"""
+    path, cdn_url = assets.vendor_url(name)
+    return asset_tag(static(path) if path else cdn_url)
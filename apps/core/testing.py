@@ -0,0 +1,230 @@
+"""
+Query-budget test harness
+
+``seed_content()`` creates a small but realistic dataset (several authors,
+categories, tagged prompts, posts with comments, news, bookmarks,
+precomputed related items and trending scores). Test cases mixing in
+``QueryBudgetMixin`` (before ``TestCase``) request every URL in their
+``budgets`` table, anonymously and logged in,
+with cold caches, and fails when a request runs more queries than its
+ceiling or repeats the same SQL shape more than ``REPEAT_LIMIT`` times (the
+signature of an N+1).
+
+Budgets are keyed by URL name::
+
+    budgets = {
+        'prompts:detail': {
+            'args': lambda data: [data['prompt'].slug],
+            'anonymous': 4,
+            'user': 7,
+        },
+    }
+
+Optional keys: ``method`` ('get' or 'post'), ``data`` (POST body, or a
+callable taking the seeded data), ``query`` (query string), and
+``content_type``. A role set to None is not requested.
+"""
+
+import re
+from collections import Counter
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import get_resolver, reverse
+from django.utils import timezone
+
+from apps.core import related, trending
+from apps.core.view_counter import view_counts
+
+
+# Same SQL shape allowed this many times per request
+REPEAT_LIMIT = 2
+
+# Transaction bookkeeping is not a query regression
+IGNORED_SQL = re.compile(r'^\s*(SAVEPOINT|RELEASE SAVEPOINT|ROLLBACK TO SAVEPOINT|BEGIN|COMMIT)\b', re.I)
+
+SQL_STRING = re.compile(r"'(?:[^']|'')*'")
+SQL_NUMBER = re.compile(r'\b\d+(?:\.\d+)?\b')
+SQL_IN_LIST = re.compile(r'IN \((?:\?, )*\?\)')
+
+# Namespaces whose URLs must all have a budget
+BUDGET_NAMESPACES = ('prompts', 'blog', 'news', 'users', 'core', 'api')
+
+PASSWORD = 'budget-pass-123'
+
+
+def sql_shape(sql):
+    """SQL with literals replaced, so N+1 lookups of different rows match"""
+    shape = SQL_STRING.sub('?', sql)
+    shape = SQL_NUMBER.sub('?', shape)
+    return SQL_IN_LIST.sub('IN (...)', shape)
+
+
+def repeated_shapes(queries, limit=REPEAT_LIMIT):
+    shapes = Counter(
+        sql_shape(query['sql']) for query in queries
+        if not IGNORED_SQL.match(query['sql'])
+    )
+    return [(shape, count) for shape, count in shapes.most_common() if count > limit]
+
+
+def namespace_url_names(namespaces=BUDGET_NAMESPACES):
+    """Every ``namespace:name`` URL name under the given namespaces"""
+    names = set()
+    resolver = get_resolver()
+    for namespace in namespaces:
+        _, sub_resolver = resolver.namespace_dict[namespace]
+        for pattern in sub_resolver.url_patterns:
+            if getattr(pattern, 'name', None):
+                names.add(f'{namespace}:{pattern.name}')
+    return names
+
+
+def seed_content():
+    """Create the shared dataset; returns a dict of notable objects"""
+    from apps.blog.models import BlogCategory, BlogComment, BlogPost
+    from apps.news.models import NewsArticle, NewsCategory
+    from apps.prompts.models import Bookmark, Category, Prompt
+
+    now = timezone.now()
+    authors = [User.objects.create_user(f'author{i}', f'author{i}@example.com', PASSWORD) for i in range(4)]
+    reader = User.objects.create_user('reader', 'reader@example.com', PASSWORD)
+    staff = User.objects.create_user('staff', 'staff@example.com', PASSWORD, is_staff=True)
+    tag_pool = ['python', 'writing', 'marketing', 'code', 'research', 'images']
+
+    categories = [Category.objects.create(name=name, icon='fa-star') for name in ('Writing', 'Coding', 'Business')]
+    prompts = []
+    for i in range(30):
+        prompts.append(Prompt.objects.create(
+            title=f'Prompt {i}',
+            description=f'Description of prompt {i}',
+            prompt_text=f'Act as an expert and write item {i}',
+            category=categories[i % 3],
+            author=authors[i % 4],
+            tags=', '.join(tag_pool[i % 6:i % 6 + 3]),
+            is_featured=i % 7 == 0,
+        ))
+    for prompt in prompts[:8]:
+        Bookmark.objects.create(user=reader, prompt=prompt)
+
+    blog_categories = [BlogCategory.objects.create(name=name) for name in ('News', 'Guides')]
+    posts = []
+    for i in range(15):
+        posts.append(BlogPost.objects.create(
+            title=f'Post {i}',
+            excerpt=f'Excerpt {i}',
+            content=f'Content of post {i}',
+            author=authors[i % 4],
+            category=blog_categories[i % 2],
+            tags=', '.join(tag_pool[i % 6:i % 6 + 2]),
+            status='published',
+            published_at=now - timedelta(days=i),
+            is_featured=i % 5 == 0,
+        ))
+    for i in range(25):
+        BlogComment.objects.create(post=posts[0], author=authors[i % 4], content=f'Comment {i}')
+
+    news_categories = [NewsCategory.objects.create(name=name) for name in ('AI', 'Industry')]
+    articles = []
+    for i in range(15):
+        articles.append(NewsArticle.objects.create(
+            title=f'Article {i}',
+            summary=f'Summary {i}',
+            content=f'Content of article {i}',
+            category=news_categories[i % 2],
+            priority='breaking' if i < 2 else 'normal',
+            tags=', '.join(tag_pool[i % 6:i % 6 + 2]),
+            is_featured=i % 4 == 0,
+        ))
+
+    for kind in related.RELATED:
+        related.rebuild(kind)
+    for kind in trending.TRENDING:
+        trending.update(kind)
+
+    return {
+        'authors': authors,
+        'author': authors[0],
+        'reader': reader,
+        'staff': staff,
+        'prompt': prompts[0],
+        'prompt_category': categories[0],
+        'post': posts[0],
+        'article': articles[0],
+        'news_category': news_categories[0],
+        'tag': 'python',
+    }
+
+
+class QueryBudgetMixin:
+    """
+    Mixed into a ``TestCase`` that sets ``budgets``; one test checks every
+    entry for both roles. Not a TestCase itself, so it is never collected
+    on its own.
+    """
+    budgets = {}
+    user_key = 'reader'
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.data = seed_content()
+
+    def setUp(self):
+        super().setUp()
+        # Hits are flushed by the test's own thread only, and never inside a
+        # measured request (the interval runs from the buffer's last flush)
+        self.enterContext(override_settings(VIEW_COUNT_FLUSH_THREAD=False, VIEW_COUNT_FLUSH_INTERVAL=24 * 3600))
+
+    def request(self, name, budget, user):
+        args = budget.get('args')
+        if callable(args):
+            args = args(self.data)
+        url = reverse(name, args=args)
+        if budget.get('query'):
+            url = f"{url}?{budget['query']}"
+        payload = budget.get('data')
+        if callable(payload):
+            payload = payload(self.data)
+
+        self.client.logout()
+        if user is not None:
+            self.client.force_login(user)
+        # Cold caches: budgets describe the worst case
+        cache.clear()
+        view_counts.clear()
+
+        method = budget.get('method', 'get')
+        kwargs = {'content_type': budget['content_type']} if 'content_type' in budget else {}
+        with CaptureQueriesContext(connections[DEFAULT_DB_ALIAS]) as captured:
+            response = getattr(self.client, method)(url, payload, **kwargs)
+            if response.streaming:
+                b''.join(response.streaming_content)
+        self.assertLess(response.status_code, 500, f'{name} returned {response.status_code}')
+        return captured.captured_queries
+
+    def assertWithinBudget(self, name, role, queries, ceiling):
+        listing = '\n'.join(f"  {query['sql']}" for query in queries)
+        self.assertLessEqual(
+            len(queries), ceiling,
+            f'{name} ({role}) ran {len(queries)} queries, budget is {ceiling}:\n{listing}',
+        )
+        repeats = repeated_shapes(queries)
+        self.assertFalse(
+            repeats,
+            f'{name} ({role}) repeats SQL (possible N+1):\n'
+            + '\n'.join(f'  x{count}  {shape}' for shape, count in repeats),
+        )
+
+    def test_query_budgets(self):
+        users = {'anonymous': None, 'user': self.data[self.user_key]}
+        for name, budget in self.budgets.items():
+            for role, user in users.items():
+                if budget.get(role) is None:
+                    continue
+                with self.subTest(url=name, role=role):
+                    queries = self.request(name, budget, user)
+                    self.assertWithinBudget(name, role, queries, budget[role])
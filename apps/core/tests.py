@@ -0,0 +1,788 @@
+"""
+Query budgets for the core views, a check that every URL has one, and
+tests for the view count buffer, tag usage counts, fragment and page
+cache, cached counts, static asset bundles, image renditions, SQLite
+pragmas, replica routing, request timings, related items, trending
+updates, the async read views, slugs and imports
+"""
+
+import json
+import asyncio
+import os
+import tempfile
+from importlib import import_module, reload
+from io import BytesIO, StringIO
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.contrib.staticfiles import finders
+from django.core.files.base import ContentFile
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import OperationalError, connection
+from django.db.backends.sqlite3.base import DatabaseWrapper
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.template import Context, Template
+from django.test.utils import CaptureQueriesContext
+from django.urls import clear_url_caches, reverse
+from PIL import Image
+
+from apps.core import assets, counting, db, fragments, images, related, routing, trending, view_counter
+from apps.core.async_views import ASYNC_VIEW_NAMES
+from apps.core.testing import QueryBudgetMixin, namespace_url_names, seed_content
+from apps.core.models import Tag
+from apps.core.slugs import TAG_SLUG_MAX_LENGTH, tag_slug, unique_slug
+from apps.core.view_counter import ViewCountBuffer
+from apps.blog.models import BlogPost
+from apps.prompts.models import Category, Prompt, RelatedPrompt
+
+
+BUDGETED_APPS = ('prompts', 'blog', 'news', 'users', 'core', 'api')
+
+
+class CoreQueryBudgetTests(QueryBudgetMixin, TestCase):
+    budgets = {
+        'core:search': {'query': 'q=prompt', 'anonymous': 3, 'user': 5},
+        'core:search_json': {'query': 'q=prompt', 'anonymous': 3, 'user': 3},
+        'core:tag_list': {'anonymous': 1, 'user': 3},
+        'core:tag_detail': {'args': lambda data: [data['tag']], 'anonymous': 4, 'user': 6},
+    }
+
+
+class BudgetCoverageTests(SimpleTestCase):
+    def test_every_url_has_a_budget(self):
+        covered = set()
+        for app in BUDGETED_APPS:
+            module = import_module(f'apps.{app}.tests')
+            for value in vars(module).values():
+                if isinstance(value, type) and issubclass(value, QueryBudgetMixin):
+                    covered.update(value.budgets)
+        missing = sorted(namespace_url_names() - covered)
+        self.assertFalse(missing, f'URLs without a query budget: {", ".join(missing)}')
+
+
+@override_settings(VIEW_COUNT_FLUSH_THREAD=False)
+class ViewCountBufferTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        author = User.objects.create_user('author', 'author@example.com', 'pass-123-xyz')
+        cls.prompts = [
+            Prompt.objects.create(title=f'Prompt {i}', description='d', prompt_text='t', author=author)
+            for i in range(3)
+        ]
+
+    def setUp(self):
+        self.buffer = ViewCountBuffer()
+
+    def views(self):
+        return list(Prompt.objects.order_by('title').values_list('views', flat=True))
+
+    def test_record_and_pending(self):
+        first, second, _ = self.prompts
+        self.buffer.record(first)
+        self.buffer.record(first, hits=2)
+        self.buffer.record(second)
+        self.assertEqual(self.buffer.pending(first), 3)
+        self.assertEqual(self.buffer.pending(second), 1)
+        self.assertEqual(self.views(), [0, 0, 0])
+
+    def test_apply_pending(self):
+        first, second, third = self.prompts
+        self.buffer.record(first, hits=4)
+        self.buffer.apply_pending([first, third])
+        self.assertEqual((first.views, second.views, third.views), (4, 0, 0))
+
+    def test_flush_groups_objects_by_delta(self):
+        first, second, third = self.prompts
+        self.buffer.record(first, hits=2)
+        self.buffer.record(second, hits=2)
+        self.buffer.record(third)
+        with CaptureQueriesContext(connection) as captured:
+            self.assertEqual(self.buffer.flush(), 3)
+        updates = [query for query in captured.captured_queries if query['sql'].startswith('UPDATE "prompts_prompt" SET "views"')]
+        self.assertEqual(len(updates), 2)
+        self.assertEqual(self.views(), [2, 2, 1])
+        self.assertEqual(self.buffer.pending(first), 0)
+
+    def test_failed_flush_keeps_hits_and_logs(self):
+        first = self.prompts[0]
+        self.buffer.record(first, hits=2)
+        with mock.patch.object(self.buffer, 'write', side_effect=OperationalError('database is locked')):
+            with self.assertLogs('apps.core.view_counter', 'ERROR'):
+                self.assertEqual(self.buffer.flush(), 0)
+        self.buffer.record(first)
+        self.assertEqual(self.buffer.pending(first), 3)
+        self.assertEqual(self.buffer.flush(), 1)
+        self.assertEqual(self.views(), [3, 0, 0])
+
+    def test_hits_unwritten_at_exit_are_saved_for_flush_view_counts(self):
+        first, second, _ = self.prompts
+        self.buffer.record(first, hits=5)
+        self.buffer.record(second)
+        with tempfile.TemporaryDirectory() as directory, override_settings(VIEW_COUNT_SPILL_DIR=directory):
+            with mock.patch.object(self.buffer, 'write', side_effect=OperationalError('database is locked')):
+                with self.assertLogs('apps.core.view_counter'):
+                    self.buffer.flush_at_exit(os.getpid())
+            self.assertEqual(self.buffer.pending(first), 0)
+            self.assertEqual(self.views(), [0, 0, 0])
+
+            self.assertEqual(view_counter.flush_spilled(), 1)
+            self.assertEqual(self.views(), [5, 1, 0])
+            self.assertEqual(view_counter.flush_spilled(), 0)
+
+
+class TagUsageTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user('tagger', 'tagger@example.com', 'tag-pass-123')
+        cls.category = Category.objects.create(name='Coding')
+
+    def create(self, tags, **kwargs):
+        return Prompt.objects.create(title='Tagged', description='d', prompt_text='t', category=self.category,
+                                     author=self.author, tags=tags, **kwargs)
+
+    def usage(self):
+        return dict(Tag.objects.values_list('slug', 'usage_count'))
+
+    def test_symbols_keep_tags_apart(self):
+        self.create('C++, C, C#, c')
+        self.assertEqual(self.usage(), {'c-plus-plus': 1, 'c': 1, 'c-sharp': 1})
+
+    def test_only_published_items_are_counted(self):
+        draft = self.create('python', is_published=False)
+        self.assertEqual(self.usage(), {'python': 0})
+
+        draft.is_published = True
+        draft.save(update_fields=['is_published'])
+        self.assertEqual(self.usage(), {'python': 1})
+
+        draft.is_published = False
+        draft.tags = 'python, django'
+        draft.save()
+        self.assertEqual(self.usage(), {'python': 0, 'django': 0})
+        self.assertEqual(draft.tag_set.count(), 2)
+
+    def test_delete_releases_published_tags_only(self):
+        self.create('python').delete()
+        self.create('python', is_published=False).delete()
+        self.assertEqual(self.usage(), {'python': 0})
+
+
+class FragmentCacheTests(SimpleTestCase):
+    @override_settings(FRAGMENT_CACHE_TIMEOUT=42)
+    def test_fragments_expire_unless_registered_with_a_timeout(self):
+        self.assertEqual(fragments.Fragment('a', list, (), None).timeout, 42)
+        self.assertEqual(fragments.Fragment('b', list, (), 5).timeout, 5)
+
+    def test_stats_need_a_shared_cache(self):
+        self.assertFalse(fragments.cache_is_shared())
+        with self.assertRaisesMessage(CommandError, 'local to each process'):
+            call_command('fragment_cache_stats')
+
+    def test_stats_with_a_shared_cache(self):
+        with tempfile.TemporaryDirectory() as location, override_settings(CACHES={'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': location,
+        }}):
+            stats = fragments.FragmentStats()
+            for outcome in ('hits', 'hits', 'misses'):
+                stats.record('prompts:categories', outcome)
+            stats.report()
+            out = StringIO()
+            call_command('fragment_cache_stats', stdout=out)
+        self.assertRegex(out.getvalue(), r'prompts:categories +hits=2 +misses=1 ')
+
+    def test_counts_are_reported_once_per_interval(self):
+        stats = fragments.FragmentStats()
+        with mock.patch.object(fragments, 'cache') as fake_cache:
+            with override_settings(FRAGMENT_STATS_INTERVAL=60):
+                self.assertFalse(stats.record('prompts:categories', 'hits'))
+                self.assertFalse(stats.record('prompts:categories', 'hits'))
+            self.assertFalse(fake_cache.method_calls)
+
+            with override_settings(FRAGMENT_STATS_INTERVAL=0):
+                self.assertTrue(stats.record('prompts:categories', 'misses'))
+            stats.report()
+        self.assertCountEqual(fake_cache.incr.call_args_list, [
+            mock.call('fragment:stats:prompts:categories:hits', 2),
+            mock.call('fragment:stats:prompts:categories:misses', 1),
+        ])
+
+
+@override_settings(PAGE_CACHE_ENABLED=True, VIEW_COUNT_FLUSH_THREAD=False)
+class PageCachePurgeTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        author = User.objects.create_user('author', 'author@example.com', 'pass-123-xyz')
+        cls.prompt = Prompt.objects.create(title='Old name', slug='old-name', description='d', prompt_text='t',
+                                           author=author)
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(view_counter.view_counts.clear)
+
+    def test_rename_purges_the_old_url(self):
+        url = reverse('prompts:detail', args=['old-name'])
+        self.client.get(url)
+        self.assertEqual(self.client.get(url)['X-Page-Cache'], 'hit')
+
+        self.prompt.slug = 'new-name'
+        self.prompt.save()
+        self.assertNotEqual(self.client.get(url).get('X-Page-Cache'), 'hit')
+
+
+@override_settings(COUNT_ESTIMATE_THRESHOLD=5)
+class CachedCountTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        author = User.objects.create_user('author', 'author@example.com', 'pass-123-xyz')
+        cls.writing = Category.objects.create(name='Writing')
+        for i in range(8):
+            Prompt.objects.create(title=f'Prompt {i}', description='d', prompt_text='t', author=author,
+                                  category=cls.writing if i < 3 else None)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_counts_up_to_the_threshold(self):
+        self.assertEqual(counting.cached_count(Prompt.objects.filter(category=self.writing)), (3, False))
+        with CaptureQueriesContext(connection) as captured:
+            self.assertEqual(counting.cached_count(Prompt.objects.all()), (5, True))
+        # Bounded: the subquery stops after threshold + 1 rows
+        self.assertEqual(len(captured), 1)
+        self.assertIn('LIMIT 6', captured[0]['sql'])
+
+    def test_save_invalidates_cached_counts(self):
+        queryset = Prompt.objects.filter(category=self.writing)
+        self.assertEqual(counting.cached_count(queryset), (3, False))
+        with self.assertNumQueries(0):
+            counting.cached_count(queryset)
+
+        Prompt.objects.filter(category=None).update(category=self.writing)
+        # update() sends no signal; the count stays cached until a save or delete
+        self.assertEqual(counting.cached_count(queryset), (3, False))
+        Prompt.objects.first().delete()
+        self.assertEqual(counting.cached_count(queryset), (5, True))
+
+    def test_version_never_expires(self):
+        with mock.patch.object(counting, 'cache') as fake_cache:
+            fake_cache.get.return_value = None
+            counting.get_version(Prompt)
+            counting.bump_version(Prompt)
+        self.assertIsNone(fake_cache.add.call_args.args[2])
+        self.assertIsNone(fake_cache.set.call_args.args[2])
+
+    def test_paginator_reaches_rows_past_the_bound(self):
+        paginator = counting.CachedCountPaginator(Prompt.objects.order_by('pk'), 3)
+        self.assertEqual((paginator.count, paginator.num_pages), (5, 2))
+        self.assertTrue(paginator.count_is_lower_bound)
+
+        page = paginator.page(2)
+        self.assertEqual(len(page), 3)
+        self.assertTrue(page.has_next())
+        page = paginator.page(page.next_page_number())
+        self.assertEqual(len(page), 2)
+        self.assertFalse(page.has_next())
+        self.assertEqual(len(paginator.page(4)), 0)
+
+    def test_paginator_below_the_bound(self):
+        paginator = counting.CachedCountPaginator(Prompt.objects.filter(category=self.writing).order_by('pk'), 2)
+        self.assertFalse(paginator.page(2).has_next())
+        with self.assertRaises(counting.EmptyPage):
+            paginator.page(3)
+
+
+class AssetBundleTests(SimpleTestCase):
+    def test_minify_css_keeps_strings_and_urls(self):
+        css = 'a  >  b { content: "x:  y; }" ; background: url( "a b.png" )  no-repeat ; } /* c: d */'
+        self.assertEqual(assets.minify_css(css), 'a>b{content:"x:  y; }";background:url( "a b.png" ) no-repeat}')
+
+    def test_minify_js_keeps_code_after_comments(self):
+        js = '/* a */ init();\n  /* multi\n  line */ run();\n// note\nconst t = `\n  /* kept */\n`;\n'
+        self.assertEqual(assets.minify_js(js), 'init();\nrun();\nconst t = `\n  /* kept */\n`;')
+
+    def test_build_bundle(self):
+        for name, sources in assets.get_bundles().items():
+            with self.subTest(bundle=name):
+                bundle = assets.build_bundle(name, sources)
+                size = sum(os.path.getsize(finders.find(source)) for source in sources)
+                self.assertTrue(0 < len(bundle) < size)
+        with self.assertRaisesMessage(FileNotFoundError, "'css/missing.css' not found"):
+            assets.build_bundle('css/site.css', ['css/style.css', 'css/missing.css'])
+
+    def collectstatic(self, root):
+        storages = {**settings.STORAGES, 'staticfiles': {'BACKEND': 'apps.core.storage.BundledManifestStorage'}}
+        with override_settings(STATIC_ROOT=root, STORAGES=storages):
+            call_command('collectstatic', interactive=False, verbosity=0)
+
+    def test_collectstatic_builds_bundles(self):
+        with tempfile.TemporaryDirectory() as root, mock.patch.object(assets, 'VENDOR_FILES', []):
+            self.collectstatic(root)
+            with open(os.path.join(root, 'staticfiles.json')) as handle:
+                manifest = json.load(handle)['paths']
+            for name in assets.get_bundles():
+                self.assertIn(name, manifest)
+                self.assertTrue(os.path.exists(os.path.join(root, manifest[name] + '.gz')))
+
+    def test_collectstatic_needs_vendored_files(self):
+        with tempfile.TemporaryDirectory() as root:
+            with self.assertRaisesMessage(FileNotFoundError, 'vendor/bootstrap/css/bootstrap.min.css'):
+                self.collectstatic(root)
+
+
+class ImageRenditionTests(TestCase):
+    template = Template("{% load core_tags %}{% responsive_image post.featured_image 'card' alt='Cover' %}")
+
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        self.enterContext(override_settings(MEDIA_ROOT=media.name))
+        cache.clear()
+        self.post = BlogPost.objects.create(
+            title='Post', excerpt='e', content='c', status='published',
+            author=User.objects.create_user('writer'),
+        )
+
+    def upload(self):
+        buffer = BytesIO()
+        Image.new('RGB', (1600, 900), 'teal').save(buffer, 'PNG')
+        self.post.featured_image.save('cover.png', ContentFile(buffer.getvalue()))
+
+    def render_tag(self):
+        return self.template.render(Context({'post': self.post}))
+
+    def test_tag_does_not_render_missing_renditions(self):
+        self.upload()
+        with mock.patch.object(images, 'render') as render:
+            html = self.render_tag()
+        render.assert_not_called()
+        self.assertHTMLEqual(html, f'<img src="{self.post.featured_image.url}" alt="Cover" class="" loading="lazy">')
+        self.assertIsNone(images.get_renditions(self.post.featured_image, 'card'))
+
+    def test_save_generates_renditions(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.upload()
+        html = self.render_tag()
+        self.assertIn('<picture>', html)
+        self.assertIn('360w', html)
+        self.assertIn('720w', html)
+        # A cold cache reads the manifest instead of rendering again
+        cache.clear()
+        with mock.patch.object(images, 'render') as render:
+            self.assertEqual(self.render_tag(), html)
+        render.assert_not_called()
+
+    def test_command_generates_missing_renditions(self):
+        self.upload()
+        out = StringIO()
+        call_command('generate_renditions', stdout=out)
+        self.assertIn('blog.BlogPost: 2 renditions', out.getvalue())
+        self.assertIn('<picture>', self.render_tag())
+        out = StringIO()
+        call_command('generate_renditions', missing=True, stdout=out)
+        self.assertIn('blog.BlogPost: 0 renditions', out.getvalue())
+
+
+class SQLitePragmaTests(SimpleTestCase):
+    def connect(self):
+        """A new connection to a file database, which supports WAL"""
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        wrapper = DatabaseWrapper({**connection.settings_dict, 'NAME': os.path.join(directory.name, 'db.sqlite3')})
+        self.addCleanup(wrapper.close)
+        return wrapper
+
+    def pragmas(self, wrapper, *names):
+        with wrapper.cursor() as cursor:
+            return {name: db.pragma(cursor, name) for name in names}
+
+    @override_settings(SQLITE_PRAGMAS={
+        'journal_mode': 'WAL', 'synchronous': 'NORMAL', 'busy_timeout': 20000,
+        'temp_store': 'MEMORY', 'cache_size': -64 * 1024,
+    })
+    def test_pragmas_are_applied_to_new_connections(self):
+        self.assertEqual(
+            self.pragmas(self.connect(), 'journal_mode', 'synchronous', 'busy_timeout', 'temp_store', 'cache_size'),
+            {'journal_mode': 'wal', 'synchronous': 1, 'busy_timeout': 20000, 'temp_store': 2, 'cache_size': -65536},
+        )
+
+    @override_settings(SQLITE_PRAGMAS={})
+    def test_no_pragmas_keeps_sqlite_defaults(self):
+        self.assertEqual(self.pragmas(self.connect(), 'journal_mode', 'synchronous'), {'journal_mode': 'delete', 'synchronous': 2})
+
+
+class ReplicaView(routing.ReplicaReadMixin):
+    pass
+
+
+def replica_view(request):
+    pass
+
+
+replica_view.view_class = ReplicaView
+
+
+@override_settings(DATABASE_REPLICAS=['replica'], REPLICA_STICKY_SECONDS=15)
+class ReplicaRoutingTests(SimpleTestCase):
+    """The router only decides aliases here; no query reaches a replica"""
+
+    def setUp(self):
+        self.router = routing.ReplicaRouter()
+        self.factory = RequestFactory()
+
+    def route(self, request, view=replica_view, write=False):
+        """Run a request through the middleware; returns (read alias, response)"""
+        aliases = []
+
+        def get_response(request):
+            middleware.process_view(request, view, (), {})
+            if write:
+                self.router.db_for_write(Prompt)
+            aliases.append(self.router.db_for_read(Prompt))
+            return HttpResponse()
+
+        middleware = routing.ReplicaRoutingMiddleware(get_response)
+        response = middleware(request)
+        self.assertIsNone(routing._state.get())
+        return aliases[0], response
+
+    def test_marked_reads_use_the_replica(self):
+        self.assertEqual(self.route(self.factory.get('/'))[0], 'replica')
+        self.assertEqual(self.route(self.factory.get('/'), view=lambda request: None)[0], 'default')
+        with override_settings(DATABASE_REPLICAS=[]):
+            self.assertEqual(self.route(self.factory.get('/'))[0], 'default')
+
+    def test_reads_outside_requests_use_the_primary(self):
+        self.assertEqual(self.router.db_for_read(Prompt), 'default')
+
+    def test_write_pins_the_rest_of_the_request(self):
+        self.assertEqual(self.route(self.factory.get('/'), write=True)[0], 'default')
+
+    def test_changes_set_the_sticky_cookie(self):
+        alias, response = self.route(self.factory.post('/'))
+        self.assertEqual(alias, 'default')
+        cookie = response.cookies[routing.STICKY_COOKIE]
+        self.assertEqual(cookie['max-age'], 15)
+        self.assertTrue(cookie['httponly'])
+        self.assertNotIn(routing.STICKY_COOKIE, self.route(self.factory.get('/'))[1].cookies)
+
+    def test_sticky_cookie_pins_reads(self):
+        request = self.factory.get('/')
+        request.COOKIES[routing.STICKY_COOKIE] = '1'
+        self.assertEqual(self.route(request)[0], 'default')
+
+    def test_state_is_reset_when_the_view_raises(self):
+        def get_response(request):
+            middleware.process_view(request, replica_view, (), {})
+            raise ValueError
+
+        middleware = routing.ReplicaRoutingMiddleware(get_response)
+        with self.assertRaises(ValueError):
+            middleware(self.factory.get('/'))
+        self.assertIsNone(routing._state.get())
+        self.assertEqual(self.router.db_for_read(Prompt), 'default')
+
+    def test_async_requests_reset_the_state(self):
+        aliases = []
+
+        async def get_response(request):
+            middleware.process_view(request, replica_view, (), {})
+            aliases.append(self.router.db_for_read(Prompt))
+            raise ValueError
+
+        middleware = routing.ReplicaRoutingMiddleware(get_response)
+
+        async def run():
+            with self.assertRaises(ValueError):
+                await middleware(self.factory.get('/'))
+            return routing._state.get()
+
+        self.assertIsNone(asyncio.run(run()))
+        self.assertEqual(aliases, ['replica'])
+
+    def test_use_primary_and_transactions_pin_reads(self):
+        token = routing._state.set(routing.RouteState())
+        self.addCleanup(routing._state.reset, token)
+        routing._state.get().replica_reads = True
+        self.assertEqual(self.router.db_for_read(Prompt), 'replica')
+        with routing.use_primary():
+            self.assertEqual(self.router.db_for_read(Prompt), 'default')
+        self.assertEqual(self.router.db_for_read(Prompt), 'replica')
+        with mock.patch.object(connection, 'in_atomic_block', True):
+            self.assertEqual(self.router.db_for_read(Prompt), 'default')
+
+
+@override_settings(REQUEST_TIMING_HEADER='staff', SLOW_REQUEST_MS=60000, SLOW_REQUEST_QUERIES=1000)
+class ServerTimingTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('member')
+        cls.staff = User.objects.create_user('editor', is_staff=True)
+
+    def timing(self, user=None):
+        if user:
+            self.client.force_login(user)
+        return self.client.get(reverse('users:login')).headers.get('Server-Timing')
+
+    def test_staff_only(self):
+        self.assertIsNone(self.timing())
+        self.assertIsNone(self.timing(self.user))
+        self.assertRegex(self.timing(self.staff), r'^db;dur=[\d.]+;desc="\d+ queries", view;dur=[\d.]+, .*total;dur=[\d.]+$')
+
+    def test_header_setting(self):
+        with override_settings(REQUEST_TIMING_HEADER=True):
+            self.assertIsNotNone(self.timing())
+        with override_settings(REQUEST_TIMING_HEADER=False):
+            self.assertIsNone(self.timing(self.staff))
+        with override_settings(REQUEST_TIMING_ENABLED=False):
+            self.assertIsNone(self.timing(self.staff))
+
+    async def test_staff_only_under_asgi(self):
+        url = reverse('users:login')
+        response = await self.async_client.get(url)
+        self.assertNotIn('Server-Timing', response.headers)
+        await self.async_client.aforce_login(self.staff)
+        response = await self.async_client.get(url)
+        self.assertIn('Server-Timing', response.headers)
+
+
+def reload_urlconfs():
+    """Rebuild the URLconfs, which pick the sync or async views at import"""
+    for module in ('apps.news.urls', 'apps.prompts.urls', settings.ROOT_URLCONF):
+        reload(import_module(module))
+    clear_url_caches()
+
+
+@override_settings(VIEW_COUNT_FLUSH_THREAD=False)
+class AsyncReadViewTests(TestCase):
+    """Every async variant, served through the ASGI request handler"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.data = seed_content()
+
+    def setUp(self):
+        self.addCleanup(reload_urlconfs)
+        self.enterContext(override_settings(ASYNC_READ_VIEWS=ASYNC_VIEW_NAMES))
+        reload_urlconfs()
+        cache.clear()
+        self.addCleanup(view_counter.view_counts.clear)
+
+    def urls(self):
+        args = {
+            'news:detail': [self.data['article'].slug],
+            'prompts:detail': [self.data['prompt'].slug],
+        }
+        return {name: reverse(name, args=args.get(name)) for name in ASYNC_VIEW_NAMES}
+
+    async def assertAsyncViewsRender(self):
+        for name, url in self.urls().items():
+            with self.subTest(url=name):
+                response = await self.async_client.get(url)
+                self.assertEqual(response.status_code, 200)
+                self.assertTrue(response.resolver_match.func.view_class.__name__.startswith('Async'))
+
+    async def test_anonymous(self):
+        await self.assertAsyncViewsRender()
+
+    async def test_logged_in(self):
+        await self.async_client.aforce_login(self.data['reader'])
+        await self.assertAsyncViewsRender()
+
+
+class RelatedContentTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user('author', 'author@example.com', 'pass-123-xyz')
+        cls.writing, cls.coding = [Category.objects.create(name=name) for name in ('Writing', 'Coding')]
+
+    def create(self, title, tags='', category=None, **extra):
+        return Prompt.objects.create(title=title, description='d', prompt_text='t', author=self.author,
+                                     tags=tags, category=category, **extra)
+
+    def rows(self):
+        return {
+            (source, target): round(score, 3)
+            for source, target, score in RelatedPrompt.objects.values_list('source_id', 'target_id', 'score')
+        }
+
+    def test_ranking(self):
+        source = self.create('Source', 'python, django, testing', self.writing)
+        two_tags = self.create('Two tags', 'python, django', self.coding)
+        tag_and_category = self.create('Tag and category', 'testing', self.writing)
+        category_only = self.create('Category only', '', self.writing)
+        self.create('Unrelated', 'cooking', self.coding)
+        self.create('Unpublished', 'python, django, testing', self.writing, is_published=False)
+
+        related.rebuild('prompt')
+        # 2 shared tags (6) > 1 tag + category (5) > category (2)
+        self.assertEqual(related.get_related(source), [two_tags, tag_and_category, category_only])
+
+    def test_new_objects_are_added_without_a_full_rebuild(self):
+        old = [self.create(f'Old {i}', 'python', self.writing) for i in range(3)]
+        related.rebuild('prompt')
+        untouched = self.create('Untouched', 'cooking', self.coding)
+        stale_row = RelatedPrompt.objects.create(source=untouched, target=old[0], score=99)
+
+        new = [self.create(f'New {i}', 'python, django', self.writing) for i in range(2)]
+        related.rebuild('prompt', new_pks=[prompt.pk for prompt in new])
+        incremental = self.rows()
+        # Lists of other objects are left alone
+        self.assertIn((untouched.pk, old[0].pk), incremental)
+
+        stale_row.delete()
+        related.rebuild('prompt')
+        self.assertEqual(incremental, {**self.rows(), (untouched.pk, old[0].pk): 99})
+
+    @override_settings(RELATED_CONTENT_SIZE=2)
+    def test_new_objects_keep_lists_at_size(self):
+        old = [self.create(f'Old {i}', 'python', self.writing) for i in range(3)]
+        related.rebuild('prompt')
+        new = self.create('New', 'python', self.writing)
+        related.rebuild('prompt', new_pks=[new.pk])
+        for prompt in old:
+            self.assertEqual(RelatedPrompt.objects.filter(source=prompt).count(), 2)
+
+    def test_full_rebuild_drops_unpublished(self):
+        first = self.create('First', 'python')
+        second = self.create('Second', 'python')
+        related.rebuild('prompt')
+        Prompt.objects.filter(pk=second.pk).update(is_published=False)
+        related.rebuild('prompt')
+        self.assertEqual(self.rows(), {})
+        self.assertEqual(related.get_related(first), [])
+
+    def test_save_refreshes_after_commit(self):
+        first = self.create('First', 'python')
+        with self.captureOnCommitCallbacks(execute=True):
+            second = self.create('Second', 'python')
+        self.assertEqual(set(self.rows()), {(first.pk, second.pk), (second.pk, first.pk)})
+
+        # Saves that cannot move an item schedule nothing
+        with self.captureOnCommitCallbacks() as callbacks:
+            second.save(update_fields=['views'])
+        self.assertFalse([callback for callback in callbacks if getattr(callback, 'func', None) is related.refresh])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            second.is_published = False
+            second.save()
+        self.assertEqual(self.rows(), {})
+
+    def test_import_adds_related_items(self):
+        existing = self.create('Existing', 'python')
+        related.rebuild('prompt')
+        with tempfile.NamedTemporaryFile('w', suffix='.jsonl', delete=False) as handle:
+            handle.write(json.dumps({'title': 'Imported', 'description': 'd', 'prompt_text': 't', 'tags': 'python'}))
+        self.addCleanup(os.remove, handle.name)
+        call_command('import_content', 'prompt', handle.name, '--default-author', 'author', stdout=StringIO())
+        imported = Prompt.objects.get(title='Imported')
+        self.assertEqual(set(self.rows()), {(existing.pk, imported.pk), (imported.pk, existing.pk)})
+
+
+@override_settings(VIEW_COUNT_FLUSH_THREAD=False)
+class TrendingUpdateTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        author = User.objects.create_user('author', 'author@example.com', 'pass-123-xyz')
+        cls.prompt = Prompt.objects.create(title='Trend', description='d', prompt_text='t', author=author)
+
+    def state(self):
+        return Prompt.objects.values_list('trending_score', 'trending_dirty').get(pk=self.prompt.pk)
+
+    def test_only_flagged_rows_are_read(self):
+        self.assertEqual(trending.update('prompt'), 1)
+        self.assertEqual(self.state(), (0.0, False))
+        self.assertEqual(trending.update('prompt'), 0)
+
+        buffer = ViewCountBuffer()
+        buffer.record(self.prompt, hits=10)
+        buffer.flush()
+        self.assertTrue(self.state()[1])
+        self.assertEqual(trending.update('prompt'), 1)
+        score, dirty = self.state()
+        self.assertGreater(score, 0)
+        # Still flagged while the score decays
+        self.assertTrue(dirty)
+
+    def test_counter_saves_flag_the_row(self):
+        trending.update('prompt')
+        self.prompt.upvotes = 3
+        self.prompt.save(update_fields=['upvotes'])
+        self.assertTrue(self.state()[1])
+
+    @override_settings(TRENDING_WIDGET_TIMEOUT=60)
+    def test_widgets_expire_after_about_one_run(self):
+        for key in ('prompts:trending', 'blog:trending', 'news:trending'):
+            self.assertEqual(fragments._registry[key].timeout, 60)
+
+
+class UniqueSlugTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user('author', 'author@example.com', 'pass-123-xyz')
+
+    def create(self, title):
+        return Prompt.objects.create(title=title, description='d', prompt_text='t', author=self.author)
+
+    def test_free_slug_is_one_indexed_probe(self):
+        with CaptureQueriesContext(connection) as captured:
+            self.assertEqual(unique_slug(Prompt, 'Fresh title'), 'fresh-title')
+        self.assertEqual(len(captured), 1)
+        self.assertNotIn('REGEXP', captured[0]['sql'])
+
+    def test_collisions_get_the_next_suffix(self):
+        slugs = [self.create('Same title').slug for _ in range(3)]
+        self.create('Same title extra')
+        self.assertEqual(slugs, ['same-title', 'same-title-1', 'same-title-2'])
+        with CaptureQueriesContext(connection) as captured:
+            self.assertEqual(unique_slug(Prompt, 'Same title'), 'same-title-3')
+        self.assertEqual(len(captured), 2)
+
+
+class TagSlugTests(TestCase):
+    def test_symbols_are_kept_apart(self):
+        self.assertEqual([tag_slug(name) for name in ('C', 'C++', 'C#', 'Machine  Learning')],
+                         ['c', 'c-plus-plus', 'c-sharp', 'machine-learning'])
+
+    def test_long_slugs_fit_the_field(self):
+        names = ['+' * 50, '+' * 49 + '#', 'ü' * 50 + '+']
+        slugs = [tag_slug(name) for name in names]
+        self.assertTrue(all(len(slug) <= TAG_SLUG_MAX_LENGTH for slug in slugs))
+        # Same name, same slug; different long names, different slugs
+        self.assertEqual(slugs[0], tag_slug('+' * 50))
+        self.assertEqual(len(set(slugs)), 3)
+        for name in names:
+            Tag.objects.create(name=name)
+        self.assertEqual(sorted(Tag.objects.values_list('slug', flat=True)), sorted(slugs))
+
+
+class ImportContentTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        User.objects.create_user('importer', 'importer@example.com', 'pass-123-xyz')
+
+    def run_import(self, rows, *args):
+        with tempfile.NamedTemporaryFile('w', suffix='.jsonl', delete=False) as handle:
+            handle.write('\n'.join(json.dumps(row) for row in rows))
+        self.addCleanup(os.remove, handle.name)
+        out, err = StringIO(), StringIO()
+        call_command('import_content', 'prompt', handle.name, '--default-author', 'importer', '--skip-related',
+                     *args, stdout=out, stderr=err)
+        return err.getvalue()
+
+    def row(self, **values):
+        return {'title': 'Imported', 'description': 'd', 'prompt_text': 't', **values}
+
+    def test_site_maintained_columns_are_ignored(self):
+        err = self.run_import([self.row(views=999, trending_score=50, trending_dirty=False)])
+        prompt = Prompt.objects.get()
+        self.assertEqual((prompt.views, prompt.trending_score, prompt.trending_dirty), (0, 0, True))
+        self.assertIn('Ignoring column "views"', err)
+
+    def test_rows_are_validated(self):
+        with self.assertRaisesMessage(CommandError, 'Row 1'):
+            self.run_import([self.row(difficulty='impossible')])
+        err = self.run_import([self.row(difficulty='impossible'), self.row(title='Valid')], '--skip-invalid')
+        self.assertIn('Skipping row 1', err)
+        self.assertEqual(list(Prompt.objects.values_list('title', flat=True)), ['Valid'])
@@ -0,0 +1,179 @@
+"""
+Per-request timing
+
+``RequestTimingMiddleware`` measures, for each request, the SQL query
+count and time (through ``connection.execute_wrapper``), the view time,
+the template render time and the total. Figures are sent in a
+``Server-Timing`` header (visible in the browser's network panel) and
+requests over ``SLOW_REQUEST_MS`` or ``SLOW_REQUEST_QUERIES`` are logged
+with the resolved view name and their slowest and most repeated SQL.
+
+The cost per query is two ``perf_counter()`` calls and a list append, so
+the middleware can stay enabled in production.
+
+Under ASGI the ORM runs in the request's thread-sensitive executor thread,
+not on the event loop, so the wrappers are installed there.
+"""
+
+import logging
+import time
+from collections import Counter
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+# Queries kept per request for the slow log
+MAX_RECORDED_QUERIES = 500
+LOGGED_QUERIES = 5
+
+
+class RequestTimings:
+    """Measurements for one request"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.view_started = None
+        self.view_time = None
+        self.render_started = None
+        self.render_time = None
+        self.query_count = 0
+        self.db_time = 0.0
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - started
+            self.query_count += 1
+            self.db_time += duration
+            if len(self.queries) < MAX_RECORDED_QUERIES:
+                self.queries.append((duration, sql))
+
+    def view_finished(self):
+        if self.view_started is not None and self.view_time is None:
+            self.view_time = time.perf_counter() - self.view_started
+
+    def render_finished(self, response):
+        if self.render_started is not None:
+            self.render_time = time.perf_counter() - self.render_started
+        return response
+
+    def server_timing(self, total):
+        metrics = [f'db;dur={self.db_time * 1000:.1f};desc="{self.query_count} queries"']
+        if self.view_time is not None:
+            metrics.append(f'view;dur={self.view_time * 1000:.1f}')
+        if self.render_time is not None:
+            metrics.append(f'render;dur={self.render_time * 1000:.1f}')
+        metrics.append(f'total;dur={total * 1000:.1f}')
+        return ', '.join(metrics)
+
+    def slowest_queries(self, limit=LOGGED_QUERIES):
+        return sorted(self.queries, key=lambda query: query[0], reverse=True)[:limit]
+
+    def repeated_queries(self, limit=LOGGED_QUERIES):
+        """Identical SQL run more than once (typically an N+1)"""
+        counts = Counter(sql for _, sql in self.queries)
+        return [(sql, count) for sql, count in counts.most_common(limit) if count > 1]
+
+
+class RequestTimingMiddleware:
+    """
+    Record query/view/render timings; add Server-Timing and log slow requests
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    @property
+    def enabled(self):
+        return getattr(settings, 'REQUEST_TIMING_ENABLED', True)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not self.enabled:
+            return self.get_response(request)
+
+        timings = request._timings = RequestTimings()
+        with ExitStack() as stack:
+            self.install(stack, timings)
+            response = self.get_response(request)
+        return self.finish(request, response, timings)
+
+    async def __acall__(self, request):
+        if not self.enabled:
+            return await self.get_response(request)
+
+        timings = request._timings = RequestTimings()
+        with ExitStack() as stack:
+            await sync_to_async(self.install)(stack, timings)
+            try:
+                response = await self.get_response(request)
+            finally:
+                await sync_to_async(stack.close)()
+        # show_header() may load the user
+        return await sync_to_async(self.finish)(request, response, timings)
+
+    def install(self, stack, timings):
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(timings))
+
+    def finish(self, request, response, timings):
+        timings.view_finished()
+        total = time.perf_counter() - timings.started
+
+        if self.show_header(request):
+            response['Server-Timing'] = timings.server_timing(total)
+        self.log_if_slow(request, response, timings, total)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        timings = getattr(request, '_timings', None)
+        if timings is not None:
+            timings.view_started = time.perf_counter()
+
+    def process_template_response(self, request, response):
+        # The view has returned; rendering starts after the template response hooks
+        timings = getattr(request, '_timings', None)
+        if timings is not None:
+            timings.view_finished()
+            timings.render_started = time.perf_counter()
+            response.add_post_render_callback(timings.render_finished)
+        return response
+
+    def show_header(self, request):
+        setting = getattr(settings, 'REQUEST_TIMING_HEADER', True)
+        if setting == 'staff':
+            user = getattr(request, 'user', None)
+            return bool(user and user.is_staff)
+        return bool(setting)
+
+    def log_if_slow(self, request, response, timings, total):
+        slow_ms = getattr(settings, 'SLOW_REQUEST_MS', 500)
+        slow_queries = getattr(settings, 'SLOW_REQUEST_QUERIES', 50)
+        if total * 1000 < slow_ms and timings.query_count < slow_queries:
+            return
+
+        match = getattr(request, 'resolver_match', None)
+        lines = [
+            f'Slow request {request.method} {request.path} view={match.view_name if match else "-"} '
+            f'status={response.status_code} total={total * 1000:.0f}ms '
+            f'db={timings.db_time * 1000:.0f}ms/{timings.query_count} queries '
+            f'view={(timings.view_time or 0) * 1000:.0f}ms render={(timings.render_time or 0) * 1000:.0f}ms'
+        ]
+        for duration, sql in timings.slowest_queries():
+            lines.append(f'  {duration * 1000:.1f}ms  {sql}')
+        for sql, count in timings.repeated_queries():
+            lines.append(f'  repeated x{count}  {sql}')
+        logger.warning('\n'.join(lines))
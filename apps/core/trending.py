@@ -0,0 +1,243 @@
+"""
+Time-decayed trending scores
+
+Prompts, blog posts and news articles keep a materialized
+``trending_score``: their recent engagement, with every contribution
+halving in weight each TRENDING_HALF_LIFE_HOURS. ``?sort=trending`` and
+the trending widgets read it through a (published, -trending_score) index,
+so the top N is an index range scan instead of a sort of the whole table.
+
+Scores are recomputed in batches by ``update_trending``, which should run
+periodically (every 10-15 minutes). Each run decays an object's stored
+score by the time since its last update and adds what happened since:
+
+* timestamped events (bookmarks, approved comments), each decayed by its
+  own age;
+* growth of the engagement counters (views, upvotes, likes). These have no
+  timestamps, so the growth is credited to the middle of the interval.
+  ``trending_base`` keeps the weighted counter total so the next run only
+  sees new growth.
+
+On an object's first update its counters count only when it was published
+within the horizon, so all-time totals from before this feature, or from
+an import, do not look like fresh engagement.
+
+Only objects whose score can change are read: those flagged
+``trending_dirty``. New rows start flagged; view count flushes, saves that
+may change a counter and recent events flag a row; a row stays flagged
+while it holds a score that decays. The flag has a partial index, so a
+run reads those rows instead of scanning the table.
+
+A run invalidates the trending fragments and list pages through the
+cache, which only reaches the web processes when that cache is shared
+(see config/settings/prod.py). The trending fragments also expire after
+TRENDING_WIDGET_TIMEOUT seconds, about one cron interval.
+"""
+
+from datetime import timedelta
+from functools import reduce
+from operator import add
+
+from django.apps import apps
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from . import fragments, page_cache
+from .related import published_filter
+from .search import SEARCHABLE, get_model, kind_for_model
+
+
+# Engagement counters and timestamped events per content type, with weights
+TRENDING = {
+    'prompt': {
+        'date': 'created_at',
+        'counters': {'views': 1.0, 'upvotes': 5.0},
+        'events': [
+            {'model': 'prompts.Bookmark', 'field': 'prompt', 'date': 'created_at', 'weight': 10.0},
+        ],
+    },
+    'blog': {
+        'date': 'published_at',
+        'counters': {'views': 1.0, 'likes': 5.0},
+        'events': [
+            {'model': 'blog.BlogComment', 'field': 'post', 'date': 'created_at', 'weight': 8.0,
+             'filter': {'is_approved': True}},
+        ],
+    },
+    'news': {
+        'date': 'published_at',
+        'counters': {'views': 1.0},
+        'events': [],
+    },
+}
+
+# Engagement older than this many half-lives (weight < 0.1%) is ignored
+HORIZON_HALF_LIVES = 10
+
+# Scores below this drop to zero, which takes the object out of later runs
+MIN_SCORE = 0.01
+
+
+def half_life():
+    """Half-life in seconds"""
+    return getattr(settings, 'TRENDING_HALF_LIFE_HOURS', 24) * 3600
+
+
+def widget_size():
+    return getattr(settings, 'TRENDING_WIDGET_SIZE', 5)
+
+
+def widget_timeout():
+    return getattr(settings, 'TRENDING_WIDGET_TIMEOUT', 900)
+
+
+def decay(seconds, half_life):
+    return 0.5 ** (max(seconds, 0) / half_life)
+
+
+def counter_expression(kind):
+    """Weighted counter total as a database expression"""
+    return reduce(add, (F(field) * weight for field, weight in TRENDING[kind]['counters'].items()))
+
+
+def counter_total(kind, row):
+    return sum(row[field] * weight for field, weight in TRENDING[kind]['counters'].items())
+
+
+def event_queryset(event, since):
+    model = apps.get_model(event['model'])
+    return model.objects.filter(**{f"{event['date']}__gte": since}, **event.get('filter', {}))
+
+
+def flag_recent_events(kind, cutoff):
+    """Flag objects with events since ``cutoff``, so candidates() can read the flag alone"""
+    model = get_model(kind)
+    for event in TRENDING[kind]['events']:
+        model.objects.filter(
+            pk__in=event_queryset(event, cutoff).values(f"{event['field']}_id"), trending_dirty=False,
+        ).update(trending_dirty=True)
+
+
+def candidates(kind):
+    """Objects whose score can change, read through the partial dirty index"""
+    return get_model(kind).objects.filter(trending_dirty=True)
+
+
+def recent_events(kind, pks, cutoff):
+    """{pk: [(date, weight), ...]} of events since ``cutoff`` for ``pks``"""
+    events = {}
+    for event in TRENDING[kind]['events']:
+        rows = (
+            event_queryset(event, cutoff)
+            .filter(**{f"{event['field']}_id__in": pks})
+            .values_list(f"{event['field']}_id", event['date'])
+        )
+        for pk, date in rows:
+            events.setdefault(pk, []).append((date, event['weight']))
+    return events
+
+
+def score(kind, row, events, now, cutoff, half_life):
+    """Return the new (trending_score, trending_base) of one object row"""
+    total = counter_total(kind, row)
+    updated_at = row['trending_updated_at']
+    if updated_at is None:
+        value = 0.0
+        since = row[TRENDING[kind]['date']]
+    else:
+        value = row['trending_score'] * decay((now - updated_at).total_seconds(), half_life)
+        since = updated_at
+
+    growth = total - row['trending_base']
+    if growth > 0 and since is not None and since >= cutoff:
+        value += growth * decay((now - since).total_seconds() / 2, half_life)
+
+    for date, weight in events:
+        if updated_at is None or date > updated_at:
+            value += weight * decay((now - date).total_seconds(), half_life)
+
+    return (value if value >= MIN_SCORE else 0.0), total
+
+
+def update(kind, batch_size=1000, now=None):
+    """
+    Recompute the trending scores of one content type in batches of
+    ``batch_size`` rows, each written in its own short transaction.
+    Returns the number of objects updated.
+    """
+    model = get_model(kind)
+    config = TRENDING[kind]
+    now = now or timezone.now()
+    seconds = half_life()
+    cutoff = now - timedelta(seconds=seconds * HORIZON_HALF_LIVES)
+    fields = ['pk', 'trending_score', 'trending_base', 'trending_updated_at', config['date'], *config['counters']]
+    flag_recent_events(kind, cutoff)
+    queryset = candidates(kind).order_by('pk').values(*fields)
+
+    updated = 0
+    last_pk = 0
+    while True:
+        rows = list(queryset.filter(pk__gt=last_pk)[:batch_size])
+        if not rows:
+            break
+        last_pk = rows[-1]['pk']
+        events = recent_events(kind, [row['pk'] for row in rows], cutoff)
+        objects = []
+        for row in rows:
+            value, base = score(kind, row, events.get(row['pk'], ()), now, cutoff, seconds)
+            objects.append(model(
+                pk=row['pk'], trending_score=value, trending_base=base, trending_updated_at=now,
+                trending_dirty=value > 0,
+            ))
+        with transaction.atomic():
+            model.objects.bulk_update(
+                objects, ['trending_score', 'trending_base', 'trending_updated_at', 'trending_dirty'],
+            )
+            # Counters that grew after the rows were read keep their flag
+            mark_dirty(model, [row['pk'] for row in rows], trending_base__lt=counter_expression(kind))
+        updated += len(objects)
+
+    if updated:
+        # bulk_update sends no signals
+        fragments.invalidate_model(model._meta.label)
+        page_cache.purge_list(model)
+    return updated
+
+
+def mark_dirty(model, pks, **filters):
+    for start in range(0, len(pks), 500):
+        model.objects.filter(pk__in=pks[start:start + 500], trending_dirty=False, **filters).update(trending_dirty=True)
+
+
+# Receivers
+
+def views_flushed(sender, hits, **kwargs):
+    """Flag objects whose view counts were flushed"""
+    if kind_for_model(sender) in TRENDING:
+        mark_dirty(sender, list(hits))
+
+
+def flag_full_save(sender, instance, update_fields=None, **kwargs):
+    """``pre_save``: a full save may change the counters (e.g. in the admin)"""
+    if update_fields is None:
+        instance.trending_dirty = True
+
+
+def counters_saved(sender, instance, created=False, update_fields=None, **kwargs):
+    """``post_save``: flag saves that name a counter in ``update_fields``"""
+    counters = TRENDING[kind_for_model(sender)]['counters']
+    if not created and update_fields is not None and set(counters) & set(update_fields):
+        mark_dirty(sender, [instance.pk])
+
+
+def top(kind, limit=None):
+    """The highest scoring published objects, read through the trending index"""
+    model = get_model(kind)
+    return list(
+        model.objects
+        .filter(trending_score__gt=0, **published_filter(kind))
+        .select_related(*SEARCHABLE[kind]['select_related'])
+        .order_by('-trending_score', f"-{TRENDING[kind]['date']}")[:limit or widget_size()]
+    )
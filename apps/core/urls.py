@@ -0,0 +1,18 @@
+"""
+URL Configuration for Core app
+"""
+
+from django.urls import path
+from . import views
+
+app_name = 'core'
+
+urlpatterns = [
+    # Site-wide search
+    path('search/', views.SearchView.as_view(), name='search'),
+    path('search/json/', views.SearchJSONView.as_view(), name='search_json'),
+    
+    # Tags
+    path('tags/', views.TagListView.as_view(), name='tag_list'),
+    path('tags/<str:slug>/', views.TagDetailView.as_view(), name='tag_detail'),
+]
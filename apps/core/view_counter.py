@@ -0,0 +1,217 @@
+"""
+Write-behind buffer for page view counts
+
+Detail views record hits here instead of saving the object on every request.
+Pending hits are accumulated in memory and flushed periodically as one
+``UPDATE ... SET views = views + n`` per group of objects, so the database
+write lock is taken once per flush interval instead of once per page view.
+
+The buffer is per process. It is flushed after requests once due, by a
+background thread while the process is idle, and at exit. A failed flush
+is logged and its hits are kept for the next one; hits that cannot be
+written at exit are saved to VIEW_COUNT_SPILL_DIR and written later by
+``manage.py flush_view_counts`` (run it from cron). Hits are only lost if
+the process is killed without a chance to exit.
+"""
+
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import defaultdict
+from pathlib import Path
+
+from django.apps import apps
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import F
+from django.dispatch import Signal
+
+logger = logging.getLogger(__name__)
+
+# Keep ``pk IN (...)`` below SQLite's bound parameter limit
+FLUSH_CHUNK_SIZE = 500
+
+# Sent after a successful flush, once per model, with ``hits={pk: n}``
+views_flushed = Signal()
+
+
+class ViewCountBuffer:
+    """
+    Thread-safe accumulator of pending view hits keyed by (model label, pk)
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = defaultdict(int)
+        self._last_flush = time.monotonic()
+        # Process that started the background flusher; forked workers start their own
+        self._flusher_pid = None
+
+    @property
+    def flush_interval(self):
+        return getattr(settings, 'VIEW_COUNT_FLUSH_INTERVAL', 30)
+
+    @property
+    def flush_threshold(self):
+        return getattr(settings, 'VIEW_COUNT_FLUSH_THRESHOLD', 500)
+
+    def record(self, instance, hits=1):
+        """Buffer ``hits`` views for a model instance"""
+        self.record_pk(instance._meta.label, instance.pk, hits)
+
+    def record_pk(self, label, pk, hits=1):
+        """Buffer ``hits`` views for the object ``pk`` of model ``label``"""
+        with self._lock:
+            self._pending[(label, pk)] += hits
+        if self._flusher_pid != os.getpid() and getattr(settings, 'VIEW_COUNT_FLUSH_THREAD', True):
+            self.start_flusher()
+
+    def pending(self, instance):
+        """Return the number of unflushed views for a model instance"""
+        with self._lock:
+            return self._pending.get((instance._meta.label, instance.pk), 0)
+
+    def apply_pending(self, instances):
+        """Add unflushed views to ``instance.views`` for display"""
+        with self._lock:
+            for instance in instances:
+                instance.views += self._pending.get((instance._meta.label, instance.pk), 0)
+
+    def is_due(self):
+        """Return True once the flush interval or hit threshold is reached"""
+        with self._lock:
+            if not self._pending:
+                return False
+            if len(self._pending) >= self.flush_threshold:
+                return True
+            return time.monotonic() - self._last_flush >= self.flush_interval
+
+    def flush(self):
+        """
+        Write all pending views to the database.
+        Objects with the same delta are updated together in one statement.
+        Returns the number of objects updated; on a database error the hits
+        are put back for the next flush and 0 is returned.
+        """
+        with self._lock:
+            pending, self._pending = self._pending, defaultdict(int)
+            self._last_flush = time.monotonic()
+
+        if not pending:
+            return 0
+        try:
+            self.write(pending)
+        except Exception:
+            logger.exception('View count flush failed; %d objects kept for the next flush', len(pending))
+            self.requeue(pending)
+            return 0
+        return len(pending)
+
+    def write(self, pending):
+        """Write {(label, pk): hits} to the database in one transaction"""
+        # Group by model, then by delta: {label: {delta: [pk, ...]}}
+        grouped = defaultdict(lambda: defaultdict(list))
+        for (label, pk), hits in pending.items():
+            grouped[label][hits].append(pk)
+
+        with transaction.atomic():
+            for label, by_delta in grouped.items():
+                model = apps.get_model(label)
+                for hits, pks in by_delta.items():
+                    for start in range(0, len(pks), FLUSH_CHUNK_SIZE):
+                        chunk = pks[start:start + FLUSH_CHUNK_SIZE]
+                        model.objects.filter(pk__in=chunk).update(views=F('views') + hits)
+                # Receivers update their denormalized totals in the same transaction
+                views_flushed.send(sender=model, hits={pk: hits for hits, pks in by_delta.items() for pk in pks})
+
+    def requeue(self, pending):
+        with self._lock:
+            for key, hits in pending.items():
+                self._pending[key] += hits
+
+    def start_flusher(self):
+        """
+        Start this process's background flusher and exit flush. Called on
+        the first recorded hit, so processes that never count views (and
+        the parent of forked workers) do not run one.
+        """
+        with self._lock:
+            if self._flusher_pid == os.getpid():
+                return
+            self._flusher_pid = os.getpid()
+        thread = threading.Thread(target=self.run_flusher, name='view-count-flusher', daemon=True)
+        thread.start()
+        atexit.register(self.flush_at_exit, os.getpid())
+
+    def run_flusher(self):
+        pid = os.getpid()
+        while self._flusher_pid == pid:
+            time.sleep(self.flush_interval)
+            if self.is_due():
+                self.flush()
+                # This thread's own connections
+                connections.close_all()
+
+    def flush_at_exit(self, pid):
+        # atexit handlers are inherited by forked children; each flushes its own buffer
+        if pid != os.getpid():
+            return
+        self.flush()
+        with self._lock:
+            pending, self._pending = self._pending, defaultdict(int)
+        if pending:
+            spill(pending)
+
+    def clear(self):
+        """Drop all pending views without writing them"""
+        with self._lock:
+            self._pending.clear()
+
+
+view_counts = ViewCountBuffer()
+
+
+def spill_dir():
+    return Path(getattr(settings, 'VIEW_COUNT_SPILL_DIR', settings.BASE_DIR / 'var' / 'view_counts'))
+
+
+def spill(pending):
+    """Save unwritten hits to a new file in the spill directory"""
+    directory = spill_dir()
+    try:
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / f'{uuid.uuid4().hex}.json'
+        temp = path.with_suffix('.tmp')
+        temp.write_text(json.dumps([[label, pk, hits] for (label, pk), hits in pending.items()]))
+        # Atomic, so flush_view_counts never reads a partial file
+        temp.rename(path)
+    except OSError:
+        logger.exception('Could not save %d unwritten view counts', len(pending))
+        return
+    logger.warning('Saved %d unwritten view counts to %s', len(pending), path)
+
+
+def flush_spilled():
+    """
+    Write hits saved by ``spill()``. Each file is deleted once written;
+    returns the number of files written.
+    """
+    written = 0
+    for path in sorted(spill_dir().glob('*.json')):
+        pending = defaultdict(int)
+        for label, pk, hits in json.loads(path.read_text()):
+            pending[(label, pk)] += hits
+        view_counts.write(pending)
+        path.unlink()
+        written += 1
+    return written
+
+
+def flush_if_due(**kwargs):
+    """``request_finished`` receiver that flushes the buffer when due"""
+    if view_counts.is_due():
+        view_counts.flush()
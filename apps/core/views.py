@@ -0,0 +1,131 @@
+"""
+Class-Based Views for Core app
+"""
+
+from django.core.paginator import Paginator
+from django.http import JsonResponse
+from django.views.generic import DetailView, ListView, TemplateView
+
+from .models import Tag
+from .routing import ReplicaReadMixin
+from .search import SEARCHABLE, SearchResults
+
+
+class SiteSearchMixin:
+    """
+    Run one merged search over prompts, blog posts and news
+    """
+    paginate_by = 20
+
+    def get_search_context(self):
+        query = self.request.GET.get('q', '').strip()
+        selected_type = self.request.GET.get('type', '')
+        kinds = [selected_type] if selected_type in SEARCHABLE else None
+
+        context = {
+            'query': query,
+            'selected_type': selected_type if kinds else '',
+            'facets': [],
+            'results': [],
+            'page_obj': None,
+        }
+        if not query:
+            return context
+
+        results = SearchResults(query, kinds)
+        page_obj = Paginator(results, self.paginate_by).get_page(self.request.GET.get('page'))
+
+        context['facets'] = [
+            {'type': kind, 'label': conf['label'], 'count': results.facets.get(kind, 0)}
+            for kind, conf in SEARCHABLE.items()
+        ]
+        context['results'] = page_obj.object_list
+        context['page_obj'] = page_obj
+        return context
+
+
+class SearchView(ReplicaReadMixin, SiteSearchMixin, TemplateView):
+    """
+    Site-wide search page
+    """
+    template_name = 'core/search.html'
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context.update(self.get_search_context())
+        return context
+
+
+class SearchJSONView(ReplicaReadMixin, SiteSearchMixin, TemplateView):
+    """
+    Site-wide search as JSON
+    """
+
+    def get(self, request, *args, **kwargs):
+        context = self.get_search_context()
+        page_obj = context['page_obj']
+        return JsonResponse({
+            'query': context['query'],
+            'count': page_obj.paginator.count if page_obj else 0,
+            'page': page_obj.number if page_obj else 1,
+            'num_pages': page_obj.paginator.num_pages if page_obj else 0,
+            'facets': context['facets'],
+            'results': [
+                {
+                    'type': result['type'],
+                    'id': result['object'].pk,
+                    'title': result['object'].title,
+                    'url': result['object'].get_absolute_url(),
+                    'snippet': str(result['snippet']),
+                    'score': result['score'],
+                }
+                for result in context['results']
+            ],
+        })
+
+
+class TagListView(ReplicaReadMixin, ListView):
+    """
+    Tag cloud of the most used tags
+    """
+    model = Tag
+    template_name = 'core/tag_list.html'
+    context_object_name = 'tags'
+    
+    def get_queryset(self):
+        # Top tags come straight off the usage_count index
+        top_tags = list(Tag.objects.filter(usage_count__gt=0).order_by('-usage_count')[:100])
+        return sorted(top_tags, key=lambda tag: tag.name.lower())
+    
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        
+        # Bootstrap font-size class relative to the most used tag
+        max_usage = max((tag.usage_count for tag in context['tags']), default=0)
+        for tag in context['tags']:
+            ratio = tag.usage_count / max_usage
+            tag.size_class = 'fs-4' if ratio > 0.66 else 'fs-5' if ratio > 0.33 else 'fs-6'
+        return context
+
+
+class TagDetailView(ReplicaReadMixin, DetailView):
+    """
+    Landing page listing published content with a tag
+    """
+    model = Tag
+    template_name = 'core/tag_detail.html'
+    context_object_name = 'tag'
+    slug_field = 'slug'
+    slug_url_kwarg = 'slug'
+    items_per_section = 12
+    
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        tag = self.object
+        limit = self.items_per_section
+        
+        context['prompts'] = tag.prompts.filter(is_published=True).select_related('author', 'category').order_by('-created_at')[:limit]
+        context['blog_posts'] = tag.blog_posts.filter(status='published').select_related('author', 'category').order_by('-published_at')[:limit]
+        context['news_articles'] = tag.news_articles.filter(is_published=True).select_related('category').order_by('-published_at')[:limit]
+        
+        return context
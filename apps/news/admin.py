@@ -4,6 +4,7 @@ Django Admin configuration for News app
 
 from django.contrib import admin
 from .models import NewsCategory, NewsArticle
+from apps.core.counting import CachedCountPaginator
 
 
 @admin.register(NewsCategory)
@@ -22,6 +23,8 @@ class NewsArticleAdmin(admin.ModelAdmin):
     prepopulated_fields = {'slug': ('title',)}
     list_editable = ['priority', 'is_featured', 'is_published']
     readonly_fields = ['views', 'published_at', 'updated_at']
+    paginator = CachedCountPaginator
+    show_full_result_count = False
     date_hierarchy = 'published_at'
     
     fieldsets = (
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class NewsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.news'
+
+    def ready(self):
+        # Register cached context fragments and their invalidation signals
+        from . import fragments  # noqa: F401
@@ -0,0 +1,40 @@
+"""
+Cached context fragments for News app
+"""
+
+from apps.core import fragments, trending
+from .models import NewsCategory, NewsArticle
+
+
+@fragments.register('news:categories', depends_on=['news.NewsCategory'])
+def categories():
+    return list(NewsCategory.objects.all())
+
+
+@fragments.register('news:breaking', depends_on=['news.NewsArticle'])
+def breaking_news():
+    return list(NewsArticle.objects.filter(
+        is_published=True,
+        priority='breaking'
+    ).select_related('category').order_by('-published_at')[:3])
+
+
+@fragments.register('news:featured', depends_on=['news.NewsArticle'])
+def featured_articles():
+    return list(NewsArticle.objects.filter(
+        is_published=True,
+        is_featured=True
+    ).select_related('category').order_by('-published_at')[:4])
+
+
+@fragments.register('news:latest', depends_on=['news.NewsArticle'])
+def latest_news():
+    return list(NewsArticle.objects.filter(
+        is_published=True
+    ).select_related('category').order_by('-published_at')[:5])
+
+
+@fragments.register('news:trending', depends_on=['news.NewsArticle'], timeout=trending.widget_timeout)
+def trending_articles():
+    # Invalidated by update_trending; expires in case that misses this process
+    return trending.top('news')
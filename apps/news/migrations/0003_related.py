@@ -0,0 +1,29 @@
+# Generated by Django 5.0 on 2026-10-18 20:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0002_tags'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RelatedNewsArticle',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField()),
+                ('source', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='related_links', to='news.newsarticle')),
+                ('target', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='news.newsarticle')),
+            ],
+            options={
+                'ordering': ['-score'],
+                'abstract': False,
+                'indexes': [models.Index(fields=['source', '-score'], name='news_relate_source__848140_idx')],
+                'unique_together': {('source', 'target')},
+            },
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.0 on 2026-10-18 21:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_tag'),
+        ('news', '0003_related'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='newsarticle',
+            name='trending_base',
+            field=models.FloatField(default=0, editable=False, help_text='Weighted engagement counters at the last trending update'),
+        ),
+        migrations.AddField(
+            model_name='newsarticle',
+            name='trending_score',
+            field=models.FloatField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='newsarticle',
+            name='trending_updated_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='newsarticle',
+            index=models.Index(condition=models.Q(('is_published', True)), fields=['-trending_score', '-published_at'], name='news_published_trending_idx'),
+        ),
+    ]
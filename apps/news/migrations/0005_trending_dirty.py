@@ -0,0 +1,23 @@
+# Generated by Django 5.0 on 2026-10-18 21:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_resync_tags'),
+        ('news', '0004_trending'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='newsarticle',
+            name='trending_dirty',
+            field=models.BooleanField(default=True, editable=False, help_text='Score may change at the next trending update'),
+        ),
+        migrations.AddIndex(
+            model_name='newsarticle',
+            index=models.Index(condition=models.Q(('trending_dirty', True)), fields=['id'], name='news_trending_dirty_idx'),
+        ),
+    ]
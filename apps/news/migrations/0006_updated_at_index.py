@@ -0,0 +1,18 @@
+# Generated by Django 5.0 on 2026-10-18 22:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_resync_tags'),
+        ('news', '0005_trending_dirty'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='newsarticle',
+            index=models.Index(fields=['updated_at'], name='news_newsar_updated_55004a_idx'),
+        ),
+    ]
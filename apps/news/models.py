@@ -7,6 +7,11 @@ from django.contrib.auth.models import User
 from django.urls import reverse
 from django.utils.text import slugify
 
+from apps.core.models import RelatedContent
+from apps.core.slugs import unique_slug
+from apps.core.tags import parse_tags
+from apps.core.view_counter import view_counts
+
 
 class NewsCategory(models.Model):
     """
@@ -55,10 +60,17 @@ class NewsArticle(models.Model):
     category = models.ForeignKey(NewsCategory, on_delete=models.SET_NULL, null=True, related_name='articles')
     priority = models.CharField(max_length=10, choices=PRIORITY_CHOICES, default='normal')
     tags = models.CharField(max_length=200, blank=True)
+    tag_set = models.ManyToManyField('core.Tag', through='NewsArticleTag', related_name='news_articles', blank=True)
     
     # Engagement
     views = models.PositiveIntegerField(default=0)
     
+    # Trending (maintained by apps.core.trending)
+    trending_score = models.FloatField(default=0, editable=False)
+    trending_base = models.FloatField(default=0, editable=False, help_text="Weighted engagement counters at the last trending update")
+    trending_updated_at = models.DateTimeField(null=True, blank=True, editable=False)
+    trending_dirty = models.BooleanField(default=True, editable=False, help_text="Score may change at the next trending update")
+    
     # Status
     is_published = models.BooleanField(default=True)
     is_featured = models.BooleanField(default=False, help_text="Show on homepage")
@@ -72,30 +84,68 @@ class NewsArticle(models.Model):
         indexes = [
             models.Index(fields=['-published_at']),
             models.Index(fields=['is_published', '-published_at']),
+            # Partial: SQLite cannot seek on a bare boolean leading column
+            models.Index(
+                fields=['-trending_score', '-published_at'],
+                condition=models.Q(is_published=True),
+                name='news_published_trending_idx',
+            ),
+            # The rows the next update_trending run reads
+            models.Index(fields=['id'], condition=models.Q(trending_dirty=True), name='news_trending_dirty_idx'),
+            # Incremental exports (updated_since) over all rows
+            models.Index(fields=['updated_at']),
         ]
     
     def save(self, *args, **kwargs):
         if not self.slug:
-            base_slug = slugify(self.title)
-            slug = base_slug
-            counter = 1
-            while NewsArticle.objects.filter(slug=slug).exists():
-                slug = f"{base_slug}-{counter}"
-                counter += 1
-            self.slug = slug
+            self.slug = unique_slug(NewsArticle, self.title)
         super().save(*args, **kwargs)
     
     def get_absolute_url(self):
         return reverse('news:detail', kwargs={'slug': self.slug})
     
     def increment_views(self):
-        self.views += 1
-        self.save(update_fields=['views'])
+        """
+        Buffer a view hit; it is written to the database by the next
+        view count flush. ``self.views`` is updated to include pending hits.
+        """
+        view_counts.record(self)
+        self.views += view_counts.pending(self)
     
     def get_tags_list(self):
-        if self.tags:
-            return [tag.strip() for tag in self.tags.split(',')]
-        return []
+        return parse_tags(self.tags)
+    
+    def __str__(self):
+        return self.title
+
+
+class NewsArticleTag(models.Model):
+    """
+    Links a news article to a shared Tag
+    """
+    article = models.ForeignKey(NewsArticle, on_delete=models.CASCADE, related_name='tag_links')
+    tag = models.ForeignKey('core.Tag', on_delete=models.CASCADE, related_name='article_links')
+    
+    class Meta:
+        # Leading tag column makes "items with tag X" an index range scan
+        unique_together = ('tag', 'article')
+    
+    def __str__(self):
+        return f"{self.article} - {self.tag}"
+
+
+class RelatedNewsArticle(RelatedContent):
+    """
+    Precomputed related news article; maintained by apps.core.related
+    """
+    source = models.ForeignKey(NewsArticle, on_delete=models.CASCADE, related_name='related_links')
+    target = models.ForeignKey(NewsArticle, on_delete=models.CASCADE, related_name='+')
+    
+    class Meta(RelatedContent.Meta):
+        unique_together = ('source', 'target')
+        indexes = [
+            models.Index(fields=['source', '-score']),
+        ]
     
     def __str__(self):
-        return self.title
\ No newline at end of file
+        return f"{self.source} -> {self.target}"
@@ -1,3 +1,16 @@
+"""
+Query budgets for the news views
+"""
+
 from django.test import TestCase
 
-# Create your tests here.
+from apps.core.testing import QueryBudgetMixin
+
+
+class NewsQueryBudgetTests(QueryBudgetMixin, TestCase):
+    budgets = {
+        'news:list': {'anonymous': 6, 'user': 8},
+        'news:list_fragment': {'anonymous': 5, 'user': 6},
+        'news:detail': {'args': lambda data: [data['article'].slug], 'anonymous': 3, 'user': 5},
+        'news:category': {'args': lambda data: [data['news_category'].slug], 'anonymous': 4, 'user': 6},
+    }
@@ -4,13 +4,17 @@ URL Configuration for News app
 
 from django.urls import path
 from . import views
+from apps.core.async_views import select_view
 
 app_name = 'news'
 
 urlpatterns = [
-    # News list and detail
-    path('', views.NewsListView.as_view(), name='list'),
-    path('article/<slug:slug>/', views.NewsDetailView.as_view(), name='detail'),
+    # News list and detail (sync or async variant, see ASYNC_READ_VIEWS)
+    path('', select_view('news:list', views.NewsListView, views.AsyncNewsListView), name='list'),
+    path('more/', select_view('news:list_fragment', views.NewsListView, views.AsyncNewsListView,
+                              response_format='fragment'), name='list_fragment'),
+    path('article/<slug:slug>/', select_view('news:detail', views.NewsDetailView, views.AsyncNewsDetailView),
+         name='detail'),
     
     # Category-specific news
     path('category/<slug:slug>/', views.CategoryNewsView.as_view(), name='category'),
@@ -2,71 +2,110 @@
 Class-Based Views for News app
 """
 
+from asgiref.sync import sync_to_async
+from django.shortcuts import get_object_or_404
 from django.views.generic import ListView, DetailView
-from django.db.models import Q
 
 from .models import NewsArticle, NewsCategory
+from apps.core import fragments, related, search
+from apps.core.async_views import AsyncDetailMixin, AsyncListMixin, gather_dict
+from apps.core.counting import CachedCountPaginator
+from apps.core.page_cache import AnonymousPageCacheMixin
+from apps.core.pagination import CursorPaginationMixin
+from apps.core.routing import ReplicaReadMixin
 
 
-class NewsListView(ListView):
+class NewsListView(ReplicaReadMixin, AnonymousPageCacheMixin, CursorPaginationMixin, ListView):
     """
     Display list of news articles
     """
     model = NewsArticle
     template_name = 'news/news_list.html'
+    fragment_template_name = 'news/includes/article_cards.html'
     context_object_name = 'articles'
     paginate_by = 12
+    paginator_class = CachedCountPaginator
+    cursor_ordering = ('-published_at', '-id')
+    
+    def can_use_cursor(self):
+        return not self.request.GET.get('search')
     
     def get_queryset(self):
         queryset = NewsArticle.objects.filter(is_published=True).select_related('category')
         
-        # Search
+        # Search (full-text index, ranked by relevance)
         search_query = self.request.GET.get('search', '')
+        self.search_snippets = {}
         if search_query:
-            queryset = queryset.filter(
-                Q(title__icontains=search_query) |
-                Q(subtitle__icontains=search_query) |
-                Q(summary__icontains=search_query) |
-                Q(content__icontains=search_query) |
-                Q(tags__icontains=search_query)
-            )
+            queryset, self.search_snippets = search.ranked_queryset(queryset, 'news', search_query)
         
         # Filter by category
         category_slug = self.request.GET.get('category', '')
         if category_slug:
             queryset = queryset.filter(category__slug=category_slug)
         
+        # Filter by tag (indexed join through the tag link table)
+        tag_slug = self.request.GET.get('tag', '')
+        if tag_slug:
+            queryset = queryset.filter(tag_set__slug=tag_slug)
+        
         # Filter by priority
         priority = self.request.GET.get('priority', '')
         if priority:
             queryset = queryset.filter(priority=priority)
         
+        if search_query:
+            return queryset
         return queryset.order_by('-published_at')
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['categories'] = NewsCategory.objects.all()
+        context['categories'] = fragments.get('news:categories')
         
         # Breaking news (top priority)
-        context['breaking_news'] = NewsArticle.objects.filter(
-            is_published=True,
-            priority='breaking'
-        ).order_by('-published_at')[:3]
+        context['breaking_news'] = fragments.get('news:breaking')
         
         # Featured articles
-        context['featured_articles'] = NewsArticle.objects.filter(
-            is_published=True,
-            is_featured=True
-        ).order_by('-published_at')[:4]
+        context['featured_articles'] = fragments.get('news:featured')
+        context['trending_articles'] = fragments.get('news:trending')
         
-        context['search_query'] = self.request.GET.get('search', '')
-        context['selected_category'] = self.request.GET.get('category', '')
-        context['selected_priority'] = self.request.GET.get('priority', '')
+        context.update(self.get_filter_context())
+        search.attach_snippets(context['articles'], self.search_snippets)
         
         return context
+    
+    def get_filter_context(self):
+        return {
+            'search_query': self.request.GET.get('search', ''),
+            'selected_category': self.request.GET.get('category', ''),
+            'selected_tag': self.request.GET.get('tag', ''),
+            'selected_priority': self.request.GET.get('priority', ''),
+        }
+
+
+class AsyncNewsListView(AsyncListMixin, NewsListView):
+    """
+    NewsListView on the async ORM; the page, its count and the sidebar
+    fragments are awaited without holding a worker thread
+    """
+    
+    async def aget_context_data(self):
+        queryset = await self.aget_queryset()
+        results = await gather_dict(
+            page=self.apaginate(queryset),
+            categories=fragments.aget('news:categories'),
+            breaking_news=fragments.aget('news:breaking'),
+            featured_articles=fragments.aget('news:featured'),
+            trending_articles=fragments.aget('news:trending'),
+        )
+        context = results.pop('page')
+        context.update(results)
+        context.update(self.get_filter_context())
+        await sync_to_async(search.attach_snippets)(context['articles'], self.search_snippets)
+        return context
 
 
-class NewsDetailView(DetailView):
+class NewsDetailView(ReplicaReadMixin, AnonymousPageCacheMixin, DetailView):
     """
     Display single news article
     """
@@ -87,21 +126,33 @@ class NewsDetailView(DetailView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         
-        # Related articles (same category)
-        context['related_articles'] = NewsArticle.objects.filter(
-            category=self.object.category,
-            is_published=True
-        ).exclude(id=self.object.id).order_by('-published_at')[:4]
+        # Precomputed related articles (shared tags, category, recency)
+        context['related_articles'] = related.get_related(self.object, limit=4)
         
         # Latest news
-        context['latest_news'] = NewsArticle.objects.filter(
-            is_published=True
-        ).order_by('-published_at')[:5]
+        context['latest_news'] = fragments.get('news:latest')
         
         return context
 
 
-class CategoryNewsView(ListView):
+class AsyncNewsDetailView(AsyncDetailMixin, NewsDetailView):
+    """
+    NewsDetailView on the async ORM; related and latest articles are
+    awaited without holding a worker thread
+    """
+    
+    async def aget_context_data(self):
+        self.object = await self.aget_object()
+        self.object.increment_views()
+        context = self.object_context()
+        context.update(await gather_dict(
+            related_articles=related.aget_related(self.object, limit=4),
+            latest_news=fragments.aget('news:latest'),
+        ))
+        return context
+
+
+class CategoryNewsView(ReplicaReadMixin, AnonymousPageCacheMixin, ListView):
     """
     Display news articles by category
     """
@@ -109,6 +160,7 @@ class CategoryNewsView(ListView):
     template_name = 'news/category_news.html'
     context_object_name = 'articles'
     paginate_by = 12
+    paginator_class = CachedCountPaginator
     
     def get_queryset(self):
         category_slug = self.kwargs.get('slug')
@@ -120,6 +172,6 @@ class CategoryNewsView(ListView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         category_slug = self.kwargs.get('slug')
-        context['category'] = NewsCategory.objects.get(slug=category_slug)
-        context['categories'] = NewsCategory.objects.all()
+        context['category'] = get_object_or_404(NewsCategory, slug=category_slug)
+        context['categories'] = fragments.get('news:categories')
         return context
\ No newline at end of file
@@ -4,6 +4,7 @@ Django Admin configuration for Prompts app
 
 from django.contrib import admin
 from .models import Category, Prompt, Bookmark
+from apps.core.counting import CachedCountPaginator
 
 
 @admin.register(Category)
@@ -21,6 +22,8 @@ class PromptAdmin(admin.ModelAdmin):
     prepopulated_fields = {'slug': ('title',)}
     list_editable = ['is_featured', 'is_published']
     readonly_fields = ['views', 'created_at', 'updated_at']
+    paginator = CachedCountPaginator
+    show_full_result_count = False
     
     fieldsets = (
         ('Basic Information', {
@@ -4,3 +4,15 @@ from django.apps import AppConfig
 class PromptsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.prompts'
+
+    def ready(self):
+        from django.db.models.signals import post_save, post_delete
+        from . import bookmarks
+        from .models import Bookmark
+
+        # Register cached context fragments and their invalidation signals
+        from . import fragments  # noqa: F401
+
+        # Cached per-user bookmark sets
+        post_save.connect(bookmarks.invalidate_on_change, sender=Bookmark, dispatch_uid='prompts.bookmarks.save')
+        post_delete.connect(bookmarks.invalidate_on_change, sender=Bookmark, dispatch_uid='prompts.bookmarks.delete')
@@ -0,0 +1,68 @@
+"""
+Per-user bookmarked prompt ids
+
+The set of prompt ids a user has bookmarked is cached, so list and detail
+pages can mark bookmarked prompts for a whole page without a query per
+card. Any Bookmark save or delete invalidates the user's set; as that only
+reaches other processes through a shared cache, sets also expire after
+BOOKMARK_IDS_TIMEOUT seconds. The set is for display only: writes decide
+from the Bookmark table.
+"""
+
+from functools import partial
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from .models import Bookmark
+
+
+def cache_key(user_id):
+    return f'bookmarks:ids:{user_id}'
+
+
+def timeout():
+    return getattr(settings, 'BOOKMARK_IDS_TIMEOUT', 300)
+
+
+def bookmarked_ids(user):
+    """Return the frozenset of prompt ids bookmarked by ``user``"""
+    if not user.is_authenticated:
+        return frozenset()
+    key = cache_key(user.pk)
+    ids = cache.get(key)
+    if ids is None:
+        ids = frozenset(Bookmark.objects.filter(user=user).values_list('prompt_id', flat=True))
+        cache.set(key, ids, timeout())
+    return ids
+
+
+async def abookmarked_ids(user):
+    """bookmarked_ids() for async views; ``user`` must already be loaded"""
+    if not user.is_authenticated:
+        return frozenset()
+    key = cache_key(user.pk)
+    ids = await cache.aget(key)
+    if ids is None:
+        ids = frozenset([pk async for pk in Bookmark.objects.filter(user=user).values_list('prompt_id', flat=True)])
+        await cache.aset(key, ids, timeout())
+    return ids
+
+
+def mark_bookmarked(user, prompts):
+    """Set ``is_bookmarked`` on each prompt"""
+    ids = bookmarked_ids(user)
+    for prompt in prompts:
+        prompt.is_bookmarked = prompt.pk in ids
+
+
+def invalidate(user_id):
+    cache.delete(cache_key(user_id))
+
+
+def invalidate_on_change(sender, instance, **kwargs):
+    """``post_save``/``post_delete`` receiver for Bookmark"""
+    invalidate(instance.user_id)
+    # Again after commit, in case a concurrent reader cached the old set meanwhile
+    transaction.on_commit(partial(invalidate, instance.user_id))
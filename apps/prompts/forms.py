@@ -4,6 +4,7 @@ Forms for Prompts app
 
 from django import forms
 from .models import Prompt, Category
+from apps.core.tags import parse_tags
 
 
 class PromptForm(forms.ModelForm):
@@ -54,10 +55,5 @@ class PromptForm(forms.ModelForm):
         }
     
     def clean_tags(self):
-        """Clean and format tags"""
-        tags = self.cleaned_data.get('tags', '')
-        if tags:
-            # Split by comma, strip whitespace, and rejoin
-            tag_list = [tag.strip() for tag in tags.split(',') if tag.strip()]
-            return ', '.join(tag_list)
-        return tags
\ No newline at end of file
+        """Clean and format tags; saved tags are mirrored into the Tag model"""
+        return ', '.join(parse_tags(self.cleaned_data.get('tags', '')))
\ No newline at end of file
@@ -0,0 +1,22 @@
+"""
+Cached context fragments for Prompts app
+"""
+
+from apps.core import fragments, trending
+from .models import Category, Prompt
+
+
+@fragments.register('prompts:categories', depends_on=['prompts.Category'])
+def categories():
+    return list(Category.objects.all())
+
+
+@fragments.register('prompts:featured', depends_on=['prompts.Prompt'])
+def featured_prompts():
+    return list(Prompt.objects.filter(is_featured=True, is_published=True).select_related('author', 'category')[:3])
+
+
+@fragments.register('prompts:trending', depends_on=['prompts.Prompt'], timeout=trending.widget_timeout)
+def trending_prompts():
+    # Invalidated by update_trending; expires in case that misses this process
+    return trending.top('prompt')
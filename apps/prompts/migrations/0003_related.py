@@ -0,0 +1,29 @@
+# Generated by Django 5.0 on 2026-10-18 20:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('prompts', '0002_tags'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RelatedPrompt',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField()),
+                ('source', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='related_links', to='prompts.prompt')),
+                ('target', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='prompts.prompt')),
+            ],
+            options={
+                'ordering': ['-score'],
+                'abstract': False,
+                'indexes': [models.Index(fields=['source', '-score'], name='prompts_rel_source__1ded32_idx')],
+                'unique_together': {('source', 'target')},
+            },
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.0 on 2026-10-18 21:27
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_tag'),
+        ('prompts', '0003_related'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='prompt',
+            name='trending_base',
+            field=models.FloatField(default=0, editable=False, help_text='Weighted engagement counters at the last trending update'),
+        ),
+        migrations.AddField(
+            model_name='prompt',
+            name='trending_score',
+            field=models.FloatField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='prompt',
+            name='trending_updated_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='prompt',
+            index=models.Index(condition=models.Q(('is_published', True)), fields=['-views'], name='prompt_published_views_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='prompt',
+            index=models.Index(condition=models.Q(('is_published', True)), fields=['-upvotes'], name='prompt_published_upvotes_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='prompt',
+            index=models.Index(condition=models.Q(('is_published', True)), fields=['-trending_score', '-created_at'], name='prompt_published_trending_idx'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.0 on 2026-10-18 21:49
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_resync_tags'),
+        ('prompts', '0004_trending'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='prompt',
+            name='trending_dirty',
+            field=models.BooleanField(default=True, editable=False, help_text='Score may change at the next trending update'),
+        ),
+        migrations.AddIndex(
+            model_name='prompt',
+            index=models.Index(condition=models.Q(('trending_dirty', True)), fields=['id'], name='prompt_trending_dirty_idx'),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.0 on 2026-10-18 22:09
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_resync_tags'),
+        ('prompts', '0005_trending_dirty'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='prompt',
+            index=models.Index(fields=['updated_at'], name='prompts_pro_updated_1875e9_idx'),
+        ),
+    ]
@@ -7,6 +7,11 @@ from django.contrib.auth.models import User
 from django.urls import reverse
 from django.utils.text import slugify
 
+from apps.core.models import RelatedContent
+from apps.core.slugs import unique_slug
+from apps.core.tags import parse_tags
+from apps.core.view_counter import view_counts
+
 
 class Category(models.Model):
     """
@@ -61,12 +66,19 @@ class Prompt(models.Model):
     difficulty = models.CharField(max_length=20, choices=DIFFICULTY_CHOICES, default='beginner')
     ai_model = models.CharField(max_length=50, choices=MODEL_CHOICES, default='chatgpt')
     tags = models.CharField(max_length=200, blank=True, help_text="Comma-separated tags")
+    tag_set = models.ManyToManyField('core.Tag', through='PromptTag', related_name='prompts', blank=True)
     
     # Author and engagement
     author = models.ForeignKey(User, on_delete=models.CASCADE, related_name='prompts')
     views = models.PositiveIntegerField(default=0)
     upvotes = models.PositiveIntegerField(default=0)
     
+    # Trending (maintained by apps.core.trending)
+    trending_score = models.FloatField(default=0, editable=False)
+    trending_base = models.FloatField(default=0, editable=False, help_text="Weighted engagement counters at the last trending update")
+    trending_updated_at = models.DateTimeField(null=True, blank=True, editable=False)
+    trending_dirty = models.BooleanField(default=True, editable=False, help_text="Score may change at the next trending update")
+    
     # Metadata
     is_featured = models.BooleanField(default=False)
     is_published = models.BooleanField(default=True)
@@ -78,32 +90,39 @@ class Prompt(models.Model):
         indexes = [
             models.Index(fields=['-created_at']),
             models.Index(fields=['is_published', '-created_at']),
+            # Partial: SQLite cannot seek on a bare boolean leading column
+            models.Index(fields=['-views'], condition=models.Q(is_published=True), name='prompt_published_views_idx'),
+            models.Index(fields=['-upvotes'], condition=models.Q(is_published=True), name='prompt_published_upvotes_idx'),
+            models.Index(
+                fields=['-trending_score', '-created_at'],
+                condition=models.Q(is_published=True),
+                name='prompt_published_trending_idx',
+            ),
+            # The rows the next update_trending run reads
+            models.Index(fields=['id'], condition=models.Q(trending_dirty=True), name='prompt_trending_dirty_idx'),
+            # Incremental exports (updated_since) over all rows
+            models.Index(fields=['updated_at']),
         ]
     
     def save(self, *args, **kwargs):
         if not self.slug:
-            base_slug = slugify(self.title)
-            slug = base_slug
-            counter = 1
-            while Prompt.objects.filter(slug=slug).exists():
-                slug = f"{base_slug}-{counter}"
-                counter += 1
-            self.slug = slug
+            self.slug = unique_slug(Prompt, self.title)
         super().save(*args, **kwargs)
     
     def get_absolute_url(self):
         return reverse('prompts:detail', kwargs={'slug': self.slug})
     
     def increment_views(self):
-        """Increment view count"""
-        self.views += 1
-        self.save(update_fields=['views'])
+        """
+        Buffer a view hit; it is written to the database by the next
+        view count flush. ``self.views`` is updated to include pending hits.
+        """
+        view_counts.record(self)
+        self.views += view_counts.pending(self)
     
     def get_tags_list(self):
         """Return tags as a list"""
-        if self.tags:
-            return [tag.strip() for tag in self.tags.split(',')]
-        return []
+        return parse_tags(self.tags)
     
     def __str__(self):
         return self.title
@@ -122,4 +141,36 @@ class Bookmark(models.Model):
         ordering = ['-created_at']
     
     def __str__(self):
-        return f"{self.user.username} - {self.prompt.title}"
\ No newline at end of file
+        return f"{self.user.username} - {self.prompt.title}"
+
+
+class PromptTag(models.Model):
+    """
+    Links a prompt to a shared Tag
+    """
+    prompt = models.ForeignKey(Prompt, on_delete=models.CASCADE, related_name='tag_links')
+    tag = models.ForeignKey('core.Tag', on_delete=models.CASCADE, related_name='prompt_links')
+    
+    class Meta:
+        # Leading tag column makes "items with tag X" an index range scan
+        unique_together = ('tag', 'prompt')
+    
+    def __str__(self):
+        return f"{self.prompt} - {self.tag}"
+
+
+class RelatedPrompt(RelatedContent):
+    """
+    Precomputed related prompt; maintained by apps.core.related
+    """
+    source = models.ForeignKey(Prompt, on_delete=models.CASCADE, related_name='related_links')
+    target = models.ForeignKey(Prompt, on_delete=models.CASCADE, related_name='+')
+    
+    class Meta(RelatedContent.Meta):
+        unique_together = ('source', 'target')
+        indexes = [
+            models.Index(fields=['source', '-score']),
+        ]
+    
+    def __str__(self):
+        return f"{self.source} -> {self.target}"
@@ -0,0 +1,193 @@
+"""
+Query budgets, search and bookmark changes for the prompts views
+"""
+
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from apps.core.search import get_search_backend, ranked_queryset
+from apps.core.testing import QueryBudgetMixin
+from apps.users.models import UserProfile
+from . import bookmarks
+from .models import Bookmark, Category, Prompt
+
+
+class PromptQueryBudgetTests(QueryBudgetMixin, TestCase):
+    budgets = {
+        'prompts:list': {'anonymous': 5, 'user': 8},
+        'prompts:list_fragment': {'anonymous': 4, 'user': 7},
+        'prompts:detail': {'args': lambda data: [data['prompt'].slug], 'anonymous': 3, 'user': 6},
+        'prompts:create': {'anonymous': 0, 'user': 3},
+        'prompts:my_prompts': {'anonymous': 0, 'user': 3},
+        'prompts:my_bookmarks': {'anonymous': 0, 'user': 4},
+        'prompts:bookmark_toggle': {
+            'method': 'post',
+            'args': lambda data: [data['prompt'].slug],
+            'anonymous': 0,
+            'user': 8,
+        },
+        'prompts:bookmark_bulk': {
+            'method': 'post',
+            'content_type': 'application/json',
+            'data': {'add': ['prompt-10', 'prompt-11'], 'remove': ['prompt-0']},
+            'anonymous': 0,
+            'user': 12,
+        },
+    }
+
+
+class PromptSearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        author = User.objects.create_user('author', 'author@example.com', 'search-pass-123')
+        writing = Category.objects.create(name='Writing')
+        coding = Category.objects.create(name='Coding')
+        # The coding prompts mention the term once, in the body only, so
+        # they rank below all 230 writing prompts
+        prompts = [
+            Prompt(title=f'Widget widget {i}', slug=f'widget-{i}', description='Widget ideas',
+                   prompt_text='Write about a widget', category=writing, author=author)
+            for i in range(230)
+        ]
+        prompts += [
+            Prompt(title=f'Coding helper {i}', slug=f'coding-helper-{i}',
+                   description='Explains code step by step, with tests and examples for every function',
+                   prompt_text='Review this code as a senior engineer would, then suggest a widget', category=coding,
+                   author=author)
+            for i in range(10)
+        ]
+        Prompt.objects.bulk_create(prompts)
+        get_search_backend().index_many('prompt', Prompt.objects.all())
+
+    def setUp(self):
+        cache.clear()
+
+    def search(self, **params):
+        return self.client.get(reverse('prompts:list'), {'search': 'widget', **params}).context
+
+    def test_filters_apply_to_every_match(self):
+        context = self.search(category='coding')
+        self.assertEqual(context['paginator'].count, 10)
+        self.assertEqual(len(context['prompts']), 10)
+
+    def test_pages_reach_past_200_matches(self):
+        context = self.search(page=20)
+        self.assertEqual(context['paginator'].count, 240)
+        titles = [prompt.title for prompt in context['prompts']]
+        self.assertEqual(len(titles), 12)
+        self.assertEqual(sum(title.startswith('Coding helper') for title in titles), 10)
+
+
+class BookmarkToggleTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('reader', 'reader@example.com', 'bookmark-pass-123')
+        cls.prompt = Prompt.objects.create(title='Keep me', description='d', prompt_text='t', author=cls.user)
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.user)
+
+    def toggle(self):
+        response = self.client.post(reverse('prompts:bookmark_toggle', args=[self.prompt.slug]),
+                                    headers={'X-Requested-With': 'XMLHttpRequest'})
+        return response.json()['is_bookmarked']
+
+    def is_bookmarked(self):
+        return Bookmark.objects.filter(user=self.user, prompt=self.prompt).exists()
+
+    def test_toggle_adds_then_removes(self):
+        self.assertTrue(self.toggle())
+        self.assertTrue(self.is_bookmarked())
+        self.assertFalse(self.toggle())
+        self.assertFalse(self.is_bookmarked())
+
+    def test_stale_cached_ids_do_not_decide_the_direction(self):
+        Bookmark.objects.create(user=self.user, prompt=self.prompt)
+        cache.set(bookmarks.cache_key(self.user.pk), frozenset())
+        self.assertFalse(self.toggle())
+        self.assertFalse(self.is_bookmarked())
+
+        cache.set(bookmarks.cache_key(self.user.pk), frozenset([self.prompt.pk]))
+        self.assertTrue(self.toggle())
+        self.assertTrue(self.is_bookmarked())
+
+
+class BookmarkBulkTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('reader', 'reader@example.com', 'bookmark-pass-123')
+        cls.prompts = [
+            Prompt.objects.create(title=f'Prompt {i}', description='d', prompt_text='t', author=cls.user)
+            for i in range(3)
+        ]
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.user)
+
+    def bulk(self, add=(), remove=()):
+        return self.client.post(reverse('prompts:bookmark_bulk'), {'add': list(add), 'remove': list(remove)},
+                                content_type='application/json').json()
+
+    def total_bookmarks(self):
+        return UserProfile.objects.get(user=self.user).total_bookmarks
+
+    def test_counts_follow_changes(self):
+        slugs = [prompt.slug for prompt in self.prompts]
+        self.assertEqual(self.bulk(add=slugs)['added'], 3)
+        self.assertEqual(self.total_bookmarks(), 3)
+        self.assertEqual(self.bulk(add=slugs[:1], remove=slugs[1:])['removed'], 2)
+        self.assertEqual(self.total_bookmarks(), 1)
+
+    def test_concurrent_insert_is_counted_once(self):
+        bulk_create = Bookmark.objects.bulk_create
+
+        def racing_bulk_create(objs, *args, **kwargs):
+            # Another request bookmarks the first prompt in the meantime
+            Bookmark.objects.create(user=self.user, prompt=self.prompts[0])
+            return bulk_create(objs, *args, **kwargs)
+
+        with mock.patch.object(Bookmark.objects, 'bulk_create', racing_bulk_create):
+            self.bulk(add=[prompt.slug for prompt in self.prompts])
+        self.assertEqual(Bookmark.objects.filter(user=self.user).count(), 3)
+        self.assertEqual(self.total_bookmarks(), 3)
+
+
+class SearchQueryPlanTests(TestCase):
+    """The search index, not the content table, drives ranked list queries"""
+
+    @classmethod
+    def setUpTestData(cls):
+        author = User.objects.create_user('author', 'author@example.com', 'search-pass-123')
+        prompts = [
+            Prompt(title=f"{'Widget' if i % 10 == 0 else 'Gadget'} {i}", slug=f'item-{i}', description='d',
+                   prompt_text='t', author=author)
+            for i in range(3000)
+        ]
+        Prompt.objects.bulk_create(prompts, batch_size=500)
+        get_search_backend().index_many('prompt', Prompt.objects.all())
+
+    def plan(self, queryset):
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+            return [row[-1] for row in cursor.fetchall()]
+
+    def test_page_and_count_follow_the_index(self):
+        queryset, snippets = ranked_queryset(Prompt.objects.filter(is_published=True), 'prompt', 'widget')
+        for plan in (self.plan(queryset[:12]), self.plan(queryset.values('pk'))):
+            self.assertIn('SEARCH prompts_prompt USING INTEGER PRIMARY KEY (rowid=?)', plan)
+            self.assertFalse([step for step in plan if step.startswith(('SCAN prompts_prompt', 'SCAN ranked'))], plan)
+
+        with CaptureQueriesContext(connection) as captured:
+            self.assertEqual(queryset.count(), 300)
+            page = list(queryset[:12])
+        self.assertEqual(len(captured), 2)
+        self.assertTrue(all(prompt.title.startswith('Widget') for prompt in page))
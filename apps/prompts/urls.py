@@ -4,13 +4,17 @@ URL Configuration for Prompts app
 
 from django.urls import path
 from . import views
+from apps.core.async_views import select_view
 
 app_name = 'prompts'
 
 urlpatterns = [
-    # Main prompt pages
-    path('', views.PromptListView.as_view(), name='list'),
-    path('prompt/<slug:slug>/', views.PromptDetailView.as_view(), name='detail'),
+    # Main prompt pages (list and detail: sync or async variant, see ASYNC_READ_VIEWS)
+    path('', select_view('prompts:list', views.PromptListView, views.AsyncPromptListView), name='list'),
+    path('more/', select_view('prompts:list_fragment', views.PromptListView, views.AsyncPromptListView,
+                              response_format='fragment'), name='list_fragment'),
+    path('prompt/<slug:slug>/', select_view('prompts:detail', views.PromptDetailView, views.AsyncPromptDetailView),
+         name='detail'),
     path('submit/', views.PromptCreateView.as_view(), name='create'),
     
     # User-specific pages
@@ -18,5 +22,6 @@ urlpatterns = [
     path('my-bookmarks/', views.MyBookmarksView.as_view(), name='my_bookmarks'),
     
     # AJAX actions
+    path('bookmarks/bulk/', views.BookmarkBulkView.as_view(), name='bookmark_bulk'),
     path('bookmark/<slug:slug>/', views.BookmarkToggleView.as_view(), name='bookmark_toggle'),
 ]
\ No newline at end of file
@@ -2,46 +2,67 @@
 Class-Based Views for Prompts app
 """
 
+import json
+
+from asgiref.sync import sync_to_async
 from django.views.generic import ListView, DetailView, CreateView
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib import messages
 from django.shortcuts import get_object_or_404, redirect
 from django.urls import reverse_lazy
-from django.db.models import Q
+from django.db import IntegrityError, transaction
 from django.http import JsonResponse
 from django.views import View
 
-from .models import Prompt, Category, Bookmark
+from .models import Prompt, Bookmark
+from . import bookmarks
 from .forms import PromptForm
+from apps.core import fragments, related, search
+from apps.core.async_views import AsyncDetailMixin, AsyncListMixin, gather_dict
+from apps.core.counting import CachedCountPaginator
+from apps.core.page_cache import AnonymousPageCacheMixin
+from apps.core.pagination import CursorPaginationMixin
+from apps.core.routing import ReplicaReadMixin
+from apps.core.view_counter import view_counts
+from apps.users import stats as profile_stats
 
 
-class PromptListView(ListView):
+class PromptListView(ReplicaReadMixin, AnonymousPageCacheMixin, CursorPaginationMixin, ListView):
     """
     Display list of all prompts with search and filter
     Anyone can view (no login required)
     """
     model = Prompt
     template_name = 'prompts/prompt_list.html'
+    fragment_template_name = 'prompts/includes/prompt_cards.html'
     context_object_name = 'prompts'
     paginate_by = 12
+    paginator_class = CachedCountPaginator
+    cursor_ordering = ('-created_at', '-id')
+    
+    def can_use_cursor(self):
+        # Keyset pages follow the default newest-first ordering only
+        return not self.request.GET.get('search') and self.request.GET.get('sort', '-created_at') == '-created_at'
     
     def get_queryset(self):
         queryset = Prompt.objects.filter(is_published=True).select_related('author', 'category')
         
-        # Search functionality
+        # Search functionality (full-text index, ranked by relevance)
         search_query = self.request.GET.get('search', '')
+        self.search_snippets = {}
         if search_query:
-            queryset = queryset.filter(
-                Q(title__icontains=search_query) |
-                Q(description__icontains=search_query) |
-                Q(tags__icontains=search_query)
-            )
+            queryset, self.search_snippets = search.ranked_queryset(queryset, 'prompt', search_query)
         
         # Filter by category
         category_slug = self.request.GET.get('category', '')
         if category_slug:
             queryset = queryset.filter(category__slug=category_slug)
         
+        # Filter by tag (indexed join through the tag link table)
+        tag_slug = self.request.GET.get('tag', '')
+        if tag_slug:
+            queryset = queryset.filter(tag_set__slug=tag_slug)
+        
         # Filter by difficulty
         difficulty = self.request.GET.get('difficulty', '')
         if difficulty:
@@ -52,29 +73,72 @@ class PromptListView(ListView):
         if ai_model:
             queryset = queryset.filter(ai_model=ai_model)
         
-        # Sorting
-        sort_by = self.request.GET.get('sort', '-created_at')
+        # Sorting (search results keep relevance order unless a sort is chosen)
+        sort_by = self.request.GET.get('sort', '' if search_query else '-created_at')
         if sort_by in ['-created_at', '-views', '-upvotes']:
             queryset = queryset.order_by(sort_by)
+        elif sort_by == 'trending':
+            # Materialized time-decayed score (apps.core.trending), newest first on ties
+            queryset = queryset.order_by('-trending_score', '-created_at')
         
         return queryset
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['categories'] = Category.objects.all()
-        context['search_query'] = self.request.GET.get('search', '')
-        context['selected_category'] = self.request.GET.get('category', '')
-        context['selected_difficulty'] = self.request.GET.get('difficulty', '')
-        context['selected_model'] = self.request.GET.get('model', '')
-        context['sort_by'] = self.request.GET.get('sort', '-created_at')
+        context['categories'] = fragments.get('prompts:categories')
+        context.update(self.get_filter_context())
+        
+        # Include buffered views that have not been flushed yet
+        view_counts.apply_pending(context['prompts'])
+        search.attach_snippets(context['prompts'], self.search_snippets)
+        bookmarks.mark_bookmarked(self.request.user, context['prompts'])
         
         # Get featured prompts for homepage
-        context['featured_prompts'] = Prompt.objects.filter(is_featured=True, is_published=True)[:3]
+        context['featured_prompts'] = fragments.get('prompts:featured')
+        context['trending_prompts'] = fragments.get('prompts:trending')
         
         return context
+    
+    def get_filter_context(self):
+        return {
+            'search_query': self.request.GET.get('search', ''),
+            'selected_category': self.request.GET.get('category', ''),
+            'selected_tag': self.request.GET.get('tag', ''),
+            'selected_difficulty': self.request.GET.get('difficulty', ''),
+            'selected_model': self.request.GET.get('model', ''),
+            'sort_by': self.request.GET.get('sort', '-created_at'),
+        }
 
 
-class PromptDetailView(DetailView):
+class AsyncPromptListView(AsyncListMixin, PromptListView):
+    """
+    PromptListView on the async ORM; the page, its count, the sidebar
+    fragments and the user's bookmarks are awaited without holding a
+    worker thread
+    """
+    
+    async def aget_context_data(self):
+        queryset = await self.aget_queryset()
+        results = await gather_dict(
+            page=self.apaginate(queryset),
+            categories=fragments.aget('prompts:categories'),
+            featured_prompts=fragments.aget('prompts:featured'),
+            trending_prompts=fragments.aget('prompts:trending'),
+            bookmarked=bookmarks.abookmarked_ids(self.request.user),
+        )
+        context = results.pop('page')
+        bookmarked = results.pop('bookmarked')
+        context.update(results)
+        context.update(self.get_filter_context())
+        
+        view_counts.apply_pending(context['prompts'])
+        await sync_to_async(search.attach_snippets)(context['prompts'], self.search_snippets)
+        for prompt in context['prompts']:
+            prompt.is_bookmarked = prompt.pk in bookmarked
+        return context
+
+
+class PromptDetailView(ReplicaReadMixin, AnonymousPageCacheMixin, DetailView):
     """
     Display single prompt with full details
     Increments view count on each visit
@@ -86,35 +150,45 @@ class PromptDetailView(DetailView):
     slug_url_kwarg = 'slug'
     
     def get_queryset(self):
-        return Prompt.objects.filter(is_published=True).select_related('author', 'category')
+        return Prompt.objects.filter(is_published=True).select_related('author__profile', 'category')
     
     def get_object(self):
         obj = super().get_object()
-        # Increment view count (can be optimized with F() to avoid race conditions)
+        # Buffered view count; flushed in batches outside the request
         obj.increment_views()
         return obj
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         
-        # Check if user has bookmarked this prompt
-        if self.request.user.is_authenticated:
-            context['is_bookmarked'] = Bookmark.objects.filter(
-                user=self.request.user,
-                prompt=self.object
-            ).exists()
-        else:
-            context['is_bookmarked'] = False
+        # Check if user has bookmarked this prompt (cached id set)
+        context['is_bookmarked'] = self.object.pk in bookmarks.bookmarked_ids(self.request.user)
         
-        # Get related prompts (same category)
-        context['related_prompts'] = Prompt.objects.filter(
-            category=self.object.category,
-            is_published=True
-        ).exclude(id=self.object.id)[:4]
+        # Precomputed related prompts (shared tags, category, recency)
+        context['related_prompts'] = related.get_related(self.object, limit=4)
         
         return context
 
 
+class AsyncPromptDetailView(AsyncDetailMixin, PromptDetailView):
+    """
+    PromptDetailView on the async ORM; bookmark state and related prompts
+    are awaited without holding a worker thread
+    """
+    
+    async def aget_context_data(self):
+        self.object = await self.aget_object()
+        self.object.increment_views()
+        context = self.object_context()
+        results = await gather_dict(
+            bookmarked=bookmarks.abookmarked_ids(self.request.user),
+            related_prompts=related.aget_related(self.object, limit=4),
+        )
+        context['is_bookmarked'] = self.object.pk in results['bookmarked']
+        context['related_prompts'] = results['related_prompts']
+        return context
+
+
 class PromptCreateView(LoginRequiredMixin, CreateView):
     """
     Allow logged-in users to submit new prompts
@@ -144,7 +218,7 @@ class MyPromptsView(LoginRequiredMixin, ListView):
     paginate_by = 12
     
     def get_queryset(self):
-        return Prompt.objects.filter(author=self.request.user).order_by('-created_at')
+        return Prompt.objects.filter(author=self.request.user).select_related('category').order_by('-created_at')
 
 
 class MyBookmarksView(LoginRequiredMixin, ListView):
@@ -157,7 +231,7 @@ class MyBookmarksView(LoginRequiredMixin, ListView):
     paginate_by = 12
     
     def get_queryset(self):
-        return Bookmark.objects.filter(user=self.request.user).select_related('prompt', 'prompt__author')
+        return Bookmark.objects.filter(user=self.request.user).select_related('prompt__author', 'prompt__category')
 
 
 class BookmarkToggleView(LoginRequiredMixin, View):
@@ -165,15 +239,20 @@ class BookmarkToggleView(LoginRequiredMixin, View):
     AJAX view to toggle bookmark status
     """
     def post(self, request, slug):
-        prompt = get_object_or_404(Prompt, slug=slug, is_published=True)
-        bookmark, created = Bookmark.objects.get_or_create(user=request.user, prompt=prompt)
+        prompt_id = get_object_or_404(Prompt.objects.values_list('pk', flat=True), slug=slug, is_published=True)
         
-        if not created:
-            # Bookmark already exists, so remove it
-            bookmark.delete()
+        # The database decides the direction, so a stale cached id set cannot flip it
+        deleted, _ = Bookmark.objects.filter(user=request.user, prompt_id=prompt_id).delete()
+        if deleted:
             is_bookmarked = False
             message = 'Bookmark removed'
         else:
+            try:
+                with transaction.atomic():
+                    Bookmark.objects.create(user=request.user, prompt_id=prompt_id)
+            except IntegrityError:
+                # Added concurrently (e.g. another tab); it is bookmarked either way
+                bookmarks.invalidate(request.user.pk)
             is_bookmarked = True
             message = 'Bookmark added'
         
@@ -187,4 +266,57 @@ class BookmarkToggleView(LoginRequiredMixin, View):
         
         # Fallback for non-AJAX requests
         messages.success(request, message)
-        return redirect('prompts:detail', slug=slug)
\ No newline at end of file
+        return redirect('prompts:detail', slug=slug)
+
+
+class BookmarkBulkView(LoginRequiredMixin, View):
+    """
+    AJAX view applying many bookmark changes in one transaction.
+    Expects JSON ``{"add": [slug, ...], "remove": [slug, ...]}``.
+    """
+    max_items = 200
+    
+    def post(self, request):
+        try:
+            data = json.loads(request.body)
+            add = set(data.get('add', []))
+            remove = set(data.get('remove', []))
+        except (ValueError, AttributeError, TypeError):
+            return JsonResponse({'success': False, 'message': 'Invalid JSON body'}, status=400)
+        if not all(isinstance(slug, str) for slug in add | remove):
+            return JsonResponse({'success': False, 'message': 'Slugs must be strings'}, status=400)
+        if len(add) + len(remove) > self.max_items:
+            return JsonResponse({'success': False, 'message': f'At most {self.max_items} changes per request'}, status=400)
+        
+        user = request.user
+        with transaction.atomic():
+            ids = dict(Prompt.objects.filter(slug__in=add | remove).values_list('slug', 'pk'))
+            published = set(Prompt.objects.filter(slug__in=add, is_published=True).values_list('pk', flat=True))
+            existing = set(Bookmark.objects.filter(user=user, prompt_id__in=ids.values()).values_list('prompt_id', flat=True))
+            
+            to_add = ({ids[slug] for slug in add - remove if slug in ids} & published) - existing
+            to_remove = {ids[slug] for slug in remove if slug in ids} & existing
+            
+            if to_add:
+                try:
+                    with transaction.atomic():
+                        Bookmark.objects.bulk_create([Bookmark(user=user, prompt_id=pk) for pk in to_add])
+                except IntegrityError:
+                    # A concurrent request added some of them; create the rest one by
+                    # one, and let their post_save signals count them
+                    for pk in to_add:
+                        Bookmark.objects.get_or_create(user=user, prompt_id=pk)
+                else:
+                    # bulk_create sends no signals
+                    profile_stats.apply_deltas({user.pk: {'total_bookmarks': len(to_add)}})
+            if to_remove:
+                Bookmark.objects.filter(user=user, prompt_id__in=to_remove).delete()
+        bookmarks.invalidate(user.pk)
+        
+        bookmarked = (existing | to_add) - to_remove
+        return JsonResponse({
+            'success': True,
+            'added': len(to_add),
+            'removed': len(to_remove),
+            'bookmarked': sorted(slug for slug, pk in ids.items() if pk in bookmarked),
+        })
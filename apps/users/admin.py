@@ -12,8 +12,8 @@ class UserProfileInline(admin.StackedInline):
     model = UserProfile
     can_delete = False
     verbose_name_plural = 'Profile'
-    fields = ['bio', 'avatar', 'website', 'location', 'theme', 'language', 'total_prompts', 'total_bookmarks']
-    readonly_fields = ['total_prompts', 'total_bookmarks']
+    fields = ['bio', 'avatar', 'website', 'location', 'theme', 'language', *UserProfile.COUNTER_FIELDS]
+    readonly_fields = UserProfile.COUNTER_FIELDS
 
 
 # Unregister the default User admin
@@ -4,3 +4,18 @@ from django.apps import AppConfig
 class UsersConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.users'
+
+    def ready(self):
+        from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+        from apps.core.view_counter import views_flushed
+        from . import stats
+
+        # Keep the denormalized profile counters current
+        for label in stats.TRACKED:
+            uid = f'users.stats.{label}'
+            pre_save.connect(stats.remember_state, sender=label, dispatch_uid=f'{uid}.pre_save')
+            post_save.connect(stats.content_saved, sender=label, dispatch_uid=f'{uid}.save')
+            pre_delete.connect(stats.content_deleted, sender=label, dispatch_uid=f'{uid}.delete')
+        post_save.connect(stats.bookmark_saved, sender='prompts.Bookmark', dispatch_uid='users.stats.bookmark.save')
+        post_delete.connect(stats.bookmark_deleted, sender='prompts.Bookmark', dispatch_uid='users.stats.bookmark.delete')
+        views_flushed.connect(stats.views_flushed, dispatch_uid='users.stats.views_flushed')
@@ -0,0 +1,24 @@
+"""
+Recompute the denormalized UserProfile counters from the content tables
+"""
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.users.stats import recount
+
+
+class Command(BaseCommand):
+    help = 'Recount published prompts, blog posts, bookmarks and views for user profiles'
+
+    def add_arguments(self, parser):
+        parser.add_argument('usernames', nargs='*', help='Only recount these users')
+
+    def handle(self, *args, **options):
+        user_ids = None
+        if options['usernames']:
+            user_ids = list(User.objects.filter(username__in=options['usernames']).values_list('pk', flat=True))
+            if len(user_ids) != len(set(options['usernames'])):
+                raise CommandError('Unknown username given')
+        total = recount(user_ids)
+        self.stdout.write(self.style.SUCCESS(f'Recounted {total} profiles'))
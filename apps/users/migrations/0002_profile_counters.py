@@ -0,0 +1,51 @@
+# Generated by Django 5.0 on 2026-10-18 20:50
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def backfill_counters(apps, schema_editor):
+    """Compute the counters once; signals keep them current afterwards"""
+    UserProfile = apps.get_model('users', 'UserProfile')
+    Prompt = apps.get_model('prompts', 'Prompt')
+    BlogPost = apps.get_model('blog', 'BlogPost')
+    Bookmark = apps.get_model('prompts', 'Bookmark')
+
+    values = {}
+    for row in Prompt.objects.filter(is_published=True).values('author_id').annotate(count=Count('id'), views=Sum('views')).order_by():
+        values.setdefault(row['author_id'], {}).update(total_prompts=row['count'], total_views=row['views'] or 0)
+    for row in BlogPost.objects.filter(status='published').values('author_id').annotate(count=Count('id')).order_by():
+        values.setdefault(row['author_id'], {})['total_blog_posts'] = row['count']
+    for row in Bookmark.objects.values('user_id').annotate(count=Count('id')).order_by():
+        values.setdefault(row['user_id'], {})['total_bookmarks'] = row['count']
+
+    for user_id, fields in values.items():
+        UserProfile.objects.filter(user_id=user_id).update(**fields)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0001_initial'),
+        ('prompts', '0001_initial'),
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userprofile',
+            name='total_blog_posts',
+            field=models.PositiveIntegerField(default=0, help_text='Published blog posts'),
+        ),
+        migrations.AddField(
+            model_name='userprofile',
+            name='total_views',
+            field=models.PositiveIntegerField(default=0, help_text='Views of published prompts'),
+        ),
+        migrations.AlterField(
+            model_name='userprofile',
+            name='total_prompts',
+            field=models.PositiveIntegerField(default=0, help_text='Published prompts'),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
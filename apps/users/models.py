@@ -22,22 +22,35 @@ class UserProfile(models.Model):
     theme = models.CharField(max_length=10, choices=[('light', 'Light'), ('dark', 'Dark')], default='light')
     language = models.CharField(max_length=5, choices=[('en', 'English'), ('ar', 'Arabic')], default='en')
     
-    # Stats
-    total_prompts = models.PositiveIntegerField(default=0)
+    # Stats (maintained by apps.users.stats; never written by save())
+    total_prompts = models.PositiveIntegerField(default=0, help_text="Published prompts")
     total_bookmarks = models.PositiveIntegerField(default=0)
+    total_views = models.PositiveIntegerField(default=0, help_text="Views of published prompts")
+    total_blog_posts = models.PositiveIntegerField(default=0, help_text="Published blog posts")
     
     # Timestamps
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    COUNTER_FIELDS = ['total_prompts', 'total_bookmarks', 'total_views', 'total_blog_posts']
+    
     def __str__(self):
         return f"{self.user.username}'s profile"
     
+    def save(self, *args, **kwargs):
+        # Counters only change through F() deltas; never write back a stale copy
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.COUNTER_FIELDS
+            ]
+        super().save(*args, **kwargs)
+    
     def update_stats(self):
-        """Update user statistics"""
-        self.total_prompts = self.user.prompts.filter(is_published=True).count()
-        self.total_bookmarks = self.user.bookmarks.count()
-        self.save(update_fields=['total_prompts', 'total_bookmarks'])
+        """Recount user statistics from the content tables"""
+        from .stats import recount
+        recount([self.user_id])
+        self.refresh_from_db(fields=self.COUNTER_FIELDS)
 
 
 # Signal to automatically create user profile when user is created
@@ -0,0 +1,168 @@
+"""
+Denormalized UserProfile counters
+
+``total_prompts``, ``total_views`` (published prompts), ``total_blog_posts``
+(published posts) and ``total_bookmarks`` are kept current with atomic
+``F()`` deltas from content and bookmark signals and from view count
+flushes, so profile pages never aggregate. ``recount()`` rebuilds them from
+the content tables, e.g. after a bulk import.
+"""
+
+from collections import defaultdict
+
+from django.apps import apps
+from django.db.models import Count, F, Sum, Value
+from django.db.models.functions import Greatest
+
+from .models import UserProfile
+
+
+# Content models counted on the author's profile
+TRACKED = {
+    'prompts.Prompt': {'published': ('is_published', True), 'count': 'total_prompts', 'views': 'total_views'},
+    'blog.BlogPost': {'published': ('status', 'published'), 'count': 'total_blog_posts'},
+}
+
+
+def apply_deltas(deltas):
+    """
+    Apply {user_id: {field: delta}}; users with identical deltas share one
+    UPDATE. Counters are clamped at zero.
+    """
+    by_change = defaultdict(list)
+    for user_id, changes in deltas.items():
+        changes = tuple(sorted((field, delta) for field, delta in changes.items() if delta))
+        if changes:
+            by_change[changes].append(user_id)
+
+    for changes, user_ids in by_change.items():
+        UserProfile.objects.filter(user_id__in=user_ids).update(**{
+            field: Greatest(F(field) + delta, Value(0)) for field, delta in changes
+        })
+
+
+def contribution(conf, state):
+    """Return the counter values one content row adds to its author"""
+    if state is None:
+        return {}
+    field, value = conf['published']
+    if state[field] != value:
+        return {}
+    values = {conf['count']: 1}
+    if 'views' in conf:
+        values[conf['views']] = state['views']
+    return values
+
+
+def tracked_fields(conf):
+    fields = ['author_id', conf['published'][0]]
+    if 'views' in conf:
+        fields.append('views')
+    return fields
+
+
+def current_state(conf, instance):
+    return {field: getattr(instance, field) for field in tracked_fields(conf)}
+
+
+def diff(conf, old, new):
+    """Return {user_id: {field: delta}} for a row changing from ``old`` to ``new``"""
+    deltas = defaultdict(lambda: defaultdict(int))
+    if old is not None:
+        for field, value in contribution(conf, old).items():
+            deltas[old['author_id']][field] -= value
+    if new is not None:
+        for field, value in contribution(conf, new).items():
+            deltas[new['author_id']][field] += value
+    return deltas
+
+
+# Receivers
+
+def remember_state(sender, instance, raw=False, **kwargs):
+    """``pre_save``: load the stored row so ``post_save`` can compute deltas"""
+    conf = TRACKED[sender._meta.label]
+    instance._profile_stats_state = None
+    if not raw and not instance._state.adding and instance.pk is not None:
+        instance._profile_stats_state = (
+            sender._default_manager.filter(pk=instance.pk).values(*tracked_fields(conf)).first()
+        )
+
+
+def content_saved(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    conf = TRACKED[sender._meta.label]
+    old = getattr(instance, '_profile_stats_state', None)
+    apply_deltas(diff(conf, old, current_state(conf, instance)))
+    instance._profile_stats_state = None
+
+
+def content_deleted(sender, instance, **kwargs):
+    """``pre_delete``: subtract the stored row (the instance may be stale)"""
+    conf = TRACKED[sender._meta.label]
+    stored = sender._default_manager.filter(pk=instance.pk).values(*tracked_fields(conf)).first()
+    apply_deltas(diff(conf, stored, None))
+
+
+def bookmark_saved(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        apply_deltas({instance.user_id: {'total_bookmarks': 1}})
+
+
+def bookmark_deleted(sender, instance, **kwargs):
+    apply_deltas({instance.user_id: {'total_bookmarks': -1}})
+
+
+def views_flushed(sender, hits, **kwargs):
+    """Add flushed prompt views to the authors' ``total_views``"""
+    conf = TRACKED.get(sender._meta.label)
+    if conf is None or 'views' not in conf:
+        return
+    field, value = conf['published']
+    deltas = defaultdict(lambda: defaultdict(int))
+    pks = list(hits)
+    for start in range(0, len(pks), 500):
+        rows = sender._default_manager.filter(pk__in=pks[start:start + 500], **{field: value})
+        for pk, author_id in rows.values_list('pk', 'author_id'):
+            deltas[author_id][conf['views']] += hits[pk]
+    apply_deltas(deltas)
+
+
+# Rebuild
+
+def recount(user_ids=None):
+    """Recompute all counters from the content tables; returns profiles updated"""
+    profiles = UserProfile.objects.all()
+    if user_ids is not None:
+        profiles = profiles.filter(user_id__in=list(user_ids))
+
+    values = defaultdict(dict)
+    for label, conf in TRACKED.items():
+        model = apps.get_model(label)
+        field, value = conf['published']
+        rows = model._default_manager.filter(**{field: value})
+        if user_ids is not None:
+            rows = rows.filter(author_id__in=list(user_ids))
+        aggregates = {'count': Count('pk')}
+        if 'views' in conf:
+            aggregates['views'] = Sum('views')
+        for row in rows.values('author_id').annotate(**aggregates).order_by():
+            values[row['author_id']][conf['count']] = row['count']
+            if 'views' in conf:
+                values[row['author_id']][conf['views']] = row['views'] or 0
+
+    bookmarks = apps.get_model('prompts.Bookmark')._default_manager.all()
+    if user_ids is not None:
+        bookmarks = bookmarks.filter(user_id__in=list(user_ids))
+    for row in bookmarks.values('user_id').annotate(count=Count('pk')).order_by():
+        values[row['user_id']]['total_bookmarks'] = row['count']
+
+    updated = []
+    for profile in profiles.iterator():
+        for field in UserProfile.COUNTER_FIELDS:
+            setattr(profile, field, values[profile.user_id].get(field, 0))
+        updated.append(profile)
+    UserProfile.objects.bulk_update(updated, UserProfile.COUNTER_FIELDS, batch_size=500)
+    return len(updated)
+
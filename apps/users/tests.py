@@ -0,0 +1,17 @@
+"""
+Query budgets for the users views
+"""
+
+from django.test import TestCase
+
+from apps.core.testing import QueryBudgetMixin
+
+
+class UserQueryBudgetTests(QueryBudgetMixin, TestCase):
+    budgets = {
+        'users:register': {'anonymous': 0, 'user': 2},
+        'users:login': {'anonymous': 0, 'user': 2},
+        'users:logout': {'method': 'post', 'anonymous': 0, 'user': 4},
+        'users:profile': {'args': lambda data: [data['author'].username], 'anonymous': 0, 'user': 4},
+        'users:profile_edit': {'anonymous': 0, 'user': 3},
+    }
@@ -14,6 +14,6 @@ urlpatterns = [
     path('logout/', views.UserLogoutView.as_view(), name='logout'),
     
     # Profile
-    path('profile/<str:username>/', views.UserProfileView.as_view(), name='profile'),
     path('profile/edit/', views.UserProfileUpdateView.as_view(), name='profile_edit'),
+    path('profile/<str:username>/', views.UserProfileView.as_view(), name='profile'),
 ]
\ No newline at end of file
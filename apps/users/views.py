@@ -72,17 +72,22 @@ class UserProfileView(LoginRequiredMixin, DetailView):
     slug_field = 'username'
     slug_url_kwarg = 'username'
     
+    def get_queryset(self):
+        return User.objects.select_related('profile')
+    
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         user = self.object
+        profile = user.profile
         
         # Get user's recent prompts
-        context['recent_prompts'] = user.prompts.filter(is_published=True).order_by('-created_at')[:6]
+        context['recent_prompts'] = user.prompts.filter(is_published=True).select_related('category').order_by('-created_at')[:6]
         
-        # Get stats
-        context['total_prompts'] = user.prompts.filter(is_published=True).count()
-        context['total_bookmarks'] = user.bookmarks.count()
-        context['total_views'] = sum(p.views for p in user.prompts.filter(is_published=True))
+        # Stats are denormalized counters on the profile (see apps.users.stats)
+        context['total_prompts'] = profile.total_prompts
+        context['total_bookmarks'] = profile.total_bookmarks
+        context['total_views'] = profile.total_views
+        context['total_blog_posts'] = profile.total_blog_posts
         
         return context
 
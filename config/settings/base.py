@@ -27,10 +27,13 @@ INSTALLED_APPS = [
     'apps.core',
     'apps.blog',     
     'apps.news', 
+    'apps.api',
 ]
 
 MIDDLEWARE = [
+    'apps.core.timing.RequestTimingMiddleware',  # Server-Timing and slow request log
     'django.middleware.security.SecurityMiddleware',
+    'apps.core.routing.ReplicaRoutingMiddleware',  # Primary/replica read routing
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.locale.LocaleMiddleware',  # For language switching
     'django.middleware.common.CommonMiddleware',
@@ -70,6 +73,12 @@ DATABASES = {
     }
 }
 
+# Read replicas of 'default' (aliases in DATABASES). Marked public views
+# read from them; writers stick to the primary for REPLICA_STICKY_SECONDS
+DATABASE_ROUTERS = ['apps.core.routing.ReplicaRouter']
+DATABASE_REPLICAS = []
+REPLICA_STICKY_SECONDS = 15
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -103,6 +112,14 @@ STATIC_URL = 'static/'
 STATICFILES_DIRS = [BASE_DIR / 'static']
 STATIC_ROOT = BASE_DIR / 'staticfiles'
 
+# Our CSS/JS bundled into one file each by collectstatic (see apps.core.assets);
+# templates use the separate files while bundling is disabled
+STATIC_BUNDLES = {
+    'css/site.css': ['css/style.css', 'css/themes.css'],
+    'js/site.js': ['js/theme-toggle.js', 'js/language-toggle.js', 'js/clipboard.js', 'js/infinite-scroll.js'],
+}
+STATIC_BUNDLES_ENABLED = False
+
 # Media files (User uploads)
 MEDIA_URL = 'media/'
 MEDIA_ROOT = BASE_DIR / 'media'
@@ -126,6 +143,77 @@ MESSAGE_TAGS = {
 
 # Pagination
 PROMPTS_PER_PAGE = 12
+BLOG_COMMENTS_PER_PAGE = 20
+
+# 'offset' (numbered pages) or 'cursor' (keyset pages, no COUNT query)
+# for the prompt, blog and news lists; ?cursor= always selects keyset mode
+LIST_PAGINATION_MODE = 'offset'
+
+# Result counts are cached per filter until the model changes; counting
+# stops after the threshold and larger results are shown as "N+"
+COUNT_CACHE_TIMEOUT = 300
+COUNT_ESTIMATE_THRESHOLD = 10000
+
+# View counts are buffered in memory and flushed every N seconds,
+# or sooner once this many objects have pending hits
+VIEW_COUNT_FLUSH_INTERVAL = 30
+VIEW_COUNT_FLUSH_THRESHOLD = 500
+# Idle processes flush from a background thread; hits a process cannot
+# write on exit are saved here for `manage.py flush_view_counts` (cron)
+VIEW_COUNT_FLUSH_THREAD = True
+VIEW_COUNT_SPILL_DIR = BASE_DIR / 'var' / 'view_counts'
+
+# Trending scores (apps.core.trending): engagement halves in weight every
+# N hours; `manage.py update_trending` should run every 10-15 minutes
+TRENDING_HALF_LIFE_HOURS = 24
+TRENDING_WIDGET_SIZE = 5
+# Trending widgets are rebuilt at least this often (about the cron interval)
+TRENDING_WIDGET_TIMEOUT = 900
+
+# URL names served by the async view variants (apps.core.async_views);
+# only worthwhile under ASGI, e.g. ['news:list', 'news:detail', 'prompts:list', 'prompts:detail']
+ASYNC_READ_VIEWS = []
+
+# Cached context fragments (apps.core.fragments) are deleted when their
+# models change, but only in every process when the cache is shared (see
+# prod.py); with the default per-process LocMemCache other processes can
+# serve a stale fragment for up to this many seconds
+FRAGMENT_CACHE_TIMEOUT = 600
+# Fragment hits/misses are counted per process and added to the shared
+# counters read by `manage.py fragment_cache_stats` every N seconds
+FRAGMENT_STATS_INTERVAL = 60
+
+# Cached per-user bookmarked prompt ids expire after this many seconds
+BOOKMARK_IDS_TIMEOUT = 300
+
+# Full-page cache for anonymous visitors on list and detail pages;
+# entries are purged when the underlying content changes
+PAGE_CACHE_ENABLED = True
+PAGE_CACHE_TIMEOUT = 120
+
+# Number of precomputed related items kept per object
+RELATED_CONTENT_SIZE = 8
+
+# Full-text search
+SEARCH_BACKEND = 'apps.core.search.SQLiteFTSBackend'
+
+# Per-request timing: Server-Timing header (True, False or 'staff') and a
+# warning log for requests over either threshold
+REQUEST_TIMING_ENABLED = True
+REQUEST_TIMING_HEADER = True
+SLOW_REQUEST_MS = 500
+SLOW_REQUEST_QUERIES = 50
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'apps': {'handlers': ['console'], 'level': 'INFO'},
+    },
+}
 
 # Email settings (for production)
 EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
@@ -4,6 +4,8 @@
 Development settings - used when running locally
 """
 
+import os
+
 from .base import *
 
 # SECURITY WARNING: don't run with debug turned on in production!
@@ -16,5 +18,17 @@ INSTALLED_APPS += [
     # Add django-debug-toolbar here if you want
 ]
 
+# USE_REPLICA=1 adds a local SQLite replica; refresh it with `manage.py sync_replica`
+if os.environ.get('USE_REPLICA'):
+    DATABASES['replica'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'db.replica.sqlite3',
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS = ['replica']
+
+# Always render pages fresh while developing
+PAGE_CACHE_ENABLED = False
+
 # Show emails in console during development
 EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
@@ -0,0 +1,76 @@
+"""
+Production settings
+"""
+
+import os
+
+from .base import *
+
+DEBUG = False
+
+SECRET_KEY = os.environ.get('DJANGO_SECRET_KEY', SECRET_KEY)
+ALLOWED_HOSTS = os.environ.get('DJANGO_ALLOWED_HOSTS', 'localhost').split(',')
+
+# SQLite tuned for concurrent reads under a steady trickle of writes.
+# Connections persist across requests and are checked before reuse; the
+# timeout is how long a writer waits for the write lock before failing.
+DATABASES['default'].update({
+    'CONN_MAX_AGE': 600,
+    'CONN_HEALTH_CHECKS': True,
+    'OPTIONS': {'timeout': 20},
+})
+
+# Applied to every new connection (apps.core.db.configure_sqlite)
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 20000,
+    'temp_store': 'MEMORY',
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -64 * 1024,  # KiB, i.e. 64 MB per connection
+    'wal_autocheckpoint': 1000,
+}
+
+# Fragment and page cache invalidation, list counts and the trending
+# widgets need a cache shared by all worker processes (and by cron
+# commands). Redis when CACHE_REDIS_URL is set, otherwise files on the
+# local disk, which suits a single server.
+if os.environ.get('CACHE_REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ['CACHE_REDIS_URL'],
+        },
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.environ.get('CACHE_DIR', str(BASE_DIR / 'var' / 'cache')),
+            'OPTIONS': {'MAX_ENTRIES': 20000},
+        },
+    }
+
+# Only staff see request timings
+REQUEST_TIMING_HEADER = 'staff'
+
+# Fingerprinted, bundled and precompressed static files. Run
+# `manage.py vendor_assets` once and commit static/vendor/ (collectstatic
+# fails without it), then `manage.py collectstatic` on every deploy.
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'apps.core.storage.BundledManifestStorage',
+    },
+}
+STATIC_BUNDLES_ENABLED = True
+
+# Fingerprinted names never change content, so the web server can cache
+# them forever, e.g. for nginx:
+#   location /static/ {
+#       alias /path/to/staticfiles/;
+#       gzip_static on;
+#       add_header Cache-Control "public, max-age=31536000, immutable";
+#   }
@@ -14,6 +14,8 @@ urlpatterns = [
     path('users/', include('apps.users.urls')),
     path('blog/', include('apps.blog.urls')),     
     path('news/', include('apps.news.urls')),     
+    path('api/v1/', include('apps.api.urls')),
+    path('', include('apps.core.urls')),
 ]
 
 
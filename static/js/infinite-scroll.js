@@ -0,0 +1,66 @@
+/**
+ * Infinite Scroll - Append the next keyset page of cards
+ *
+ * Works with buttons rendered by includes/cursor_pagination.html:
+ * <button data-load-more data-url="/more/?cursor=..." data-target="grid-id">
+ * The fragment endpoint returns {html, has_next, next_cursor}.
+ */
+
+(function () {
+    function loadMore(button) {
+        if (button.dataset.loading) {
+            return;
+        }
+        button.dataset.loading = 'true';
+        button.disabled = true;
+
+        fetch(button.dataset.url, {
+            headers: { 'X-Requested-With': 'XMLHttpRequest' }
+        })
+            .then(response => response.json())
+            .then(data => {
+                const target = document.getElementById(button.dataset.target);
+                target.insertAdjacentHTML('beforeend', data.html);
+
+                // Page links no longer match what is on screen
+                const links = button.closest('nav').querySelector('.pagination');
+                if (links) {
+                    links.remove();
+                }
+
+                if (data.has_next && data.next_cursor) {
+                    const url = new URL(button.dataset.url, window.location.href);
+                    url.searchParams.set('cursor', data.next_cursor);
+                    button.dataset.url = url.pathname + url.search;
+                    button.disabled = false;
+                } else {
+                    button.remove();
+                }
+            })
+            .catch(error => {
+                console.error('Error:', error);
+                button.disabled = false;
+            })
+            .finally(() => {
+                delete button.dataset.loading;
+            });
+    }
+
+    document.addEventListener('DOMContentLoaded', function () {
+        document.querySelectorAll('[data-load-more]').forEach(button => {
+            button.addEventListener('click', () => loadMore(button));
+
+            // Load automatically when the button scrolls into view
+            if ('IntersectionObserver' in window) {
+                const observer = new IntersectionObserver(entries => {
+                    if (!button.isConnected) {
+                        observer.disconnect();
+                    } else if (entries.some(entry => entry.isIntersecting)) {
+                        loadMore(button);
+                    }
+                }, { rootMargin: '200px' });
+                observer.observe(button);
+            }
+        });
+    });
+})();